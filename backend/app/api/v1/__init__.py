@@ -2,7 +2,7 @@
 API v1 路由
 """
 from fastapi import APIRouter
-from app.api.v1 import capital_flow, stocks, auth, holdings, watchlist
+from app.api.v1 import capital_flow, stocks, auth, holdings, watchlist, intraday_flow, market, signals, screener, sectors, admin
 
 router = APIRouter()
 
@@ -12,6 +12,12 @@ router.include_router(capital_flow.router)
 router.include_router(stocks.router)
 router.include_router(holdings.router)
 router.include_router(watchlist.router)
+router.include_router(intraday_flow.router)
+router.include_router(market.router)
+router.include_router(signals.router)
+router.include_router(screener.router)
+router.include_router(sectors.router)
+router.include_router(admin.router)
 
 
 @router.get("/")
@@ -0,0 +1,95 @@
+"""
+系统管理相关API（仅管理员）
+"""
+import asyncio
+from typing import Dict
+
+from fastapi import APIRouter, Body, Depends
+from fastapi.responses import FileResponse
+
+from app.models.user import User
+from app.api.v1.auth import get_current_admin
+from app.core.profiler import request_profiler
+
+router = APIRouter(prefix="/admin", tags=["系统管理"])
+
+
+@router.get("/profiles")
+async def list_profiles(
+    current_user: User = Depends(get_current_admin)
+):
+    """
+    获取请求采样结果列表（最新在前）
+    """
+    try:
+        profiles = await asyncio.to_thread(request_profiler.store.list)
+        return {
+            "code": 200,
+            "message": "success",
+            "data": {
+                "items": profiles,
+                "total": len(profiles),
+                "max_profiles": request_profiler.store.max_profiles
+            }
+        }
+    except Exception as e:
+        return {
+            "code": 500,
+            "message": f"服务器错误: {str(e)}",
+            "data": None
+        }
+
+
+@router.get("/profiles/{profile_id}")
+async def download_profile(
+    profile_id: str,
+    current_user: User = Depends(get_current_admin)
+):
+    """
+    下载请求采样结果（折叠栈格式，可用 flamegraph.pl 或 speedscope 生成火焰图）
+    """
+    path = request_profiler.store.path(profile_id)
+    if path is None:
+        return {
+            "code": 404,
+            "message": "采样结果不存在或已被清理",
+            "data": None
+        }
+    return FileResponse(path, media_type="text/plain", filename=path.name)
+
+
+@router.get("/profiler/routes")
+async def get_profiler_routes(
+    current_user: User = Depends(get_current_admin)
+):
+    """
+    获取各路由的采样比例
+    """
+    return {
+        "code": 200,
+        "message": "success",
+        "data": request_profiler.route_rates
+    }
+
+
+@router.put("/profiler/routes")
+async def set_profiler_routes(
+    route_rates: Dict[str, float] = Body(..., description="{路由模板: 采样比例(0~1)}，覆盖现有配置"),
+    current_user: User = Depends(get_current_admin)
+):
+    """
+    设置各路由的采样比例（只在当前进程生效，重启后恢复为 PROFILE_ROUTE_RATES）
+    """
+    invalid = [route for route, rate in route_rates.items() if not 0 <= rate <= 1]
+    if invalid:
+        return {
+            "code": 400,
+            "message": f"采样比例需在0~1之间: {', '.join(invalid)}",
+            "data": None
+        }
+    request_profiler.set_route_rates(route_rates)
+    return {
+        "code": 200,
+        "message": "success",
+        "data": request_profiler.route_rates
+    }
@@ -9,9 +9,14 @@ from datetime import datetime
 from pydantic import BaseModel, EmailStr
 
 from app.core.database import get_db
-from app.core.security import verify_password, get_password_hash, create_access_token, decode_access_token
+from app.core.security import (
+    PasswordPoolBusy, verify_password_async, get_password_hash_async,
+    create_access_token, decode_access_token
+)
+from app.core.user_cache import user_cache, detach_user
 from app.models.user import User, UserGroup, UserGroupRelation
 from app.core.config import settings
+from app.services.permissions import is_admin
 
 router = APIRouter(prefix="/auth", tags=["认证"])
 
@@ -64,6 +69,9 @@ async def get_current_user(
     """
     获取当前登录用户
     
+    已解析的用户按令牌缓存，命中时不再解码令牌和查询数据库；
+    返回的是不关联会话的只读用户对象
+    
     Args:
         token: JWT令牌
         db: 数据库会话
@@ -80,6 +88,14 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    # 缓存命中前先检查吊销（多进程共享吊销记录时，其他进程登出的令牌可能仍在本进程缓存中）
+    if await user_cache.is_revoked(token):
+        raise credentials_exception
+    
+    cached_user = user_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+    
     payload = decode_access_token(token)
     if payload is None:
         raise credentials_exception
@@ -98,9 +114,38 @@ async def get_current_user(
             detail="账户已被禁用或锁定"
         )
     
+    user = detach_user(user)
+    user_cache.set(token, user, payload.get("exp"))
     return user
 
 
+async def get_current_admin(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> User:
+    """
+    获取当前登录的管理员
+    
+    Raises:
+        HTTPException: 当前用户不是管理员
+    """
+    if not is_admin(db, current_user.user_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="需要管理员权限"
+        )
+    return current_user
+
+
+def _busy_exception(error: PasswordPoolBusy) -> HTTPException:
+    """密码哈希线程池排队已满时返回503，客户端稍后重试"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(error),
+        headers={"Retry-After": "1"},
+    )
+
+
 # API路由
 @router.post("/register", response_model=UserInfo, status_code=status.HTTP_201_CREATED)
 async def register(
@@ -138,7 +183,10 @@ async def register(
             )
     
     # 创建新用户
-    hashed_password = get_password_hash(user_data.password)
+    try:
+        hashed_password = await get_password_hash_async(user_data.password)
+    except PasswordPoolBusy as e:
+        raise _busy_exception(e)
     new_user = User(
         username=user_data.username,
         password_hash=hashed_password,
@@ -186,7 +234,12 @@ async def login(
     # 查找用户
     user = db.query(User).filter(User.username == form_data.username).first()
     
-    if not user or not verify_password(form_data.password, user.password_hash):
+    try:
+        password_ok = user is not None and await verify_password_async(form_data.password, user.password_hash)
+    except PasswordPoolBusy as e:
+        raise _busy_exception(e)
+    
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="用户名或密码错误",
@@ -230,16 +283,23 @@ async def get_current_user_info(
 
 @router.post("/logout")
 async def logout(
+    token: str = Depends(oauth2_scheme),
     current_user: User = Depends(get_current_user)
 ):
     """
-    用户登出（客户端删除token即可，这里只是标记）
+    用户登出（吊销当前令牌并清除缓存）
+    
+    RATE_LIMIT_BACKEND=redis 时吊销记录写入 Redis，所有进程立即拒绝该令牌；
+    否则只在当前进程生效，多进程部署时其他进程在令牌到期前仍会接受该令牌
     
     Args:
+        token: JWT令牌
         current_user: 当前登录用户
         
     Returns:
         登出成功消息
     """
+    payload = decode_access_token(token) or {}
+    await user_cache.revoke(token, payload.get("exp"))
     return {"message": "登出成功"}
 
@@ -2,25 +2,85 @@
 资金流向相关API
 """
 from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, asc, func
 from typing import Optional, List
 from datetime import date, datetime, timedelta
 from loguru import logger
 
 from app.core.database import get_db
 from app.models.stock import Stock, CapitalFlow
-from app.services.eastmoney_api import EastMoneyAPI
+from app.services.eastmoney_api import create_request_api
+from app.services.flow_panel import get_recent_trade_dates
+from app.services.flow_history import FLOW_ITEM_FIELDS, flow_to_dict, load_histories, fetch_missing_histories
+from app.utils.cache import shared_cache
+from app.utils.projection import LIST_FORMATS, parse_fields, shape_items
 from app.core.config import settings
 
 router = APIRouter(prefix="/capital-flow", tags=["资金流向"])
 
+# 历史排行可排序字段
+RANK_AMOUNT_FIELDS = ('main_inflow', 'super_inflow', 'large_inflow', 'medium_inflow', 'small_inflow', 'amount')
+RANK_RATE_FIELDS = {
+    'main_inflow_rate': 'main_inflow',
+    'super_inflow_rate': 'super_inflow',
+    'large_inflow_rate': 'large_inflow',
+    'medium_inflow_rate': 'medium_inflow',
+    'small_inflow_rate': 'small_inflow',
+}
+RANK_SORT_FIELDS = RANK_AMOUNT_FIELDS + tuple(RANK_RATE_FIELDS) + ('change_percent',)
+
+# 历史排行最大窗口（交易日）
+MAX_RANK_WINDOW = 60
+
+# 实时排行每行字段（parse_rank_data 的输出）
+RANK_ITEM_FIELDS = (
+    'stock_code', 'stock_name', 'market_code', 'exchange', 'current_price', 'change_percent',
+    'main_inflow', 'main_inflow_rate', 'super_inflow', 'super_inflow_rate',
+    'large_inflow', 'large_inflow_rate', 'medium_inflow', 'medium_inflow_rate',
+    'small_inflow', 'small_inflow_rate', 'net_inflow_5d', 'net_inflow_10d', 'timestamp',
+)
+
+# 实时排行可排序字段和最大页码
+REALTIME_SORT_FIELDS = ('f62', 'f184', 'f204', 'f205')
+MAX_RANK_PAGE = 200
+
+# 实时排行缓存（秒）
+RANK_CACHE_PREFIX = "rank:"
+RANK_CACHE_TTL = 10
+
+# 批量历史最多股票数
+MAX_BATCH_CODES = 300
+
+FIELDS_DESCRIPTION = "返回字段，逗号分隔，默认全部"
+FORMAT_DESCRIPTION = "返回格式: rows-按行, columns-按列（每个字段一个数组）"
+
+
+def _parse_list_options(fields: Optional[str], output_format: str, allowed) -> Optional[List[str]]:
+    """校验字段投影和返回格式参数"""
+    if output_format not in LIST_FORMATS:
+        raise ValueError(f"无效的返回格式: {output_format}")
+    return parse_fields(fields, allowed)
+
+
+class StockHistoryBatchRequest(BaseModel):
+    """多股票历史资金流向请求"""
+    stock_codes: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_CODES, description="股票代码列表")
+    start_date: Optional[date] = Field(None, description="开始日期，默认为结束日期前 days 天")
+    end_date: Optional[date] = Field(None, description="结束日期，默认今天")
+    days: int = Field(30, ge=1, le=365, description="未指定开始日期时的查询天数")
+    fields: Optional[str] = Field(None, description=FIELDS_DESCRIPTION)
+    format: str = Field("rows", description=FORMAT_DESCRIPTION)
+
 
 @router.get("/rank")
 async def get_capital_flow_rank(
-    page: int = Query(1, ge=1, description="页码"),
+    page: int = Query(1, ge=1, le=MAX_RANK_PAGE, description="页码"),
     page_size: int = Query(50, ge=1, le=100, description="每页数量"),
-    sort_field: str = Query("f62", description="排序字段: f62-今日主力, f204-5日主力, f205-10日主力"),
+    sort_field: str = Query("f62", description="排序字段: f62-今日主力, f184-今日主力占比, f204-5日主力, f205-10日主力"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    output_format: str = Query("rows", alias="format", description=FORMAT_DESCRIPTION),
     db: Session = Depends(get_db)
 ):
     """
@@ -29,35 +89,57 @@ async def get_capital_flow_rank(
     从东方财富API获取实时排行榜数据
     """
     try:
-        api = EastMoneyAPI()
-        
-        # 获取实时排行榜数据
-        raw_data = await api.get_realtime_capital_flow_rank(
-            page=page,
-            page_size=page_size,
-            sort_field=sort_field
-        )
-        
-        await api.close()
-        
-        if not raw_data:
+        try:
+            selected_fields = _parse_list_options(fields, output_format, RANK_ITEM_FIELDS)
+        except ValueError as e:
             return {
-                "code": 500,
-                "message": "获取数据失败",
+                "code": 400,
+                "message": str(e),
+                "data": []
+            }
+        if sort_field not in REALTIME_SORT_FIELDS:
+            return {
+                "code": 400,
+                "message": f"无效的排序字段: {sort_field}",
                 "data": []
             }
         
-        # 解析数据
-        stocks = api.parse_rank_data(raw_data)
-        
-        # 获取总数（如果有）
-        total = raw_data.get("total", len(stocks))
+        # 同一页短时间内只请求一次上游
+        cache_key = f"{RANK_CACHE_PREFIX}{sort_field}:{page}:{page_size}"
+        cached = shared_cache.get(cache_key)
+        if cached is None:
+            api = create_request_api()
+            
+            # 获取实时排行榜数据
+            raw_data = await api.get_realtime_capital_flow_rank(
+                page=page,
+                page_size=page_size,
+                sort_field=sort_field
+            )
+            
+            await api.close()
+            
+            if not raw_data:
+                return {
+                    "code": 500,
+                    "message": "获取数据失败",
+                    "data": []
+                }
+            
+            # 解析数据
+            stocks = api.parse_rank_data(raw_data)
+            
+            # 获取总数（如果有）
+            total = raw_data.get("total", len(stocks))
+            shared_cache.set(cache_key, (stocks, total), ttl=RANK_CACHE_TTL)
+        else:
+            stocks, total = cached
         
         return {
             "code": 200,
             "message": "success",
             "data": {
-                "items": stocks,
+                "items": shape_items(stocks, selected_fields, output_format),
                 "total": total,
                 "page": page,
                 "page_size": page_size,
@@ -73,10 +155,133 @@ async def get_capital_flow_rank(
         }
 
 
+@router.get("/rank/history")
+async def get_capital_flow_rank_history(
+    trade_date: Optional[date] = Query(None, description="截止交易日，默认最新交易日"),
+    window: int = Query(1, ge=1, le=MAX_RANK_WINDOW, description="窗口交易日数（1为单日排行）"),
+    sort_field: str = Query("main_inflow", description="排序字段: " + ", ".join(RANK_SORT_FIELDS)),
+    order: str = Query("desc", pattern="^(asc|desc)$", description="排序方向: desc-降序, asc-升序"),
+    page: int = Query(1, ge=1, description="页码"),
+    page_size: int = Query(50, ge=1, le=200, description="每页数量"),
+    db: Session = Depends(get_db)
+):
+    """
+    获取历史资金流向排行榜
+
+    从本地 capital_flow 数据计算：window=1 时为单日排行（走 trade_date 前缀的组合索引）；
+    window>1 时为截止 trade_date 最近N个交易日的累计排行（占比字段按累计成交额计算，
+    涨跌幅按复利累计）
+    """
+    try:
+        if sort_field not in RANK_SORT_FIELDS:
+            return {
+                "code": 400,
+                "message": f"无效的排序字段: {sort_field}",
+                "data": None
+            }
+
+        trade_dates = get_recent_trade_dates(db, window, trade_date)
+        if not trade_dates:
+            return {
+                "code": 404,
+                "message": "没有可用的历史数据",
+                "data": None
+            }
+
+        direction = desc if order == 'desc' else asc
+
+        if window == 1:
+            # 单日排行：直接按列排序
+            sort_column = getattr(CapitalFlow, sort_field)
+            columns = {field: getattr(CapitalFlow, field) for field in RANK_SORT_FIELDS}
+            base = db.query(
+                CapitalFlow.stock_id.label('stock_id'),
+                *(column.label(field) for field, column in columns.items())
+            ).filter(
+                CapitalFlow.trade_date == trade_dates[-1],
+                sort_column.isnot(None)
+            )
+            days_column = None
+        else:
+            # 窗口排行：按股票聚合
+            amounts = {field: func.sum(getattr(CapitalFlow, field)) for field in RANK_AMOUNT_FIELDS}
+            aggregated = db.query(
+                CapitalFlow.stock_id.label('stock_id'),
+                *(column.label(field) for field, column in amounts.items()),
+                (func.exp(func.sum(func.ln(1 + CapitalFlow.change_percent / 100))) - 1).label('growth'),
+                func.count().label('days')
+            ).filter(
+                CapitalFlow.trade_date >= trade_dates[0],
+                CapitalFlow.trade_date <= trade_dates[-1]
+            ).group_by(CapitalFlow.stock_id).subquery()
+
+            columns = {field: aggregated.c[field] for field in RANK_AMOUNT_FIELDS}
+            for rate_field, amount_field in RANK_RATE_FIELDS.items():
+                columns[rate_field] = aggregated.c[amount_field] / func.nullif(aggregated.c.amount, 0) * 100
+            columns['change_percent'] = aggregated.c.growth * 100
+
+            base = db.query(
+                aggregated.c.stock_id.label('stock_id'),
+                *(column.label(field) for field, column in columns.items()),
+                aggregated.c.days.label('days')
+            )
+            sort_column = columns[sort_field]
+            base = base.filter(sort_column.isnot(None))
+            days_column = 'days'
+
+        total = base.count()
+        ranked = base.subquery()
+        rows = db.query(ranked, Stock.stock_code, Stock.stock_name).join(
+            Stock, Stock.stock_id == ranked.c.stock_id
+        ).order_by(direction(ranked.c[sort_field])).offset(
+            (page - 1) * page_size
+        ).limit(page_size).all()
+
+        items = []
+        for i, row in enumerate(rows):
+            item = {
+                "rank": (page - 1) * page_size + i + 1,
+                "stock_code": row.stock_code,
+                "stock_name": row.stock_name,
+            }
+            for field in RANK_SORT_FIELDS:
+                value = getattr(row, field)
+                item[field] = round(float(value), 4) if value is not None else None
+            if days_column:
+                item["days"] = int(getattr(row, days_column))
+            items.append(item)
+
+        return {
+            "code": 200,
+            "message": "success",
+            "data": {
+                "start_date": trade_dates[0].isoformat(),
+                "end_date": trade_dates[-1].isoformat(),
+                "window": len(trade_dates),
+                "sort_field": sort_field,
+                "order": order,
+                "items": items,
+                "total": total,
+                "page": page,
+                "page_size": page_size,
+                "total_pages": (total + page_size - 1) // page_size
+            }
+        }
+
+    except Exception as e:
+        return {
+            "code": 500,
+            "message": f"服务器错误: {str(e)}",
+            "data": None
+        }
+
+
 @router.get("/stock/{stock_code}")
 async def get_stock_capital_flow(
     stock_code: str,
     days: int = Query(30, ge=1, le=365, description="查询天数"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    output_format: str = Query("rows", alias="format", description=FORMAT_DESCRIPTION),
     db: Session = Depends(get_db)
 ):
     """
@@ -85,13 +290,22 @@ async def get_stock_capital_flow(
     优先从数据库查询，如果没有则从API获取并保存
     """
     try:
+        try:
+            selected_fields = _parse_list_options(fields, output_format, FLOW_ITEM_FIELDS)
+        except ValueError as e:
+            return {
+                "code": 400,
+                "message": str(e),
+                "data": None
+            }
+        
         # 从数据库查询股票信息
         stock = db.query(Stock).filter(Stock.stock_code == stock_code).first()
         
         # 如果数据库没有股票，先尝试从排行榜API获取并保存
         if not stock:
             try:
-                api = EastMoneyAPI()
+                api = create_request_api()
                 raw_data = await api.get_realtime_capital_flow_rank(
                     page=1,
                     page_size=100,
@@ -168,7 +382,7 @@ async def get_stock_capital_flow(
         # 如果数据库没有历史数据，从API获取
         if not flows:
             try:
-                api = EastMoneyAPI()
+                api = create_request_api()
                 market = 'sh' if stock.exchange == 'SH' else 'sz'
                 history_data = await api.get_stock_capital_flow_history(
                     stock_code=stock_code,
@@ -227,25 +441,7 @@ async def get_stock_capital_flow(
                 logger.warning(f"从API获取历史数据失败: {e}")
         
         # 转换为字典格式
-        flow_list = []
-        for flow in flows:
-            flow_list.append({
-                "trade_date": flow.trade_date.isoformat(),
-                "main_inflow": float(flow.main_inflow) if flow.main_inflow else 0,
-                "main_inflow_rate": float(flow.main_inflow_rate) if flow.main_inflow_rate else 0,
-                "super_inflow": float(flow.super_inflow) if flow.super_inflow else 0,
-                "super_inflow_rate": float(flow.super_inflow_rate) if flow.super_inflow_rate else 0,
-                "large_inflow": float(flow.large_inflow) if flow.large_inflow else 0,
-                "large_inflow_rate": float(flow.large_inflow_rate) if flow.large_inflow_rate else 0,
-                "medium_inflow": float(flow.medium_inflow) if flow.medium_inflow else 0,
-                "medium_inflow_rate": float(flow.medium_inflow_rate) if flow.medium_inflow_rate else 0,
-                "small_inflow": float(flow.small_inflow) if flow.small_inflow else 0,
-                "small_inflow_rate": float(flow.small_inflow_rate) if flow.small_inflow_rate else 0,
-                "close_price": float(flow.close_price) if flow.close_price else 0,
-                "change_percent": float(flow.change_percent) if flow.change_percent else 0,
-                "volume": int(flow.volume) if flow.volume else 0,
-                "amount": float(flow.amount) if flow.amount else 0,
-            })
+        flow_list = [flow_to_dict(flow) for flow in flows]
         
         return {
             "code": 200,
@@ -257,7 +453,7 @@ async def get_stock_capital_flow(
                     "stock_name": stock.stock_name,
                     "exchange": stock.exchange,
                 },
-                "flows": flow_list,
+                "flows": shape_items(flow_list, selected_fields, output_format),
                 "total": len(flow_list)
             }
         }
@@ -269,3 +465,88 @@ async def get_stock_capital_flow(
             "data": None
         }
 
+
+
+@router.post("/stocks/history")
+async def get_stocks_capital_flow_batch(
+    request: StockHistoryBatchRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    批量获取多只股票的历史资金流向
+
+    一次查询读取全部股票和资金流向，数据库中没有数据的股票在限流器下并发从东方财富补齐；
+    数据库中不存在的股票代码在 not_found 中返回；上游额度不足时不补齐，
+    返回数据库中已有的数据并设置 upstream_limited
+    """
+    try:
+        try:
+            selected_fields = _parse_list_options(request.fields, request.format, FLOW_ITEM_FIELDS)
+        except ValueError as e:
+            return {
+                "code": 400,
+                "message": str(e),
+                "data": None
+            }
+
+        end_date = request.end_date or date.today()
+        start_date = request.start_date or end_date - timedelta(days=request.days)
+        if start_date > end_date or (end_date - start_date).days > 366:
+            return {
+                "code": 400,
+                "message": "日期范围无效（最长366天）",
+                "data": None
+            }
+
+        stock_codes = list(dict.fromkeys(code.strip() for code in request.stock_codes if code.strip()))
+        stocks = db.query(Stock).filter(Stock.stock_code.in_(stock_codes)).all()
+        stock_map = {stock.stock_code: stock for stock in stocks}
+
+        histories = load_histories(db, [stock.stock_id for stock in stocks], start_date, end_date)
+        misses = [stock for stock in stocks if stock.stock_id not in histories]
+        upstream_limited = False
+        fetched_count = 0
+        if misses:
+            fetched = await fetch_missing_histories(db, misses, start_date, end_date)
+            if fetched is None:
+                upstream_limited = True
+            else:
+                histories.update(fetched)
+                fetched_count = len(fetched)
+
+        items = []
+        for code in stock_codes:
+            stock = stock_map.get(code)
+            if stock is None:
+                continue
+            flow_list = histories.get(stock.stock_id, [])
+            items.append({
+                "stock": {
+                    "stock_id": stock.stock_id,
+                    "stock_code": stock.stock_code,
+                    "stock_name": stock.stock_name,
+                    "exchange": stock.exchange,
+                },
+                "flows": shape_items(flow_list, selected_fields, request.format),
+                "total": len(flow_list)
+            })
+
+        return {
+            "code": 200,
+            "message": "success",
+            "data": {
+                "start_date": start_date.isoformat(),
+                "end_date": end_date.isoformat(),
+                "items": items,
+                "not_found": [code for code in stock_codes if code not in stock_map],
+                "fetched": fetched_count,
+                "upstream_limited": upstream_limited
+            }
+        }
+
+    except Exception as e:
+        return {
+            "code": 500,
+            "message": f"服务器错误: {str(e)}",
+            "data": None
+        }
@@ -1,17 +1,19 @@
 """
 持股管理相关API
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel
 from datetime import date
 
 from app.core.database import get_db
 from app.models.user import User
-from app.models.holding import Holding, Watchlist
+from app.models.holding import Holding, Watchlist, PortfolioHistory
 from app.models.stock import Stock
 from app.api.v1.auth import get_current_user
+from app.services.holding_suggestions import get_cached_suggestions
+from app.services.user_stock_poller import get_realtime_quotes, quote_number
 
 router = APIRouter(prefix="/holdings", tags=["持股管理"])
 
@@ -47,11 +49,22 @@ class HoldingResponse(BaseModel):
     profit_loss_rate: Optional[float] = None
     notes: Optional[str] = None
     created_at: Optional[str] = None
+    suggestion: Optional[Dict[str, Any]] = None
     
     class Config:
         from_attributes = True
 
 
+class PortfolioHistoryResponse(BaseModel):
+    """持仓市值历史响应模型（按交易日对齐的数组，便于直接绘图）"""
+    dates: List[date]
+    market_value: List[float]
+    cost: List[float]
+    profit_loss: List[float]
+    profit_loss_rate: List[Optional[float]]
+    holding_count: List[int]
+
+
 @router.get("", response_model=List[HoldingResponse])
 async def get_holdings(
     current_user: User = Depends(get_current_user),
@@ -60,29 +73,22 @@ async def get_holdings(
     """
     获取当前用户的持股列表
     """
-    holdings = db.query(Holding).filter(
+    # 持股和股票信息一次查询
+    rows = db.query(Holding, Stock.stock_name, Stock.secid).outerjoin(
+        Stock, Stock.stock_id == Holding.stock_id
+    ).filter(
         Holding.user_id == current_user.user_id
     ).all()
     
+    # 实时价格一次批量获取（优先读取轮询缓存）
+    quotes = await get_realtime_quotes([(holding.stock_code, secid) for holding, _, secid in rows])
+    
+    # 智能建议由后台任务按股票预先计算，这里只按 stock_id 读取
+    suggestions = get_cached_suggestions(holding.stock_id for holding, _, _ in rows)
+    
     result = []
-    for holding in holdings:
-        stock = db.query(Stock).filter(Stock.stock_id == holding.stock_id).first()
-        
-        # 获取当前价格（从排行榜API获取）
-        from app.services.eastmoney_api import EastMoneyAPI
-        api = EastMoneyAPI()
-        try:
-            raw_data = await api.get_realtime_capital_flow_rank(page=1, page_size=100)
-            current_price = None
-            if raw_data and 'diff' in raw_data:
-                for item in raw_data['diff']:
-                    if item.get('f12') == holding.stock_code:
-                        current_price = item.get('f2', 0)
-                        break
-        except:
-            current_price = None
-        finally:
-            await api.close()
+    for holding, stock_name, _ in rows:
+        current_price = quote_number(quotes.get(holding.stock_code, {}).get('current_price'))
         
         # 计算盈亏
         profit_loss = None
@@ -96,7 +102,7 @@ async def get_holdings(
         result.append({
             "holding_id": holding.holding_id,
             "stock_code": holding.stock_code,
-            "stock_name": stock.stock_name if stock else holding.stock_code,
+            "stock_name": stock_name or holding.stock_code,
             "cost_price": float(holding.cost_price),
             "quantity": holding.quantity,
             "buy_date": holding.buy_date,
@@ -104,12 +110,50 @@ async def get_holdings(
             "profit_loss": profit_loss,
             "profit_loss_rate": profit_loss_rate,
             "notes": holding.notes,
-            "created_at": holding.created_at.isoformat() if holding.created_at else None
+            "created_at": holding.created_at.isoformat() if holding.created_at else None,
+            "suggestion": suggestions.get(holding.stock_id)
         })
     
     return result
 
 
+@router.get("/history", response_model=PortfolioHistoryResponse)
+async def get_portfolio_history(
+    start_date: Optional[date] = Query(None, description="开始日期，默认全部"),
+    end_date: Optional[date] = Query(None, description="结束日期，默认最近一个交易日"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    获取当前用户的每日持仓市值和浮动盈亏
+    """
+    query = db.query(
+        PortfolioHistory.trade_date,
+        PortfolioHistory.market_value,
+        PortfolioHistory.cost,
+        PortfolioHistory.profit_loss,
+        PortfolioHistory.profit_loss_rate,
+        PortfolioHistory.holding_count
+    ).filter(PortfolioHistory.user_id == current_user.user_id)
+    if start_date:
+        query = query.filter(PortfolioHistory.trade_date >= start_date)
+    if end_date:
+        query = query.filter(PortfolioHistory.trade_date <= end_date)
+    
+    rows = query.order_by(PortfolioHistory.trade_date).all()
+    
+    return {
+        "dates": [row.trade_date for row in rows],
+        "market_value": [float(row.market_value) for row in rows],
+        "cost": [float(row.cost) for row in rows],
+        "profit_loss": [float(row.profit_loss) for row in rows],
+        "profit_loss_rate": [
+            float(row.profit_loss_rate) if row.profit_loss_rate is not None else None for row in rows
+        ],
+        "holding_count": [row.holding_count for row in rows]
+    }
+
+
 @router.post("", response_model=HoldingResponse, status_code=status.HTTP_201_CREATED)
 async def create_holding(
     holding_data: HoldingCreate,
@@ -124,9 +168,9 @@ async def create_holding(
     
     if not stock:
         # 如果数据库没有，尝试从API获取
-        from app.services.eastmoney_api import EastMoneyAPI
+        from app.services.eastmoney_api import create_request_api
         from datetime import datetime
-        api = EastMoneyAPI()
+        api = create_request_api()
         try:
             raw_data = await api.get_realtime_capital_flow_rank(page=1, page_size=100)
             if raw_data and 'diff' in raw_data:
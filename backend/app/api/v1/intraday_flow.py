@@ -0,0 +1,96 @@
+"""
+分钟级资金流向相关API
+"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.core.database import get_db
+from app.models.stock import Stock
+from app.services.intraday_flow import FLOW_TIERS, minute_labels, load_intraday_flows
+
+router = APIRouter(prefix="/intraday-flow", tags=["分钟资金流向"])
+
+# 单次查询最多返回的交易日范围
+MAX_RANGE_DAYS = 31
+
+
+@router.get("/{stock_code}")
+async def get_stock_intraday_flow(
+    stock_code: str,
+    trade_date: Optional[date] = Query(None, description="交易日期（查询单日）"),
+    start_date: Optional[date] = Query(None, description="开始日期（查询区间）"),
+    end_date: Optional[date] = Query(None, description="结束日期（查询区间）"),
+    db: Session = Depends(get_db)
+):
+    """
+    获取指定股票的分钟资金流向
+
+    传 trade_date 查询单日；传 start_date/end_date 查询区间（最多31天）；
+    都不传时返回最近一个已采集交易日
+    """
+    try:
+        stock = db.query(Stock).filter(Stock.stock_code == stock_code).first()
+        if not stock:
+            return {
+                "code": 404,
+                "message": "股票不存在",
+                "data": None
+            }
+
+        latest_only = trade_date is None and start_date is None and end_date is None
+
+        if trade_date:
+            start_date = end_date = trade_date
+        else:
+            end_date = end_date or date.today()
+            start_date = start_date or end_date - timedelta(days=MAX_RANGE_DAYS - 1)
+
+        if start_date > end_date or (end_date - start_date).days >= MAX_RANGE_DAYS:
+            return {
+                "code": 400,
+                "message": f"日期范围无效（最多{MAX_RANGE_DAYS}天）",
+                "data": None
+            }
+
+        records = load_intraday_flows(db, stock.stock_id, start_date, end_date)
+
+        # 未指定日期时只返回最近一天
+        if latest_only:
+            records = records[-1:]
+
+        days = []
+        for day, matrix, minute_count in records:
+            # NaN（未采集的分钟）转换为None
+            values = np.where(np.isnan(matrix), None, matrix.astype(float))
+            days.append({
+                "trade_date": day.isoformat(),
+                "minute_count": minute_count,
+                **{tier: values[:, i].tolist() for i, tier in enumerate(FLOW_TIERS)},
+            })
+
+        return {
+            "code": 200,
+            "message": "success",
+            "data": {
+                "stock": {
+                    "stock_id": stock.stock_id,
+                    "stock_code": stock.stock_code,
+                    "stock_name": stock.stock_name,
+                    "exchange": stock.exchange,
+                },
+                "minutes": minute_labels(),
+                "days": days,
+                "total": len(days)
+            }
+        }
+
+    except Exception as e:
+        return {
+            "code": 500,
+            "message": f"服务器错误: {str(e)}",
+            "data": None
+        }
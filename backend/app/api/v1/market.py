@@ -0,0 +1,94 @@
+"""
+市场监控相关API
+"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import date
+
+from app.core.database import get_db
+from app.models.limit_event import LimitEvent
+from app.services.limit_monitor import limit_monitor, LIMIT_EVENT_TYPES
+
+router = APIRouter(prefix="/market", tags=["市场监控"])
+
+
+@router.get("/limit-status")
+async def get_limit_status():
+    """
+    获取当前涨跌停状态
+
+    基于最近一次全市场快照的计算结果
+    """
+    return {
+        "code": 200,
+        "message": "success",
+        "data": limit_monitor.status()
+    }
+
+
+@router.get("/limit-events")
+async def get_limit_events(
+    trade_date: Optional[date] = Query(None, description="交易日期，默认今天"),
+    event_type: Optional[str] = Query(None, description="事件类型: " + ", ".join(LIMIT_EVENT_TYPES)),
+    stock_code: Optional[str] = Query(None, description="股票代码"),
+    page: int = Query(1, ge=1, description="页码"),
+    page_size: int = Query(100, ge=1, le=500, description="每页数量"),
+    db: Session = Depends(get_db)
+):
+    """
+    获取涨跌停事件日志（按时间倒序）
+    """
+    try:
+        if event_type and event_type not in LIMIT_EVENT_TYPES:
+            return {
+                "code": 400,
+                "message": f"无效的事件类型: {event_type}",
+                "data": None
+            }
+
+        query = db.query(LimitEvent).filter(LimitEvent.trade_date == (trade_date or date.today()))
+        if event_type:
+            query = query.filter(LimitEvent.event_type == event_type)
+        if stock_code:
+            query = query.filter(LimitEvent.stock_code == stock_code)
+
+        total = query.count()
+        events = query.order_by(LimitEvent.event_time.desc(), LimitEvent.event_id.desc()).offset(
+            (page - 1) * page_size
+        ).limit(page_size).all()
+
+        items = [
+            {
+                "event_id": event.event_id,
+                "stock_code": event.stock_code,
+                "stock_name": event.stock_name,
+                "event_type": event.event_type,
+                "event_name": LIMIT_EVENT_TYPES.get(event.event_type, event.event_type),
+                "event_time": event.event_time.isoformat() if event.event_time else None,
+                "price": float(event.price) if event.price is not None else None,
+                "limit_price": float(event.limit_price) if event.limit_price is not None else None,
+                "change_percent": float(event.change_percent) if event.change_percent is not None else None,
+                "main_inflow": float(event.main_inflow) if event.main_inflow is not None else None,
+            }
+            for event in events
+        ]
+
+        return {
+            "code": 200,
+            "message": "success",
+            "data": {
+                "items": items,
+                "total": total,
+                "page": page,
+                "page_size": page_size,
+                "total_pages": (total + page_size - 1) // page_size
+            }
+        }
+
+    except Exception as e:
+        return {
+            "code": 500,
+            "message": f"服务器错误: {str(e)}",
+            "data": None
+        }
@@ -0,0 +1,114 @@
+"""
+选股筛选相关API
+"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from sqlalchemy import func, literal
+
+from app.core.database import get_db
+from app.models.stock import Stock
+from app.models.streak import FlowStreak
+from app.services.flow_streaks import WINDOW_BITS, DEFAULT_WINDOW, window_mask
+
+router = APIRouter(prefix="/screener", tags=["选股筛选"])
+
+# 可排序字段
+STREAK_SORT_FIELDS = ('current_streak', 'window_count', 'streak_amount')
+
+
+@router.get("/inflow-streaks")
+async def get_inflow_streaks(
+    min_streak: int = Query(0, ge=0, le=WINDOW_BITS, description="最少连续主力净流入天数（K）"),
+    window: int = Query(DEFAULT_WINDOW, ge=1, le=WINDOW_BITS, description="统计窗口交易日数（M）"),
+    min_count: int = Query(0, ge=0, le=WINDOW_BITS, description="窗口内最少主力净流入天数（N）"),
+    sort_field: str = Query("current_streak", description="排序字段: " + ", ".join(STREAK_SORT_FIELDS)),
+    order: str = Query("desc", description="排序方向: asc/desc"),
+    page: int = Query(1, ge=1, description="页码"),
+    page_size: int = Query(50, ge=1, le=200, description="每页数量"),
+    db: Session = Depends(get_db)
+):
+    """
+    按主力连续净流入筛选股票
+
+    - 连续K日主力净流入: min_streak=K
+    - 最近M日中至少N日主力净流入: window=M&min_count=N
+    - 只返回最新交易日有数据的股票（停牌、退市股票的状态停留在旧交易日，不参与筛选）
+    """
+    try:
+        if sort_field not in STREAK_SORT_FIELDS:
+            return {
+                "code": 400,
+                "message": f"无效的排序字段: {sort_field}",
+                "data": None
+            }
+        if order not in ('asc', 'desc'):
+            return {
+                "code": 400,
+                "message": f"无效的排序方向: {order}",
+                "data": None
+            }
+
+        trade_date = db.query(func.max(FlowStreak.last_trade_date)).scalar()
+        if trade_date is None:
+            return {
+                "code": 200,
+                "message": "success",
+                "data": {"trade_date": None, "items": [], "total": 0, "page": page,
+                         "page_size": page_size, "total_pages": 0}
+            }
+
+        # 默认窗口直接使用预先计算的 window_count，其他窗口对位图取掩码后计数
+        if window == DEFAULT_WINDOW:
+            count_column = FlowStreak.window_count
+        else:
+            count_column = func.bit_count(FlowStreak.window_bits.op('&')(literal(window_mask(window))))
+        count_column = count_column.label('window_count')
+
+        query = db.query(FlowStreak, count_column, Stock.stock_code, Stock.stock_name).join(
+            Stock, Stock.stock_id == FlowStreak.stock_id
+        ).filter(FlowStreak.last_trade_date == trade_date)
+        if min_streak > 0:
+            query = query.filter(FlowStreak.current_streak >= min_streak)
+        if min_count > 0:
+            query = query.filter(count_column >= min_count)
+
+        sort_column = count_column if sort_field == 'window_count' else getattr(FlowStreak, sort_field)
+        sort_column = sort_column.asc() if order == 'asc' else sort_column.desc()
+
+        total = query.count()
+        rows = query.order_by(sort_column, FlowStreak.stock_id).offset(
+            (page - 1) * page_size
+        ).limit(page_size).all()
+
+        items = [
+            {
+                "stock_code": stock_code,
+                "stock_name": stock_name,
+                "current_streak": streak.current_streak,
+                "streak_amount": float(streak.streak_amount) if streak.streak_amount is not None else None,
+                "window_count": int(count),
+                "last_trade_date": streak.last_trade_date.isoformat(),
+            }
+            for streak, count, stock_code, stock_name in rows
+        ]
+
+        return {
+            "code": 200,
+            "message": "success",
+            "data": {
+                "trade_date": trade_date.isoformat(),
+                "window": window,
+                "items": items,
+                "total": total,
+                "page": page,
+                "page_size": page_size,
+                "total_pages": (total + page_size - 1) // page_size
+            }
+        }
+
+    except Exception as e:
+        return {
+            "code": 500,
+            "message": f"服务器错误: {str(e)}",
+            "data": None
+        }
@@ -0,0 +1,222 @@
+"""
+板块轮动相关API
+"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from typing import Optional
+from datetime import date
+
+from app.core.database import get_db
+from app.models.sector import Sector, SectorFlow
+
+router = APIRouter(prefix="/sectors", tags=["板块轮动"])
+
+# 板块类型
+SECTOR_TYPES = ('industry', 'concept', 'area')
+
+# 可排序 / 热力图指标
+SECTOR_METRICS = (
+    'main_inflow', 'inflow_ratio', 'breadth', 'momentum', 'avg_change_percent',
+    'super_inflow', 'amount', 'flow_rank', 'rank_change'
+)
+
+
+def _float(value):
+    return float(value) if value is not None else None
+
+
+def _latest_flow_date(db: Session, trade_date: Optional[date]) -> Optional[date]:
+    """不超过 trade_date 的最近一个有板块资金流向的交易日"""
+    query = db.query(func.max(SectorFlow.trade_date))
+    if trade_date is not None:
+        query = query.filter(SectorFlow.trade_date <= trade_date)
+    return query.scalar()
+
+
+@router.get("/rotation")
+async def get_sector_rotation(
+    trade_date: Optional[date] = Query(None, description="交易日期，默认最近一个交易日"),
+    sector_type: str = Query("industry", description="板块类型: industry/concept/area"),
+    sort_field: str = Query("main_inflow", description="排序字段: " + ", ".join(SECTOR_METRICS)),
+    order: str = Query("desc", description="排序方向: asc/desc"),
+    page: int = Query(1, ge=1, description="页码"),
+    page_size: int = Query(50, ge=1, le=200, description="每页数量"),
+    db: Session = Depends(get_db)
+):
+    """
+    获取某个交易日全部板块的资金流向和轮动指标
+    """
+    try:
+        if sector_type not in SECTOR_TYPES:
+            return {
+                "code": 400,
+                "message": f"无效的板块类型: {sector_type}",
+                "data": None
+            }
+        if sort_field not in SECTOR_METRICS:
+            return {
+                "code": 400,
+                "message": f"无效的排序字段: {sort_field}",
+                "data": None
+            }
+        if order not in ('asc', 'desc'):
+            return {
+                "code": 400,
+                "message": f"无效的排序方向: {order}",
+                "data": None
+            }
+
+        flow_date = _latest_flow_date(db, trade_date)
+        if flow_date is None:
+            return {
+                "code": 200,
+                "message": "success",
+                "data": {"trade_date": None, "items": [], "total": 0, "page": page,
+                         "page_size": page_size, "total_pages": 0}
+            }
+
+        query = db.query(SectorFlow, Sector.sector_code, Sector.sector_name).join(
+            Sector, Sector.sector_id == SectorFlow.sector_id
+        ).filter(
+            SectorFlow.trade_date == flow_date,
+            Sector.sector_type == sector_type
+        )
+
+        sort_column = getattr(SectorFlow, sort_field)
+        sort_column = sort_column.asc() if order == 'asc' else sort_column.desc()
+
+        total = query.count()
+        rows = query.order_by(sort_column, SectorFlow.sector_id).offset(
+            (page - 1) * page_size
+        ).limit(page_size).all()
+
+        items = [
+            {
+                "sector_code": sector_code,
+                "sector_name": sector_name,
+                "main_inflow": _float(flow.main_inflow),
+                "super_inflow": _float(flow.super_inflow),
+                "large_inflow": _float(flow.large_inflow),
+                "medium_inflow": _float(flow.medium_inflow),
+                "small_inflow": _float(flow.small_inflow),
+                "amount": _float(flow.amount),
+                "inflow_ratio": _float(flow.inflow_ratio),
+                "avg_change_percent": _float(flow.avg_change_percent),
+                "breadth": _float(flow.breadth),
+                "momentum": _float(flow.momentum),
+                "flow_rank": flow.flow_rank,
+                "rank_change": flow.rank_change,
+                "stock_count": flow.stock_count,
+            }
+            for flow, sector_code, sector_name in rows
+        ]
+
+        return {
+            "code": 200,
+            "message": "success",
+            "data": {
+                "trade_date": flow_date.isoformat(),
+                "sector_type": sector_type,
+                "items": items,
+                "total": total,
+                "page": page,
+                "page_size": page_size,
+                "total_pages": (total + page_size - 1) // page_size
+            }
+        }
+
+    except Exception as e:
+        return {
+            "code": 500,
+            "message": f"服务器错误: {str(e)}",
+            "data": None
+        }
+
+
+@router.get("/heatmap")
+async def get_sector_heatmap(
+    trade_date: Optional[date] = Query(None, description="截止交易日期，默认最近一个交易日"),
+    sector_type: str = Query("industry", description="板块类型: industry/concept/area"),
+    metric: str = Query("inflow_ratio", description="热力图指标: " + ", ".join(SECTOR_METRICS)),
+    days: int = Query(20, ge=1, le=60, description="交易日数"),
+    top_n: int = Query(30, ge=1, le=200, description="板块数量（按截止日主力净流入排名）"),
+    db: Session = Depends(get_db)
+):
+    """
+    获取板块资金流向热力图数据
+
+    返回紧凑的矩阵结构：sectors 为行，dates 为列，values[i][j] 为第 i 个板块在第 j 个交易日的指标值
+    """
+    try:
+        if sector_type not in SECTOR_TYPES:
+            return {
+                "code": 400,
+                "message": f"无效的板块类型: {sector_type}",
+                "data": None
+            }
+        if metric not in SECTOR_METRICS:
+            return {
+                "code": 400,
+                "message": f"无效的指标: {metric}",
+                "data": None
+            }
+
+        flow_date = _latest_flow_date(db, trade_date)
+        if flow_date is None:
+            return {
+                "code": 200,
+                "message": "success",
+                "data": {"metric": metric, "dates": [], "sectors": [], "values": []}
+            }
+
+        # 截止日排名前 top_n 的板块
+        top_rows = db.query(SectorFlow.sector_id, Sector.sector_code, Sector.sector_name).join(
+            Sector, Sector.sector_id == SectorFlow.sector_id
+        ).filter(
+            SectorFlow.trade_date == flow_date,
+            Sector.sector_type == sector_type,
+            SectorFlow.flow_rank > 0
+        ).order_by(SectorFlow.flow_rank).limit(top_n).all()
+
+        dates = [
+            row[0] for row in db.query(SectorFlow.trade_date).filter(
+                SectorFlow.trade_date <= flow_date
+            ).distinct().order_by(SectorFlow.trade_date.desc()).limit(days).all()
+        ][::-1]
+
+        sector_pos = {sector_id: i for i, (sector_id, _, _) in enumerate(top_rows)}
+        date_pos = {trade_date: j for j, trade_date in enumerate(dates)}
+        values = [[None] * len(dates) for _ in top_rows]
+
+        if top_rows and dates:
+            metric_column = getattr(SectorFlow, metric)
+            cells = db.query(SectorFlow.sector_id, SectorFlow.trade_date, metric_column).filter(
+                SectorFlow.sector_id.in_(list(sector_pos)),
+                SectorFlow.trade_date >= dates[0],
+                SectorFlow.trade_date <= dates[-1]
+            ).all()
+            for sector_id, cell_date, value in cells:
+                values[sector_pos[sector_id]][date_pos[cell_date]] = _float(value)
+
+        return {
+            "code": 200,
+            "message": "success",
+            "data": {
+                "metric": metric,
+                "sector_type": sector_type,
+                "dates": [trade_date.isoformat() for trade_date in dates],
+                "sectors": [
+                    {"sector_code": sector_code, "sector_name": sector_name}
+                    for _, sector_code, sector_name in top_rows
+                ],
+                "values": values
+            }
+        }
+
+    except Exception as e:
+        return {
+            "code": 500,
+            "message": f"服务器错误: {str(e)}",
+            "data": None
+        }
@@ -0,0 +1,105 @@
+"""
+资金流入异动信号相关API
+"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from typing import Optional
+from datetime import date
+
+from app.core.database import get_db
+from app.models.signal import FlowSignal
+from app.models.stock import Stock
+from app.services.flow_signals import SIGNAL_TYPES
+
+router = APIRouter(prefix="/signals", tags=["异动信号"])
+
+# 可排序字段
+SORT_FIELDS = ('score', 'main_z', 'super_z', 'inflow_ratio_z', 'divergence', 'main_inflow')
+
+
+@router.get("")
+async def get_flow_signals(
+    trade_date: Optional[date] = Query(None, description="交易日期，默认最近一个有信号的交易日"),
+    signal_type: Optional[str] = Query(None, description="信号类型: " + ", ".join(SIGNAL_TYPES)),
+    sort_field: str = Query("score", description="排序字段: " + ", ".join(SORT_FIELDS)),
+    page: int = Query(1, ge=1, description="页码"),
+    page_size: int = Query(50, ge=1, le=200, description="每页数量"),
+    db: Session = Depends(get_db)
+):
+    """
+    获取资金流入异动信号列表（按排序字段降序）
+    """
+    try:
+        if signal_type and signal_type not in SIGNAL_TYPES:
+            return {
+                "code": 400,
+                "message": f"无效的信号类型: {signal_type}",
+                "data": None
+            }
+        if sort_field not in SORT_FIELDS:
+            return {
+                "code": 400,
+                "message": f"无效的排序字段: {sort_field}",
+                "data": None
+            }
+
+        if trade_date is None:
+            trade_date = db.query(func.max(FlowSignal.trade_date)).scalar()
+            if trade_date is None:
+                return {
+                    "code": 200,
+                    "message": "success",
+                    "data": {"trade_date": None, "items": [], "total": 0, "page": page,
+                             "page_size": page_size, "total_pages": 0}
+                }
+
+        query = db.query(FlowSignal, Stock.stock_code, Stock.stock_name).join(
+            Stock, Stock.stock_id == FlowSignal.stock_id
+        ).filter(FlowSignal.trade_date == trade_date)
+        if signal_type:
+            query = query.filter(func.find_in_set(signal_type, FlowSignal.signal_types) > 0)
+
+        total = query.count()
+        rows = query.order_by(getattr(FlowSignal, sort_field).desc()).offset(
+            (page - 1) * page_size
+        ).limit(page_size).all()
+
+        def _float(value):
+            return float(value) if value is not None else None
+
+        items = [
+            {
+                "stock_code": stock_code,
+                "stock_name": stock_name,
+                "signal_types": signal.signal_types.split(','),
+                "score": _float(signal.score),
+                "main_inflow": _float(signal.main_inflow),
+                "main_z": _float(signal.main_z),
+                "super_z": _float(signal.super_z),
+                "inflow_ratio": _float(signal.inflow_ratio),
+                "inflow_ratio_z": _float(signal.inflow_ratio_z),
+                "divergence": _float(signal.divergence),
+            }
+            for signal, stock_code, stock_name in rows
+        ]
+
+        return {
+            "code": 200,
+            "message": "success",
+            "data": {
+                "trade_date": trade_date.isoformat(),
+                "items": items,
+                "total": total,
+                "page": page,
+                "page_size": page_size,
+                "total_pages": (total + page_size - 1) // page_size
+            }
+        }
+
+    except Exception as e:
+        return {
+            "code": 500,
+            "message": f"服务器错误: {str(e)}",
+            "data": None
+        }
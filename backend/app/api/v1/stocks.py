@@ -8,7 +8,7 @@ from datetime import datetime
 
 from app.core.database import get_db
 from app.models.stock import Stock
-from app.services.eastmoney_api import EastMoneyAPI
+from app.services.eastmoney_api import create_request_api
 
 router = APIRouter(prefix="/stocks", tags=["股票"])
 
@@ -75,7 +75,7 @@ async def get_stock_detail(
         # 如果数据库没有，尝试从排行榜API获取
         if not stock:
             try:
-                api = EastMoneyAPI()
+                api = create_request_api()
                 # 获取排行榜数据（只获取第一页，查找目标股票）
                 raw_data = await api.get_realtime_capital_flow_rank(
                     page=1,
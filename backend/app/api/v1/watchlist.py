@@ -11,6 +11,7 @@ from app.models.user import User
 from app.models.holding import Watchlist
 from app.models.stock import Stock
 from app.api.v1.auth import get_current_user
+from app.services.user_stock_poller import get_realtime_quotes, quote_number
 
 router = APIRouter(prefix="/watchlist", tags=["收藏列表"])
 
@@ -45,42 +46,27 @@ async def get_watchlist(
     """
     获取当前用户的收藏列表
     """
-    watchlist = db.query(Watchlist).filter(
+    # 收藏和股票信息一次查询
+    rows = db.query(Watchlist, Stock.stock_name, Stock.secid).outerjoin(
+        Stock, Stock.stock_id == Watchlist.stock_id
+    ).filter(
         Watchlist.user_id == current_user.user_id
     ).all()
     
+    # 实时数据一次批量获取（优先读取轮询缓存）
+    quotes = await get_realtime_quotes([(item.stock_code, secid) for item, _, secid in rows])
+    
     result = []
-    for item in watchlist:
-        stock = db.query(Stock).filter(Stock.stock_id == item.stock_id).first()
-        
-        # 获取实时数据
-        from app.services.eastmoney_api import EastMoneyAPI
-        api = EastMoneyAPI()
-        try:
-            raw_data = await api.get_realtime_capital_flow_rank(page=1, page_size=100)
-            current_price = None
-            change_percent = None
-            main_inflow = None
-            
-            if raw_data and 'diff' in raw_data:
-                for stock_item in raw_data['diff']:
-                    if stock_item.get('f12') == item.stock_code:
-                        current_price = stock_item.get('f2', 0)
-                        change_percent = stock_item.get('f3', 0)
-                        main_inflow = stock_item.get('f62', 0)
-                        break
-        except:
-            pass
-        finally:
-            await api.close()
+    for item, stock_name, _ in rows:
+        quote = quotes.get(item.stock_code, {})
         
         result.append({
             "watch_id": item.watch_id,
             "stock_code": item.stock_code,
-            "stock_name": stock.stock_name if stock else item.stock_code,
-            "current_price": current_price,
-            "change_percent": change_percent,
-            "main_inflow": main_inflow,
+            "stock_name": stock_name or item.stock_code,
+            "current_price": quote_number(quote.get('current_price')),
+            "change_percent": quote_number(quote.get('change_percent')),
+            "main_inflow": quote_number(quote.get('main_inflow')),
             "notes": item.notes,
             "created_at": item.created_at.isoformat() if item.created_at else None
         })
@@ -102,9 +88,9 @@ async def add_to_watchlist(
     
     if not stock:
         # 如果数据库没有，尝试从API获取
-        from app.services.eastmoney_api import EastMoneyAPI
+        from app.services.eastmoney_api import create_request_api
         from datetime import datetime
-        api = EastMoneyAPI()
+        api = create_request_api()
         try:
             raw_data = await api.get_realtime_capital_flow_rank(page=1, page_size=100)
             if raw_data and 'diff' in raw_data:
@@ -0,0 +1,183 @@
+"""
+响应压缩中间件
+
+按请求的 Accept-Encoding 协商压缩算法（优先 br，其次 gzip），
+响应体小于阈值、已有 Content-Encoding 或内容类型不适合压缩时原样返回。
+Brotli 依赖 brotli 包，未安装时只使用 gzip
+"""
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+# 需要压缩的内容类型前缀
+COMPRESSIBLE_TYPES = (
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'text/',
+)
+
+
+class GzipEncoder:
+    """gzip 流式压缩"""
+
+    name = 'gzip'
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+    """Brotli 流式压缩"""
+
+    name = 'br'
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+def accepted_encodings(accept_encoding: str) -> set:
+    """解析 Accept-Encoding（忽略 q=0 的编码）"""
+    encodings = set()
+    for part in accept_encoding.lower().split(','):
+        token, _, params = part.strip().partition(';')
+        if token and params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            encodings.add(token)
+    return encodings
+
+
+class CompressionMiddleware:
+    """gzip / Brotli 响应压缩中间件"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4
+    ):
+        """
+        Args:
+            minimum_size: 压缩阈值（字节），小于该大小的响应不压缩
+            gzip_level: gzip 压缩级别（1-9）
+            brotli_quality: Brotli 压缩质量（0-11），取中低值以控制CPU开销
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def select_encoder(self, scope: Scope):
+        """按 Accept-Encoding 选择压缩算法，不需要压缩时返回None"""
+        encodings = accepted_encodings(Headers(scope=scope).get('accept-encoding', ''))
+        if brotli is not None and 'br' in encodings:
+            return lambda: BrotliEncoder(self.brotli_quality)
+        if 'gzip' in encodings:
+            return lambda: GzipEncoder(self.gzip_level)
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] == 'http':
+            encoder_factory = self.select_encoder(scope)
+            if encoder_factory is not None:
+                responder = CompressionResponder(self.app, self.minimum_size, encoder_factory)
+                await responder(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+class CompressionResponder:
+    """单个请求的压缩处理（与 starlette GZipResponder 的流程一致）"""
+
+    def __init__(self, app: ASGIApp, minimum_size: int, encoder_factory):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encoder_factory = encoder_factory
+        self.encoder = None
+        self.send: Optional[Send] = None
+        self.initial_message: Message = {}
+        self.started = False
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    def _start_encoding(self, streaming: bool):
+        """设置响应头并创建压缩器"""
+        self.encoder = self.encoder_factory()
+        headers = MutableHeaders(raw=self.initial_message['headers'])
+        headers['Content-Encoding'] = self.encoder.name
+        headers.add_vary_header('Accept-Encoding')
+        if streaming:
+            del headers['Content-Length']
+
+    async def send_compressed(self, message: Message):
+        message_type = message['type']
+        if message_type == 'http.response.start':
+            # 确定是否压缩之前暂不发送响应头
+            self.initial_message = message
+            headers = Headers(raw=message['headers'])
+            content_type = headers.get('content-type', '')
+            self.passthrough = (
+                'content-encoding' in headers
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            )
+            return
+
+        if message_type != 'http.response.body':
+            await self.send(message)
+            return
+
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+
+        if self.passthrough:
+            if not self.started:
+                self.started = True
+                await self.send(self.initial_message)
+            await self.send(message)
+            return
+
+        if not self.started:
+            self.started = True
+            if len(body) < self.minimum_size and not more_body:
+                await self.send(self.initial_message)
+                await self.send(message)
+                self.passthrough = True
+                return
+
+            self._start_encoding(streaming=more_body)
+            data = self.encoder.compress(body)
+            if not more_body:
+                data += self.encoder.flush()
+                MutableHeaders(raw=self.initial_message['headers'])['Content-Length'] = str(len(data))
+            message['body'] = data
+            await self.send(self.initial_message)
+            await self.send(message)
+            return
+
+        data = self.encoder.compress(body)
+        if not more_body:
+            data += self.encoder.flush()
+        message['body'] = data
+        await self.send(message)
@@ -2,7 +2,7 @@
 应用配置模块
 """
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 
 
 class Settings(BaseSettings):
@@ -32,10 +32,59 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # 登录用户缓存（令牌 -> 用户）
+    USER_CACHE_TTL: int = 60
+    USER_CACHE_SIZE: int = 10000
+    
+    # 接口限流（令牌桶，memory-进程内, redis-多进程共享）
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_USER_RATE: float = 5.0
+    RATE_LIMIT_USER_BURST: int = 20
+    RATE_LIMIT_IP_RATE: float = 10.0
+    RATE_LIMIT_IP_BURST: int = 40
+    # 接口请求（缓存未命中）访问东方财富的全局额度
+    UPSTREAM_BUDGET_RATE: float = 10.0
+    UPSTREAM_BUDGET_BURST: int = 20
+    
+    # 密码哈希线程池（bcrypt 计算不在事件循环中执行）
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 200
+    
     # 东方财富API配置
     EASTMONEY_BASE_URL: str = "http://push2.eastmoney.com"
     EASTMONEY_HISTORY_URL: str = "http://push2his.eastmoney.com"
     
+    # 响应压缩（小于阈值的响应不压缩）
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    GZIP_LEVEL: int = 6
+    BROTLI_QUALITY: int = 4
+    
+    # 指标接口 /metrics（Prometheus 文本格式）
+    METRICS_ENABLED: bool = True
+    
+    # 请求采样分析（结果目录、保留份数、采样间隔秒、同时采样数、{路由模板: 采样比例}）
+    PROFILE_DIR: str = "profiles"
+    PROFILE_MAX_FILES: int = 50
+    PROFILE_INTERVAL: float = 0.005
+    PROFILE_MAX_CONCURRENT: int = 2
+    PROFILE_ROUTE_RATES: Dict[str, float] = {}
+    
+    # 后台轮询任务（多进程部署时只在一个进程中开启）
+    ENABLE_POLLERS: bool = True
+    
+    # 启动预热（等待轮询任务第一次执行的超时秒数）和全市场快照本地文件（退出时保存、启动时恢复）
+    WARMUP_TIMEOUT: float = 60.0
+    SNAPSHOT_FILE: str = "data/market_snapshot.npz"
+    SNAPSHOT_MAX_AGE: float = 86400.0
+    
+    # 多进程部署：API进程数（>1 时 python -m app.main 另起快照采集进程），
+    # 共享内存名称（设置后本进程从共享内存读取快照，不请求上游）、容量（股票数）和检查间隔秒
+    API_WORKERS: int = 1
+    SNAPSHOT_SHM_NAME: str = ""
+    SNAPSHOT_SHM_CAPACITY: int = 8000
+    SNAPSHOT_SHM_POLL_INTERVAL: float = 1.0
+    
     # 数据库连接URL
     @property
     def database_url(self) -> str:
@@ -1,14 +1,42 @@
 """
 数据库连接模块
 """
+import time
+
 from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from .config import settings
+from app.utils.metrics import metrics
+
+# 连接池指标
+POOL_CHECKOUT_WAIT = metrics.histogram(
+    "db_pool_checkout_seconds", "从连接池获取连接的等待时间",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+)
+POOL_TIMEOUTS = metrics.counter("db_pool_timeouts_total", "获取连接超时次数")
+
+
+class InstrumentedQueuePool(QueuePool):
+    """记录连接获取等待时间的连接池"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            POOL_CHECKOUT_WAIT.observe((), time.perf_counter() - started)
+
 
 # 创建数据库引擎
 engine = create_engine(
     settings.database_url,
+    poolclass=InstrumentedQueuePool,
     pool_pre_ping=True,
     pool_recycle=3600,
     pool_size=10,
@@ -16,6 +44,15 @@ engine = create_engine(
     echo=settings.DEBUG,  # 开发环境显示SQL
 )
 
+metrics.gauge(
+    "db_pool_connections", "连接池连接数（size-配置大小, checked_out-使用中, overflow-溢出连接）", ("state",),
+    collect=lambda: {
+        ('size',): engine.pool.size(),
+        ('checked_out',): engine.pool.checkedout(),
+        ('overflow',): max(0, engine.pool.overflow()),
+    }
+)
+
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
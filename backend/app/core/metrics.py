@@ -0,0 +1,90 @@
+"""
+接口指标模块
+
+MetricsMiddleware 按路由模板记录请求耗时和状态码，并注册缓存命中、密码哈希线程池等采集指标；
+全部指标通过 /metrics 以 Prometheus 文本格式输出
+"""
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.security import password_pool
+from app.core.user_cache import user_cache
+from app.utils.cache import shared_cache
+from app.utils.metrics import metrics
+
+# Prometheus 文本格式的 Content-Type（charset 由响应类追加）
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4"
+
+REQUEST_LATENCY = metrics.histogram(
+    "http_request_seconds", "接口请求耗时", ("method", "route")
+)
+REQUEST_COUNT = metrics.counter(
+    "http_requests_total", "接口请求数", ("method", "route", "status")
+)
+
+# 按名称登记的缓存
+CACHES = {
+    'shared': shared_cache,
+    'user': user_cache,
+}
+
+metrics.gauge(
+    "cache_hits_total", "缓存命中次数", ("cache",), type_name='counter',
+    collect=lambda: {(name,): cache.hits for name, cache in CACHES.items()}
+)
+metrics.gauge(
+    "cache_misses_total", "缓存未命中次数", ("cache",), type_name='counter',
+    collect=lambda: {(name,): cache.misses for name, cache in CACHES.items()}
+)
+metrics.gauge(
+    "cache_entries", "缓存条目数", ("cache",),
+    collect=lambda: {(name,): len(cache) for name, cache in CACHES.items()}
+)
+metrics.gauge(
+    "password_pool_tasks", "密码哈希线程池任务数", ("state",),
+    collect=lambda: {
+        ('active',): password_pool.active,
+        ('pending',): password_pool.pending,
+    }
+)
+metrics.gauge(
+    "password_pool_tasks_total", "密码哈希线程池累计任务数", ("outcome",), type_name='counter',
+    collect=lambda: {
+        ('completed',): password_pool.completed,
+        ('rejected',): password_pool.rejected,
+    }
+)
+metrics.gauge(
+    "password_pool_wait_seconds_total", "密码哈希累计排队时间", type_name='counter',
+    collect=lambda: {(): password_pool.total_wait}
+)
+
+
+class MetricsMiddleware:
+    """记录接口请求耗时和状态码（路由按模板聚合，如 /api/v1/stocks/{stock_code}）"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get('route')
+            labels = (scope['method'], route.path if route is not None else 'unmatched')
+            REQUEST_LATENCY.observe(labels, time.perf_counter() - started)
+            REQUEST_COUNT.inc(labels + (status_code,))
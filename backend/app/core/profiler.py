@@ -0,0 +1,205 @@
+"""
+请求采样分析模块
+
+两种方式对线上请求做调用栈采样：
+- 管理员请求带 X-Profile: 1 头或 _profile=1 参数
+- 按路由配置采样比例（PROFILE_ROUTE_RATES，可通过管理接口调整），随机抽取请求
+
+采样在独立线程中读取事件循环线程的调用栈，请求期间同一事件循环上并发执行的其他请求也会计入。
+结果以折叠栈格式保存在 PROFILE_DIR 下，只保留最近 PROFILE_MAX_FILES 份；
+响应头 X-Profile-Id 返回结果编号，通过 /api/v1/admin/profiles 查看和下载
+"""
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs
+
+from loguru import logger
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.rate_limit import resolve_user_id
+from app.services.permissions import is_admin_cached
+from app.utils.stack_sampler import StackSampler
+
+# 结果编号格式（时间戳-随机串）
+PROFILE_ID_PATTERN = re.compile(r'^\d{20}-[0-9a-f]{8}$')
+
+
+class ProfileStore:
+    """采样结果目录（环形保留最近N份）"""
+
+    def __init__(self, directory: str, max_profiles: int = 50):
+        self.directory = Path(directory)
+        self.max_profiles = max_profiles
+
+    @staticmethod
+    def new_id() -> str:
+        return f"{datetime.now():%Y%m%d%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+
+    def save(self, profile_id: str, meta: Dict, collapsed: str):
+        """写入一份结果（折叠栈 + 元数据），并删除超出数量的旧结果"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / f"{profile_id}.collapsed").write_text(collapsed, encoding='utf-8')
+        (self.directory / f"{profile_id}.json").write_text(json.dumps(meta, ensure_ascii=False), encoding='utf-8')
+
+        metas = sorted(self.directory.glob('*.json'))
+        for old in metas[:max(0, len(metas) - self.max_profiles)]:
+            old.unlink(missing_ok=True)
+            old.with_suffix('.collapsed').unlink(missing_ok=True)
+
+    def list(self) -> List[Dict]:
+        """全部结果的元数据（最新在前）"""
+        if not self.directory.exists():
+            return []
+        result = []
+        for path in sorted(self.directory.glob('*.json'), reverse=True):
+            try:
+                result.append(json.loads(path.read_text(encoding='utf-8')))
+            except (OSError, ValueError):
+                continue
+        return result
+
+    def path(self, profile_id: str) -> Optional[Path]:
+        """结果文件路径，编号无效或已被淘汰返回None"""
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        path = self.directory / f"{profile_id}.collapsed"
+        return path if path.exists() else None
+
+
+class RequestProfiler:
+    """请求采样配置和状态"""
+
+    def __init__(
+        self,
+        store: ProfileStore,
+        interval: float = 0.005,
+        max_concurrent: int = 2,
+        route_rates: Optional[Dict[str, float]] = None
+    ):
+        """
+        Args:
+            store: 结果目录
+            interval: 采样间隔（秒）
+            max_concurrent: 同时采样的请求数上限，超出的请求不采样
+            route_rates: {路由模板: 采样比例(0~1)}，如 {"/api/v1/capital-flow/rank": 0.01}
+        """
+        self.store = store
+        self.interval = interval
+        self.max_concurrent = max_concurrent
+        self.route_rates: Dict[str, float] = dict(route_rates or {})
+        self.active = 0
+
+    def set_route_rates(self, route_rates: Dict[str, float]):
+        """更新路由采样比例（比例为0的路由移除）"""
+        self.route_rates = {route: rate for route, rate in route_rates.items() if rate > 0}
+
+
+# 全局请求采样器
+request_profiler = RequestProfiler(
+    ProfileStore(settings.PROFILE_DIR, settings.PROFILE_MAX_FILES),
+    interval=settings.PROFILE_INTERVAL,
+    max_concurrent=settings.PROFILE_MAX_CONCURRENT,
+    route_rates=settings.PROFILE_ROUTE_RATES,
+)
+
+
+def _match_route(scope: Scope) -> Optional[str]:
+    """请求对应的路由模板"""
+    app = scope.get('app')
+    for route in getattr(app, 'routes', ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return None
+
+
+def _profile_requested(scope: Scope) -> bool:
+    if Headers(scope=scope).get('x-profile', '').lower() in ('1', 'true'):
+        return True
+    query_string = scope.get('query_string', b'')
+    if b'_profile' not in query_string:
+        return False
+    values = parse_qs(query_string.decode('latin-1')).get('_profile', ())
+    return any(value.lower() in ('1', 'true') for value in values)
+
+
+class ProfilerMiddleware:
+    """请求采样中间件"""
+
+    def __init__(self, app: ASGIApp, profiler: RequestProfiler = request_profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def select(self, scope: Scope) -> Optional[str]:
+        """判断是否采样，返回触发方式（manual / sampled），不采样返回None"""
+        if self.profiler.active >= self.profiler.max_concurrent:
+            return None
+        if _profile_requested(scope):
+            user_id = resolve_user_id(Headers(scope=scope))
+            if user_id is not None and await asyncio.to_thread(is_admin_cached, user_id):
+                return 'manual'
+        if self.profiler.route_rates:
+            rate = self.profiler.route_rates.get(_match_route(scope))
+            if rate and random.random() < rate:
+                return 'sampled'
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        trigger = await self.select(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = ProfileStore.new_id()
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                MutableHeaders(raw=message['headers'])['X-Profile-Id'] = profile_id
+            await send(message)
+
+        self.profiler.active += 1
+        sampler = StackSampler(interval=self.profiler.interval)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            samples = sampler.stop()
+            duration = time.perf_counter() - started
+            self.profiler.active -= 1
+            route = scope.get('route')
+            meta = {
+                'profile_id': profile_id,
+                'method': scope['method'],
+                'path': scope['path'],
+                'route': route.path if route is not None else None,
+                'status': status_code,
+                'trigger': trigger,
+                'duration_ms': round(duration * 1000, 2),
+                'samples': sum(samples.values()),
+                'interval_ms': self.profiler.interval * 1000,
+                'created_at': datetime.now().isoformat(),
+            }
+            try:
+                await asyncio.to_thread(
+                    self.profiler.store.save, profile_id, meta, StackSampler.format_collapsed(samples)
+                )
+            except OSError as e:
+                logger.warning(f"保存采样结果失败: {e}")
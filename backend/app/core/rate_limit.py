@@ -0,0 +1,150 @@
+"""
+接口限流中间件
+
+- 携带有效令牌的请求按用户（JWT sub）限流，其他请求按客户端IP限流
+- 接口内访问东方财富的请求（缓存未命中）另受全局上游额度限制，
+  单次请求额度用完时整个请求返回429（接口内部捕获了异常也一样）；
+  批量请求一次性预留额度，不足时接口返回部分数据，不替换为429
+- 超限返回 HTTP 429 和 Retry-After
+
+RATE_LIMIT_BACKEND=redis 时令牌桶存放在 Redis 中，多个 worker 共享额度
+"""
+import math
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.security import decode_access_token
+from app.core.user_cache import user_cache
+from app.utils.metrics import metrics
+from app.utils.token_bucket import UpstreamBudget, UpstreamBudgetExceeded, budget_rejections, create_bucket_store
+
+UPSTREAM_BUSY_MESSAGE = "数据源请求繁忙，请稍后重试"
+
+RATE_LIMITED = metrics.counter("rate_limited_total", "被限流的请求数", ("bucket",))
+
+# 全局令牌桶存储
+rate_limit_store = create_bucket_store(
+    settings.RATE_LIMIT_BACKEND,
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    db=settings.REDIS_DB,
+    password=settings.REDIS_PASSWORD,
+)
+
+# 接口请求访问东方财富的全局额度
+upstream_budget = UpstreamBudget(
+    rate_limit_store,
+    rate=settings.UPSTREAM_BUDGET_RATE,
+    burst=settings.UPSTREAM_BUDGET_BURST,
+)
+
+
+def resolve_user_id(headers: Headers):
+    """从 Authorization 头解析用户ID，无有效令牌返回None"""
+    authorization = headers.get('authorization', '')
+    scheme, _, token = authorization.partition(' ')
+    if scheme.lower() != 'bearer' or not token:
+        return None
+    user = user_cache.get(token)
+    if user is not None:
+        return user.user_id
+    payload = decode_access_token(token)
+    return payload.get('sub') if payload else None
+
+
+def too_many_requests(retry_after: float, message: str = "请求过于频繁，请稍后重试") -> JSONResponse:
+    """429 响应"""
+    return JSONResponse(
+        status_code=429,
+        content={"code": 429, "message": message, "data": None},
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+class RateLimitMiddleware:
+    """按用户 / IP 的令牌桶限流中间件"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store=rate_limit_store,
+        path_prefix: str = "/api",
+        user_rate: float = 5.0,
+        user_burst: float = 20.0,
+        ip_rate: float = 10.0,
+        ip_burst: float = 40.0
+    ):
+        """
+        Args:
+            store: 令牌桶存储
+            path_prefix: 需要限流的路径前缀
+            user_rate / user_burst: 每个用户每秒请求数和突发上限
+            ip_rate / ip_burst: 每个IP每秒请求数和突发上限（未登录请求）
+        """
+        self.app = app
+        self.store = store
+        self.path_prefix = path_prefix
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.ip_rate = ip_rate
+        self.ip_burst = ip_burst
+
+    async def check(self, scope: Scope) -> float:
+        """消耗请求所属桶的令牌，返回需要等待的秒数（0 表示通过）"""
+        user_id = resolve_user_id(Headers(scope=scope))
+        if user_id is not None:
+            retry_after = await self.store.acquire(f"user:{user_id}", self.user_rate, self.user_burst)
+            bucket = 'user'
+        else:
+            client = scope.get('client')
+            ip = client[0] if client else 'unknown'
+            retry_after = await self.store.acquire(f"ip:{ip}", self.ip_rate, self.ip_burst)
+            bucket = 'ip'
+        if retry_after > 0:
+            RATE_LIMITED.inc((bucket,))
+        return retry_after
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http' or not scope['path'].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = await self.check(scope)
+        if retry_after > 0:
+            await too_many_requests(retry_after)(scope, receive, send)
+            return
+
+        rejections = []
+        token = budget_rejections.set(rejections)
+        started = False
+        replaced = False
+
+        async def send_wrapper(message: Message):
+            nonlocal started
+            if message['type'] == 'http.response.start':
+                started = True
+            await send(message)
+
+        async def send_checked(message: Message):
+            # 接口内上游额度被拒绝时，用429替换接口自身的响应
+            nonlocal replaced
+            if message['type'] == 'http.response.start' and rejections:
+                replaced = True
+                RATE_LIMITED.inc(('upstream',))
+                await too_many_requests(max(rejections), UPSTREAM_BUSY_MESSAGE)(scope, receive, send_wrapper)
+                return
+            if not replaced:
+                await send_wrapper(message)
+
+        try:
+            await self.app(scope, receive, send_checked)
+        except UpstreamBudgetExceeded as e:
+            if started:
+                raise
+            RATE_LIMITED.inc(('upstream',))
+            await too_many_requests(e.retry_after, UPSTREAM_BUSY_MESSAGE)(scope, receive, send_wrapper)
+        finally:
+            budget_rejections.reset(token)
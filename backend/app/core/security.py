@@ -1,8 +1,12 @@
 """
 安全相关工具函数
 """
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Dict, Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import settings
@@ -21,6 +25,101 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordPoolBusy(Exception):
+    """密码哈希线程池排队已满"""
+
+
+class PasswordHashPool:
+    """
+    密码哈希线程池
+
+    bcrypt 每次计算耗时约 100~300ms，直接在 async 接口中调用会阻塞事件循环。
+    放到固定大小的线程池中执行（bcrypt 计算期间释放GIL），并限制排队数量，
+    排队已满时抛出 PasswordPoolBusy
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 200):
+        """
+        Args:
+            max_workers: 线程数（同时进行的哈希计算数）
+            max_pending: 最多排队的任务数
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.active = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+
+    def _call(self, func: Callable, args: tuple, submitted_at: float) -> Any:
+        started_at = time.perf_counter()
+        with self._lock:
+            self.pending -= 1
+            self.active += 1
+            wait = started_at - submitted_at
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.completed += 1
+                self.total_run += time.perf_counter() - started_at
+
+    async def run(self, func: Callable, *args) -> Any:
+        """在线程池中执行 func(*args)"""
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordPoolBusy("密码校验请求过多，请稍后重试")
+            self.pending += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._call, func, args, time.perf_counter())
+
+    def stats(self) -> Dict[str, Any]:
+        """队列统计"""
+        with self._lock:
+            completed = self.completed
+            return {
+                'workers': self.max_workers,
+                'max_pending': self.max_pending,
+                'active': self.active,
+                'pending': self.pending,
+                'completed': completed,
+                'rejected': self.rejected,
+                'avg_wait_ms': round(self.total_wait / completed * 1000, 2) if completed else 0.0,
+                'max_wait_ms': round(self.max_wait * 1000, 2),
+                'avg_run_ms': round(self.total_run / completed * 1000, 2) if completed else 0.0,
+            }
+
+    def shutdown(self):
+        """关闭线程池"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# 全局密码哈希线程池
+password_pool = PasswordHashPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """验证密码（在密码哈希线程池中执行）"""
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """生成密码哈希（在密码哈希线程池中执行）"""
+    return await password_pool.run(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     创建JWT访问令牌
@@ -0,0 +1,188 @@
+"""
+登录用户缓存模块
+
+缓存 令牌 -> 已解析的用户，认证请求命中缓存时不再解码JWT和查询 users 表。
+- 按 LRU 淘汰，条目过期时间取 USER_CACHE_TTL 和令牌剩余有效期中较小者
+- 用户状态变化（通过 ORM 对象更新 users.status）时按用户ID失效该用户的全部令牌；
+  批量 UPDATE 或直接修改数据库不会触发，需调用 user_cache.invalidate_user
+- 登出时失效并吊销当前令牌，令牌到期前不能再使用
+
+缓存只在当前进程内有效，多进程部署时其他进程最多在 USER_CACHE_TTL 秒后感知状态变化；
+吊销记录在 RATE_LIMIT_BACKEND=redis 时同时写入 Redis，各进程每次认证都会检查，
+否则只在执行登出的进程内生效（其他进程在令牌到期前仍会接受该令牌）
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set
+
+from loguru import logger
+from sqlalchemy import event, inspect
+
+from app.core.config import settings
+from app.models.user import User
+from app.utils.cache import TTLCache
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover
+    aioredis = None
+
+# 缓存的用户字段（不含密码哈希）
+USER_CACHE_FIELDS = tuple(
+    column.key for column in User.__table__.columns if column.key != 'password_hash'
+)
+
+
+def detach_user(user: User) -> User:
+    """复制为不关联会话的用户对象，可跨请求只读使用"""
+    return User(**{field: getattr(user, field) for field in USER_CACHE_FIELDS})
+
+
+class UserCache:
+    """令牌 -> 用户 的 TTL/LRU 缓存"""
+
+    def __init__(self, max_size: int = 10000, ttl: float = 60.0, redis_client=None,
+                 revoked_prefix: str = "revoked:"):
+        """
+        Args:
+            max_size: 最多缓存的令牌数
+            ttl: 缓存时间（秒）
+            redis_client: redis.asyncio 客户端，设置时吊销记录在多进程间共享
+            revoked_prefix: 吊销记录的键前缀
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.redis_client = redis_client
+        self.revoked_prefix = revoked_prefix
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+        # 已登出的令牌，保留到令牌过期
+        self._revoked = TTLCache()
+        # 命中统计
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[User]:
+        """读取令牌对应的用户，未命中或已过期返回None"""
+        entry = self._entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            self._remove(token)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return user
+
+    def set(self, token: str, user: User, token_expires_at: Optional[float] = None):
+        """
+        写入缓存
+
+        Args:
+            token: JWT令牌
+            user: 已解析的用户
+            token_expires_at: 令牌过期时间（Unix时间戳）
+        """
+        ttl = self.ttl
+        if token_expires_at is not None:
+            ttl = min(ttl, token_expires_at - time.time())
+        if ttl <= 0:
+            return
+
+        self._remove(token)
+        self._entries[token] = (time.monotonic() + ttl, user)
+        self._tokens_by_user.setdefault(user.user_id, set()).add(token)
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, token: str):
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        user_id = entry[1].user_id
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
+
+    def invalidate_user(self, user_id: int):
+        """失效用户的全部缓存令牌"""
+        for token in list(self._tokens_by_user.get(user_id, ())):
+            self._remove(token)
+
+    def _revoked_key(self, token: str) -> str:
+        return self.revoked_prefix + hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    async def revoke(self, token: str, token_expires_at: Optional[float] = None):
+        """吊销令牌（登出），令牌到期前不能再使用"""
+        self._remove(token)
+        ttl = (token_expires_at - time.time()) if token_expires_at else settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        if ttl <= 0:
+            return
+        self._revoked.set(token, True, ttl=ttl)
+        if self.redis_client is not None:
+            try:
+                await self.redis_client.set(self._revoked_key(token), 1, ex=max(1, int(ttl) + 1))
+            except Exception as e:
+                logger.warning(f"Redis 写入令牌吊销记录失败，只在当前进程生效: {e}")
+
+    async def is_revoked(self, token: str) -> bool:
+        """令牌是否已吊销（先查本进程，再查 Redis；Redis 不可用时按未吊销处理）"""
+        if self._revoked.get(token, False):
+            return True
+        if self.redis_client is None:
+            return False
+        try:
+            revoked = bool(await self.redis_client.exists(self._revoked_key(token)))
+        except Exception as e:
+            logger.warning(f"Redis 查询令牌吊销记录失败: {e}")
+            return False
+        if revoked:
+            self._remove(token)
+        return revoked
+
+    def purge_expired(self) -> int:
+        """清理已过期的缓存，返回清理数量"""
+        now = time.monotonic()
+        expired = [token for token, (expires_at, _) in self._entries.items() if expires_at < now]
+        for token in expired:
+            self._remove(token)
+        return len(expired) + self._revoked.purge_expired()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def create_revocation_client():
+    """RATE_LIMIT_BACKEND=redis 时创建共享吊销记录的 Redis 客户端，否则返回None"""
+    if settings.RATE_LIMIT_BACKEND != "redis":
+        return None
+    if aioredis is None:
+        logger.warning("未安装 redis，令牌吊销只在当前进程生效")
+        return None
+    return aioredis.Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        db=settings.REDIS_DB,
+        password=settings.REDIS_PASSWORD,
+    )
+
+
+# 全局登录用户缓存
+user_cache = UserCache(
+    max_size=settings.USER_CACHE_SIZE,
+    ttl=settings.USER_CACHE_TTL,
+    redis_client=create_revocation_client(),
+)
+
+
+@event.listens_for(User, 'after_update')
+def _invalidate_on_status_change(mapper, connection, target: User):
+    """用户状态变化时失效缓存"""
+    if inspect(target).attrs.status.history.has_changes():
+        user_cache.invalidate_user(target.user_id)
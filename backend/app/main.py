@@ -1,9 +1,80 @@
 """
 FastAPI应用入口
 """
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from loguru import logger
+
 from app.core.config import settings
+from app.core.compression import CompressionMiddleware
+from app.core.rate_limit import RateLimitMiddleware
+from app.core.metrics import METRICS_CONTENT_TYPE, MetricsMiddleware
+from app.core.profiler import ProfilerMiddleware
+from app.core.database import SessionLocal
+from app.core.security import password_pool
+from app.utils.metrics import metrics
+from app.services.system_config import configure_eastmoney_limiter
+from app.services.user_stock_poller import UserStockPoller
+from app.services.market_snapshot import MarketSnapshotPoller, SharedSnapshotFollower, market_snapshot_store
+from app.services.limit_monitor import limit_monitor
+from app.services.holding_suggestions import HoldingSuggestionPoller
+from app.services.warmup import persist_snapshot, run_warmup, warmup_state
+
+
+def create_pollers() -> list:
+    """创建后台轮询任务"""
+    if settings.SNAPSHOT_SHM_NAME:
+        # 多进程部署：全市场快照由采集进程写入共享内存，本进程只读取；
+        # 用户股票实时数据直接取自快照，不再单独请求上游
+        return [
+            SharedSnapshotFollower(settings.SNAPSHOT_SHM_NAME, settings.SNAPSHOT_SHM_POLL_INTERVAL),
+            HoldingSuggestionPoller(),
+        ]
+    return [
+        UserStockPoller(),
+        MarketSnapshotPoller(),
+        HoldingSuggestionPoller(),
+    ]
+
+
+# 全市场快照订阅者（多进程部署时涨跌停事件由采集进程入库）
+market_snapshot_store.subscribe(limit_monitor.on_snapshot)
+limit_monitor.persist_events = not settings.SNAPSHOT_SHM_NAME
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：启动预热和后台轮询任务，退出时停止任务并保存快照"""
+    pollers = []
+    if settings.ENABLE_POLLERS:
+        db = SessionLocal()
+        try:
+            configure_eastmoney_limiter(db)
+        except Exception as e:
+            logger.warning(f"读取限流配置失败，使用默认值: {e}")
+        finally:
+            db.close()
+        
+        pollers = create_pollers()
+    
+    # 预热在后台执行（恢复快照后启动轮询任务），完成前 /health/ready 返回503；
+    # 多进程部署时快照文件由采集进程保存和恢复
+    snapshot_file = None if settings.SNAPSHOT_SHM_NAME else settings.SNAPSHOT_FILE
+    app.state.pollers = pollers
+    warmup_task = asyncio.create_task(run_warmup(pollers, snapshot_file=snapshot_file))
+    yield
+    
+    warmup_task.cancel()
+    for poller in pollers:
+        await poller.stop()
+    if snapshot_file:
+        await asyncio.to_thread(persist_snapshot)
+    password_pool.shutdown()
+
 
 # 创建FastAPI应用
 app = FastAPI(
@@ -12,8 +83,23 @@ app = FastAPI(
     description="资金流向监控分析系统",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
+# 请求采样分析（最内层，只覆盖路由处理）
+app.add_middleware(ProfilerMiddleware)
+
+# 接口限流（在CORS之内，429响应同样带跨域头）
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(
+        RateLimitMiddleware,
+        path_prefix=settings.API_V1_PREFIX,
+        user_rate=settings.RATE_LIMIT_USER_RATE,
+        user_burst=settings.RATE_LIMIT_USER_BURST,
+        ip_rate=settings.RATE_LIMIT_IP_RATE,
+        ip_burst=settings.RATE_LIMIT_IP_BURST,
+    )
+
 # 配置CORS
 app.add_middleware(
     CORSMiddleware,
@@ -23,6 +109,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 响应压缩
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.GZIP_LEVEL,
+    brotli_quality=settings.BROTLI_QUALITY,
+)
+
+# 请求指标（最外层，耗时包含压缩和限流）
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 
 @app.get("/")
 async def root():
@@ -36,20 +134,61 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """健康检查"""
+    """健康检查（进程存活即返回 ok，ready 表示启动预热是否完成）"""
+    return {"status": "ok", "ready": warmup_state.ready, "warmup": warmup_state.to_dict()}
+
+
+@app.get("/health/live")
+async def liveness_check():
+    """存活检查"""
     return {"status": "ok"}
 
 
+@app.get("/health/ready")
+async def readiness_check():
+    """就绪检查（启动预热完成前返回503）"""
+    if not warmup_state.ready:
+        return JSONResponse({"status": "warming_up", "warmup": warmup_state.to_dict()}, status_code=503)
+    return {"status": "ready"}
+
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def get_metrics():
+        """Prometheus 指标"""
+        return PlainTextResponse(metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 # 注册路由
 from app.api.v1 import router as api_router
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
 if __name__ == "__main__":
+    import os
+    import subprocess
+    import sys
     import uvicorn
-    uvicorn.run(
-        "app.main:app",
-        host="0.0.0.0",
-        port=8887,  # API端口：8887
-        reload=settings.DEBUG,
-    )
+    
+    if settings.API_WORKERS > 1:
+        # 多进程部署：一个快照采集进程 + API_WORKERS 个API进程（通过环境变量共享内存名称）
+        from app.services.collector import DEFAULT_SHM_NAME
+        os.environ['SNAPSHOT_SHM_NAME'] = settings.SNAPSHOT_SHM_NAME or DEFAULT_SHM_NAME
+        collector = subprocess.Popen([sys.executable, "-m", "app.services.collector"])
+        try:
+            uvicorn.run(
+                "app.main:app",
+                host="0.0.0.0",
+                port=8887,  # API端口：8887
+                workers=settings.API_WORKERS,
+            )
+        finally:
+            collector.terminate()
+            collector.wait(timeout=30)
+    else:
+        uvicorn.run(
+            "app.main:app",
+            host="0.0.0.0",
+            port=8887,  # API端口：8887
+            reload=settings.DEBUG,
+        )
 
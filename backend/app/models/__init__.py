@@ -1,8 +1,14 @@
 # Models package
 from app.models.stock import Stock, CapitalFlow
-from app.models.sector import Sector
+from app.models.sector import Sector, SectorStock, SectorFlow
 from app.models.user import User, UserGroup, UserGroupRelation
-from app.models.holding import Holding, Watchlist
+from app.models.holding import Holding, Watchlist, PortfolioHistory
+from app.models.system_config import SystemConfig
+from app.models.intraday import IntradayFlow
+from app.models.limit_event import LimitEvent
+from app.models.signal import FlowSignal
+from app.models.streak import FlowStreak
 
-__all__ = ["Stock", "CapitalFlow", "Sector", "User", "UserGroup", "UserGroupRelation", "Holding", "Watchlist"]
+__all__ = ["Stock", "CapitalFlow", "Sector", "SectorStock", "SectorFlow", "User", "UserGroup", "UserGroupRelation", "Holding", "Watchlist", "PortfolioHistory",
+           "SystemConfig", "IntradayFlow", "LimitEvent", "FlowSignal", "FlowStreak"]
 
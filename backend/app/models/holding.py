@@ -1,7 +1,7 @@
 """
 持股和收藏相关数据模型
 """
-from sqlalchemy import Column, Integer, String, Date, TIMESTAMP, Numeric, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Date, TIMESTAMP, BIGINT, Numeric, ForeignKey, Text, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from datetime import datetime
@@ -37,3 +37,21 @@ class Watchlist(Base):
     created_at = Column(TIMESTAMP, server_default='CURRENT_TIMESTAMP', comment='创建时间')
     updated_at = Column(TIMESTAMP, server_default='CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP', comment='更新时间')
 
+
+
+class PortfolioHistory(Base):
+    """用户持仓每日市值表（由持股和收盘价批量计算）"""
+    __tablename__ = "portfolio_history"
+    __table_args__ = (
+        UniqueConstraint('user_id', 'trade_date', name='uk_user_date'),
+    )
+    
+    history_id = Column(BIGINT, primary_key=True, autoincrement=True, comment='记录ID')
+    user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False, comment='用户ID')
+    trade_date = Column(Date, nullable=False, comment='交易日期')
+    market_value = Column(Decimal(20, 2), nullable=False, comment='持仓市值')
+    cost = Column(Decimal(20, 2), nullable=False, comment='持仓成本')
+    profit_loss = Column(Decimal(20, 2), nullable=False, comment='浮动盈亏')
+    profit_loss_rate = Column(Decimal(10, 4), comment='浮动盈亏比例(%)')
+    holding_count = Column(Integer, nullable=False, comment='持股数量')
+    created_at = Column(TIMESTAMP, server_default='CURRENT_TIMESTAMP', comment='创建时间')
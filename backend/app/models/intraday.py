@@ -0,0 +1,21 @@
+"""
+分钟级资金流向数据模型
+"""
+from sqlalchemy import Column, Integer, Date, TIMESTAMP, BIGINT, SmallInteger, LargeBinary, ForeignKey, UniqueConstraint
+from app.core.database import Base
+
+
+class IntradayFlow(Base):
+    """分钟资金流向表（每只股票每天一行，240分钟 × 5档压缩为定长数组）"""
+    __tablename__ = "intraday_flow"
+    __table_args__ = (
+        UniqueConstraint('stock_id', 'trade_date', name='uk_stock_date'),
+    )
+    
+    intraday_id = Column(BIGINT, primary_key=True, autoincrement=True, comment='记录ID')
+    stock_id = Column(Integer, ForeignKey('stocks.stock_id'), nullable=False, comment='股票ID')
+    trade_date = Column(Date, nullable=False, comment='交易日期')
+    minute_count = Column(SmallInteger, nullable=False, default=0, comment='已采集分钟数')
+    flow_data = Column(LargeBinary, nullable=False, comment='资金流向数组: float32[240][5], 档位顺序 主力/超大/大/中/小, 单位:元')
+    created_at = Column(TIMESTAMP, server_default='CURRENT_TIMESTAMP', comment='创建时间')
+    updated_at = Column(TIMESTAMP, server_default='CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP', comment='更新时间')
@@ -0,0 +1,25 @@
+"""
+涨跌停事件数据模型
+"""
+from sqlalchemy import Column, Integer, String, Date, TIMESTAMP, BIGINT, Numeric
+from app.core.database import Base
+
+Decimal = Numeric
+
+
+class LimitEvent(Base):
+    """涨跌停事件表"""
+    __tablename__ = "limit_events"
+    
+    event_id = Column(BIGINT, primary_key=True, autoincrement=True, comment='事件ID')
+    stock_id = Column(Integer, comment='股票ID')
+    stock_code = Column(String(10), nullable=False, comment='股票代码')
+    stock_name = Column(String(50), comment='股票名称')
+    trade_date = Column(Date, nullable=False, comment='交易日期')
+    event_time = Column(TIMESTAMP, nullable=False, comment='事件时间（快照时间）')
+    event_type = Column(String(20), nullable=False, comment='事件类型: limit_up-涨停, limit_up_break-炸板, limit_up_reseal-回封, limit_down-跌停, limit_down_break-翘板, limit_down_reseal-回封跌停')
+    price = Column(Decimal(10, 3), comment='事件时价格')
+    limit_price = Column(Decimal(10, 3), comment='涨跌停价')
+    change_percent = Column(Decimal(8, 4), comment='涨跌幅')
+    main_inflow = Column(Decimal(15, 2), comment='事件时主力净流入')
+    created_at = Column(TIMESTAMP, server_default='CURRENT_TIMESTAMP', comment='创建时间')
@@ -1,10 +1,13 @@
 """
 板块相关数据模型
 """
-from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Date, TIMESTAMP, JSON, BIGINT, Numeric, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
+# SQLAlchemy 2.0中使用Numeric替代Decimal
+Decimal = Numeric
+
 
 class Sector(Base):
     """板块信息表"""
@@ -27,3 +30,43 @@ class Sector(Base):
     # 关系
     # parent_sector = relationship("Sector", remote_side=[sector_id])
 
+
+
+class SectorStock(Base):
+    """板块成分股表"""
+    __tablename__ = "sector_stocks"
+    __table_args__ = (
+        UniqueConstraint('sector_id', 'stock_id', name='uk_sector_stock'),
+    )
+    
+    relation_id = Column(Integer, primary_key=True, autoincrement=True, comment='关系ID')
+    sector_id = Column(Integer, ForeignKey('sectors.sector_id'), nullable=False, comment='板块ID')
+    stock_id = Column(Integer, ForeignKey('stocks.stock_id'), nullable=False, comment='股票ID')
+    stock_code = Column(String(10), nullable=False, comment='股票代码（冗余字段，便于查询）')
+    created_at = Column(TIMESTAMP, server_default='CURRENT_TIMESTAMP', comment='加入时间')
+
+
+class SectorFlow(Base):
+    """板块每日资金流向表（由成分股资金流向聚合）"""
+    __tablename__ = "sector_flows"
+    __table_args__ = (
+        UniqueConstraint('sector_id', 'trade_date', name='uk_sector_date'),
+    )
+    
+    sector_flow_id = Column(BIGINT, primary_key=True, autoincrement=True, comment='记录ID')
+    sector_id = Column(Integer, ForeignKey('sectors.sector_id'), nullable=False, comment='板块ID')
+    trade_date = Column(Date, nullable=False, comment='交易日期')
+    main_inflow = Column(Decimal(20, 2), comment='主力净流入合计')
+    super_inflow = Column(Decimal(20, 2), comment='超大单净流入合计')
+    large_inflow = Column(Decimal(20, 2), comment='大单净流入合计')
+    medium_inflow = Column(Decimal(20, 2), comment='中单净流入合计')
+    small_inflow = Column(Decimal(20, 2), comment='小单净流入合计')
+    amount = Column(Decimal(20, 2), comment='成交额合计')
+    inflow_ratio = Column(Decimal(10, 6), comment='主力净流入/成交额')
+    avg_change_percent = Column(Decimal(10, 4), comment='成分股平均涨跌幅(%)')
+    breadth = Column(Decimal(6, 4), comment='主力净流入的成分股占比')
+    momentum = Column(Decimal(10, 6), comment='近N日主力净流入/成交额')
+    flow_rank = Column(Integer, comment='同类型板块主力净流入排名')
+    rank_change = Column(Integer, comment='排名变化（正数为上升）')
+    stock_count = Column(Integer, comment='有数据的成分股数量')
+    created_at = Column(TIMESTAMP, server_default='CURRENT_TIMESTAMP', comment='创建时间')
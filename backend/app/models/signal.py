@@ -0,0 +1,28 @@
+"""
+资金流入异动信号数据模型
+"""
+from sqlalchemy import Column, Integer, String, Date, TIMESTAMP, BIGINT, Numeric, ForeignKey, UniqueConstraint
+from app.core.database import Base
+
+Decimal = Numeric
+
+
+class FlowSignal(Base):
+    """资金流入异动信号表"""
+    __tablename__ = "flow_signals"
+    __table_args__ = (
+        UniqueConstraint('stock_id', 'trade_date', name='uk_stock_date'),
+    )
+    
+    signal_id = Column(BIGINT, primary_key=True, autoincrement=True, comment='信号ID')
+    stock_id = Column(Integer, ForeignKey('stocks.stock_id'), nullable=False, comment='股票ID')
+    trade_date = Column(Date, nullable=False, comment='交易日期')
+    main_inflow = Column(Decimal(15, 2), comment='当日主力净流入')
+    main_z = Column(Decimal(10, 4), comment='主力净流入 z-score')
+    super_z = Column(Decimal(10, 4), comment='超大单净流入 z-score')
+    inflow_ratio = Column(Decimal(10, 6), comment='主力净流入/成交额')
+    inflow_ratio_z = Column(Decimal(10, 4), comment='主力净流入/成交额 z-score')
+    divergence = Column(Decimal(10, 6), comment='档位背离强度: (超大单-小单)/成交额')
+    signal_types = Column(String(100), nullable=False, comment='触发的信号类型,逗号分隔')
+    score = Column(Decimal(10, 4), comment='综合得分')
+    created_at = Column(TIMESTAMP, server_default='CURRENT_TIMESTAMP', comment='创建时间')
@@ -0,0 +1,20 @@
+"""
+连续资金流入状态数据模型
+"""
+from sqlalchemy import Column, Integer, Date, TIMESTAMP, BIGINT, Numeric, ForeignKey
+from app.core.database import Base
+
+Decimal = Numeric
+
+
+class FlowStreak(Base):
+    """主力连续净流入状态表（每只股票一行，按交易日增量更新）"""
+    __tablename__ = "flow_streaks"
+    
+    stock_id = Column(Integer, ForeignKey('stocks.stock_id'), primary_key=True, comment='股票ID')
+    last_trade_date = Column(Date, nullable=False, comment='最后更新的交易日')
+    current_streak = Column(Integer, nullable=False, default=0, comment='当前连续主力净流入天数')
+    streak_amount = Column(Decimal(20, 2), nullable=False, default=0, comment='当前连续流入期间累计主力净流入')
+    window_bits = Column(BIGINT, nullable=False, default=0, comment='最近60个交易日是否主力净流入（最低位为最近一日）')
+    window_count = Column(Integer, nullable=False, default=0, comment='最近20个交易日主力净流入天数')
+    updated_at = Column(TIMESTAMP, server_default='CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP', comment='更新时间')
@@ -0,0 +1,16 @@
+"""
+系统配置数据模型
+"""
+from sqlalchemy import Column, String, Text, TIMESTAMP
+from app.core.database import Base
+
+
+class SystemConfig(Base):
+    """系统配置表"""
+    __tablename__ = "system_config"
+    
+    config_key = Column(String(100), primary_key=True, comment='配置键')
+    config_value = Column(String(255), nullable=False, comment='配置值')
+    config_type = Column(String(50), nullable=False, comment='配置类型: int, float, string, json')
+    description = Column(Text, comment='配置说明')
+    updated_at = Column(TIMESTAMP, server_default='CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP', comment='更新时间')
@@ -50,5 +50,7 @@ class UserGroupRelation(Base):
     relation_id = Column(Integer, primary_key=True, autoincrement=True, comment='关系ID')
     user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False, comment='用户ID')
     group_id = Column(Integer, ForeignKey('user_groups.group_id'), nullable=False, comment='组ID')
+    expires_at = Column(TIMESTAMP, comment='过期时间')
+    status = Column(String(20), default='active', comment='关系状态: active-有效, expired-已过期')
     created_at = Column(TIMESTAMP, server_default='CURRENT_TIMESTAMP', comment='创建时间')
 
@@ -0,0 +1,484 @@
+"""
+资金流向策略回测模块
+
+策略由入场 / 出场规则定义，规则作用于 capital_flow 的数值列：
+- 每条规则先对列做变换（原值、N日合计、N日均值、N日合计的 z-score、横截面百分位），再与阈值比较
+- 入场规则全部满足时买入（按第一条入场规则的特征值从高到低，受最大持仓数限制），
+  任一出场规则满足或持有天数达到上限时卖出
+- 以收盘价成交，等权持仓，持仓收益取次日 change_percent
+
+特征按整表（股票 × 交易日）一次计算，逐日只做横截面的向量运算；
+参数组合扫描按进程池分片执行，各进程通过内存映射共享同一份面板数据
+"""
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from app.services.flow_panel import FlowPanel, FLOW_COLUMNS
+
+# 年化使用的交易日数
+TRADING_DAYS_PER_YEAR = 250
+
+# 规则支持的变换
+RULE_TRANSFORMS = ('value', 'sum', 'mean', 'zscore', 'rank_pct')
+
+# 规则支持的比较运算
+RULE_OPERATORS = {
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '<': np.less,
+    '<=': np.less_equal,
+}
+
+# z-score 默认基准窗口
+DEFAULT_BASELINE = 20
+
+# 内置策略（以 $ 开头的值在运行时替换为参数）
+BUILTIN_STRATEGIES = {
+    'main_spike': {
+        'description': 'N日主力净流入合计 z-score 异动买入，3日主力净流出或持有期满卖出',
+        'params': {'window': 5, 'z': 2.0, 'hold_days': 10, 'max_positions': 20},
+        'entry': [
+            {'column': 'main_inflow', 'transform': 'zscore', 'window': '$window', 'op': '>=', 'value': '$z'},
+        ],
+        'exit': [
+            {'column': 'main_inflow', 'transform': 'sum', 'window': 3, 'op': '<', 'value': 0},
+        ],
+        'max_hold_days': '$hold_days',
+        'max_positions': '$max_positions',
+    },
+    'main_rate_top': {
+        'description': 'N日主力净流入占比均值位于横截面前列且当日上涨买入',
+        'params': {'window': 5, 'pct': 0.95, 'hold_days': 5, 'max_positions': 30},
+        'entry': [
+            {'column': 'main_inflow_rate', 'transform': 'mean', 'window': '$window', 'op': '>=', 'value': 0},
+            {'column': 'main_inflow_rate', 'transform': 'rank_pct', 'window': '$window', 'op': '>=', 'value': '$pct'},
+            {'column': 'change_percent', 'transform': 'value', 'op': '>', 'value': 0},
+        ],
+        'exit': [
+            {'column': 'main_inflow_rate', 'transform': 'rank_pct', 'window': '$window', 'op': '<', 'value': 0.5},
+        ],
+        'max_hold_days': '$hold_days',
+        'max_positions': '$max_positions',
+    },
+}
+
+
+# ========== 策略定义 ==========
+
+def resolve_strategy(strategy: Dict, params: Optional[Dict] = None) -> Dict:
+    """用参数替换策略中以 $ 开头的占位值"""
+    values = {**strategy.get('params', {}), **(params or {})}
+
+    def _resolve(item):
+        if isinstance(item, str) and item.startswith('$'):
+            name = item[1:]
+            if name not in values:
+                raise ValueError(f"策略参数未定义: {name}")
+            return values[name]
+        if isinstance(item, dict):
+            return {key: _resolve(value) for key, value in item.items()}
+        if isinstance(item, list):
+            return [_resolve(value) for value in item]
+        return item
+
+    resolved = _resolve({key: value for key, value in strategy.items() if key != 'params'})
+    resolved['params'] = values
+    return resolved
+
+
+def validate_strategy(strategy: Dict):
+    """检查策略定义，返回策略用到的数据列"""
+    if not strategy.get('entry'):
+        raise ValueError("策略缺少入场规则")
+
+    columns = set()
+    for rule in strategy['entry'] + strategy.get('exit', []):
+        if rule.get('column') not in FLOW_COLUMNS:
+            raise ValueError(f"无效的数据列: {rule.get('column')}")
+        if rule.get('transform', 'value') not in RULE_TRANSFORMS:
+            raise ValueError(f"无效的变换: {rule.get('transform')}")
+        if rule.get('op') not in RULE_OPERATORS:
+            raise ValueError(f"无效的比较运算: {rule.get('op')}")
+        columns.add(rule['column'])
+    return columns
+
+
+def expand_param_grid(grid: Optional[Dict[str, List]]) -> List[Dict]:
+    """展开参数网格为参数组合列表"""
+    if not grid:
+        return [{}]
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+# ========== 特征计算 ==========
+
+def rolling_sum(matrix: np.ndarray, window: int) -> np.ndarray:
+    """沿交易日方向的N日合计（NaN 按0计，不足N日的位置为NaN）"""
+    cumsum = np.cumsum(np.nan_to_num(matrix), axis=1)
+    result = np.full(matrix.shape, np.nan, dtype=np.float64)
+    if window <= matrix.shape[1]:
+        result[:, window - 1] = cumsum[:, window - 1]
+        result[:, window:] = cumsum[:, window:] - cumsum[:, :-window]
+    return result
+
+
+def cross_section_rank_pct(matrix: np.ndarray) -> np.ndarray:
+    """每个交易日的横截面百分位（0~1，NaN 不参与排名）"""
+    missing = np.isnan(matrix)
+    # 转置为 (交易日 × 股票) 的连续数组后按行排序，排名由排序结果直接回填，不做第二次排序
+    filled = np.ascontiguousarray(np.where(missing, np.inf, matrix).T)
+    order = np.argsort(filled, axis=1)
+    ranks = np.empty(filled.shape, dtype=np.float64)
+    np.put_along_axis(ranks, order, np.broadcast_to(np.arange(filled.shape[1], dtype=np.float64), filled.shape), axis=1)
+
+    valid_count = filled.shape[1] - missing.sum(axis=0)
+    result = ranks.T / np.maximum(valid_count - 1, 1)
+    result[missing] = np.nan
+    return result
+
+
+def rolling_zscore(matrix: np.ndarray, window: int) -> np.ndarray:
+    """
+    每个交易日相对前 window 个交易日的 z-score
+
+    与 flow_signals.rolling_zscore 口径一致，但用累计和计算均值和方差，
+    多年全市场面板上不需要展开 (股票 × 交易日 × 窗口) 的中间数组
+    """
+    valid = ~np.isnan(matrix)
+    values = np.where(valid, matrix, 0.0)
+
+    def _window_sum(array):
+        cumsum = np.concatenate([np.zeros((array.shape[0], 1)), np.cumsum(array, axis=1)], axis=1)
+        # 第 t 列为 [t-window, t) 的合计
+        result = np.full(array.shape, np.nan, dtype=np.float64)
+        result[:, window:] = cumsum[:, window:-1] - cumsum[:, :-window - 1]
+        return result
+
+    count = _window_sum(valid.astype(np.float64))
+    total = _window_sum(values)
+    total_sq = _window_sum(values * values)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+        std = np.sqrt(np.maximum(total_sq / count - mean * mean, 0.0))
+        z = (matrix - mean) / std
+    z[~(count >= max(2, window // 2)) | ~(std > 1e-12 * np.abs(mean) + 1e-12)] = np.nan
+    return z
+
+
+class FeatureCache:
+    """规则特征缓存（同一面板上的多组参数共享相同变换的结果）"""
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.columns = columns
+        self._cache: Dict[Tuple, np.ndarray] = {}
+
+    def get(self, rule: Dict) -> np.ndarray:
+        transform = rule.get('transform', 'value')
+        window = int(rule.get('window', 1))
+        baseline = int(rule.get('baseline', DEFAULT_BASELINE))
+        key = (rule['column'], transform, window, baseline if transform == 'zscore' else None)
+
+        if key not in self._cache:
+            values = self.columns[rule['column']]
+            if transform == 'value':
+                feature = values
+            elif transform == 'sum':
+                feature = rolling_sum(values, window)
+            elif transform == 'mean':
+                feature = rolling_sum(values, window) / window
+            elif transform == 'zscore':
+                feature = rolling_zscore(rolling_sum(values, window), baseline)
+            else:
+                feature = cross_section_rank_pct(rolling_sum(values, window))
+            self._cache[key] = feature
+        return self._cache[key]
+
+    def evaluate(self, rule: Dict) -> np.ndarray:
+        """规则在全部股票、全部交易日上的布尔结果（NaN 视为不满足）"""
+        with np.errstate(invalid='ignore'):
+            return RULE_OPERATORS[rule['op']](self.get(rule), float(rule['value']))
+
+
+# ========== 回测 ==========
+
+def simulate(
+    entry: np.ndarray,
+    exit_: np.ndarray,
+    rank_values: np.ndarray,
+    returns: np.ndarray,
+    max_hold_days: int,
+    max_positions: Optional[int],
+    cost_rate: float
+) -> Dict[str, np.ndarray]:
+    """
+    逐日模拟持仓
+
+    Args:
+        entry / exit_: 入场 / 出场信号（股票 × 交易日）
+        rank_values: 入场排序依据（股票 × 交易日）
+        returns: 日收益率（股票 × 交易日），NaN 按0计
+        max_hold_days: 最长持有交易日数
+        max_positions: 最大持仓数，None 表示不限制
+        cost_rate: 单边交易成本
+
+    Returns:
+        {'daily_return', 'positions', 'trades'}，均为长度为交易日数的数组
+    """
+    stocks, days = entry.shape
+    returns = np.nan_to_num(returns)
+    held = np.zeros(stocks, dtype=bool)
+    age = np.zeros(stocks, dtype=np.int64)
+
+    daily_return = np.zeros(days, dtype=np.float64)
+    positions = np.zeros(days, dtype=np.int64)
+    trades = np.zeros(days, dtype=np.int64)
+
+    for t in range(days):
+        # 当日收益：上一交易日收盘持有的股票
+        held_count = int(held.sum())
+        if held_count:
+            daily_return[t] = returns[held, t].mean()
+
+        # 收盘调仓
+        age[held] += 1
+        exits = held & (exit_[:, t] | (age >= max_hold_days))
+        held &= ~exits
+
+        candidates = np.flatnonzero(entry[:, t] & ~held)
+        if max_positions is not None:
+            slots = max(max_positions - int(held.sum()), 0)
+            if len(candidates) > slots:
+                order = np.argsort(-np.nan_to_num(rank_values[candidates, t], nan=-np.inf), kind='stable')
+                candidates = candidates[order[:slots]]
+        held[candidates] = True
+        age[candidates] = 0
+
+        traded = int(exits.sum()) + len(candidates)
+        new_count = int(held.sum())
+        if traded:
+            daily_return[t] -= cost_rate * traded / max(held_count, new_count, 1)
+        positions[t] = new_count
+        trades[t] = traded
+
+    return {'daily_return': daily_return, 'positions': positions, 'trades': trades}
+
+
+def compute_stats(daily_return: np.ndarray, positions: np.ndarray, trades: np.ndarray) -> Dict:
+    """计算回测统计指标"""
+    days = len(daily_return)
+    equity = np.cumprod(1 + daily_return)
+    total_return = float(equity[-1] - 1) if days else 0.0
+    years = days / TRADING_DAYS_PER_YEAR
+
+    annual_return = (1 + total_return) ** (1 / years) - 1 if years > 0 and total_return > -1 else None
+    annual_vol = float(daily_return.std() * np.sqrt(TRADING_DAYS_PER_YEAR)) if days > 1 else None
+    sharpe = (
+        float(daily_return.mean() / daily_return.std() * np.sqrt(TRADING_DAYS_PER_YEAR))
+        if days > 1 and daily_return.std() > 0 else None
+    )
+    drawdown = equity / np.maximum.accumulate(equity) - 1 if days else np.zeros(0)
+    active = positions[:-1] > 0 if days > 1 else np.zeros(0, dtype=bool)
+    active_returns = daily_return[1:][active]
+
+    return {
+        'total_return': round(total_return, 6),
+        'annual_return': round(float(annual_return), 6) if annual_return is not None else None,
+        'annual_volatility': round(annual_vol, 6) if annual_vol is not None else None,
+        'sharpe': round(sharpe, 4) if sharpe is not None else None,
+        'max_drawdown': round(float(drawdown.min()), 6) if days else None,
+        'win_rate': round(float((active_returns > 0).mean()), 4) if len(active_returns) else None,
+        'exposure': round(float((positions > 0).mean()), 4) if days else None,
+        'avg_positions': round(float(positions.mean()), 2) if days else None,
+        'trades': int(trades.sum()),
+    }
+
+
+def run_strategy(
+    strategy: Dict,
+    features: FeatureCache,
+    returns: np.ndarray,
+    cost_rate: float = 0.0
+) -> Dict:
+    """
+    运行一个已替换参数的策略
+
+    Returns:
+        {'params', 'stats', 'equity', 'runtime_seconds'}
+    """
+    started = time.perf_counter()
+    shape = returns.shape
+
+    entry = np.ones(shape, dtype=bool)
+    for rule in strategy['entry']:
+        entry &= features.evaluate(rule)
+
+    exit_ = np.zeros(shape, dtype=bool)
+    for rule in strategy.get('exit', []):
+        exit_ |= features.evaluate(rule)
+
+    max_positions = strategy.get('max_positions')
+    result = simulate(
+        entry,
+        exit_,
+        features.get(strategy['entry'][0]),
+        returns,
+        max_hold_days=int(strategy.get('max_hold_days', 10)),
+        max_positions=int(max_positions) if max_positions else None,
+        cost_rate=cost_rate,
+    )
+
+    return {
+        'params': strategy['params'],
+        'stats': compute_stats(result['daily_return'], result['positions'], result['trades']),
+        'equity': np.cumprod(1 + result['daily_return']).round(6).tolist(),
+        'runtime_seconds': round(time.perf_counter() - started, 4),
+    }
+
+
+# ========== 面板共享与进程池 ==========
+
+def save_panel_arrays(panel: FlowPanel, directory: str, columns) -> str:
+    """把面板保存为 .npy 文件，供工作进程内存映射读取"""
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, 'stock_ids.npy'), panel.stock_ids)
+    np.save(os.path.join(directory, 'dates.npy'), np.array([d.toordinal() for d in panel.dates], dtype=np.int64))
+    for column in columns:
+        np.save(os.path.join(directory, f'{column}.npy'), panel[column])
+    return directory
+
+
+def load_panel_arrays(directory: str, columns) -> FlowPanel:
+    """以内存映射方式读取 save_panel_arrays 保存的面板"""
+    dates = np.load(os.path.join(directory, 'dates.npy'))
+    return FlowPanel(
+        np.load(os.path.join(directory, 'stock_ids.npy')),
+        [date.fromordinal(int(ordinal)) for ordinal in dates],
+        {column: np.load(os.path.join(directory, f'{column}.npy'), mmap_mode='r') for column in columns}
+    )
+
+
+def daily_returns(panel: FlowPanel) -> np.ndarray:
+    """日收益率：change_percent / 100"""
+    return np.asarray(panel['change_percent'], dtype=np.float64) / 100
+
+
+# 工作进程内的面板与特征缓存
+_worker_features: Optional[FeatureCache] = None
+_worker_returns: Optional[np.ndarray] = None
+
+
+def _init_worker(directory: str, columns):
+    global _worker_features, _worker_returns
+    panel = load_panel_arrays(directory, columns)
+    _worker_features = FeatureCache(panel.columns)
+    _worker_returns = daily_returns(panel)
+
+
+def _run_in_worker(task: Tuple[Dict, float]) -> Dict:
+    strategy, cost_rate = task
+    return run_strategy(strategy, _worker_features, _worker_returns, cost_rate)
+
+
+def run_sweep(
+    strategy: Dict,
+    panel: FlowPanel,
+    grid: Optional[Dict[str, List]] = None,
+    cost_rate: float = 0.0,
+    workers: Optional[int] = None,
+    work_dir: str = 'backtest_results/.panel'
+) -> Dict:
+    """
+    对参数网格运行回测
+
+    参数组合按进程池分片执行；只有一个组合或 workers=1 时在当前进程运行
+
+    Returns:
+        {'dates', 'results', 'runtime_seconds', 'years', 'seconds_per_strategy_year'}
+    """
+    combos = [resolve_strategy(strategy, params) for params in expand_param_grid(grid)]
+    columns = set(['change_percent'])
+    for combo in combos:
+        columns |= validate_strategy(combo)
+    columns = sorted(columns)
+
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(combos))
+
+    if workers <= 1:
+        features = FeatureCache(panel.columns)
+        returns = daily_returns(panel)
+        results = [run_strategy(combo, features, returns, cost_rate) for combo in combos]
+    else:
+        save_panel_arrays(panel, work_dir, columns)
+        chunksize = max(1, len(combos) // (workers * 4))
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(work_dir, columns)
+        ) as executor:
+            results = list(executor.map(
+                _run_in_worker, [(combo, cost_rate) for combo in combos], chunksize=chunksize
+            ))
+
+    runtime = time.perf_counter() - started
+    years = len(panel.dates) / TRADING_DAYS_PER_YEAR
+    strategy_years = years * len(combos)
+    logger.info(
+        f"回测完成，参数组合: {len(combos)}，交易日: {len(panel.dates)}，进程数: {max(workers, 1)}，"
+        f"耗时: {runtime:.2f}s"
+    )
+
+    return {
+        'dates': [d.isoformat() for d in panel.dates],
+        'results': results,
+        'runtime_seconds': round(runtime, 3),
+        'years': round(years, 3),
+        'seconds_per_strategy_year': round(runtime / strategy_years, 4) if strategy_years else None,
+    }
+
+
+def write_sweep_output(output_dir: str, name: str, sweep: Dict) -> Tuple[str, str]:
+    """
+    保存回测结果
+
+    - summary.json: 各参数组合的参数、统计指标和耗时
+    - equity.csv: 净值曲线（行为交易日，列为参数组合序号）
+
+    Returns:
+        (summary 路径, equity 路径)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    summary_path = os.path.join(output_dir, f'{name}_summary.json')
+    equity_path = os.path.join(output_dir, f'{name}_equity.csv')
+
+    summary = {
+        'strategy': name,
+        'start_date': sweep['dates'][0] if sweep['dates'] else None,
+        'end_date': sweep['dates'][-1] if sweep['dates'] else None,
+        'runtime_seconds': sweep['runtime_seconds'],
+        'years': sweep['years'],
+        'seconds_per_strategy_year': sweep['seconds_per_strategy_year'],
+        'results': [
+            {'index': i, 'params': result['params'], 'stats': result['stats'],
+             'runtime_seconds': result['runtime_seconds']}
+            for i, result in enumerate(sweep['results'])
+        ],
+    }
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    with open(equity_path, 'w', encoding='utf-8') as f:
+        f.write(','.join(['trade_date'] + [str(i) for i in range(len(sweep['results']))]) + '\n')
+        for day, trade_date in enumerate(sweep['dates']):
+            f.write(','.join([trade_date] + [str(result['equity'][day]) for result in sweep['results']]) + '\n')
+
+    return summary_path, equity_path
@@ -0,0 +1,78 @@
+"""
+快照采集进程（多进程部署）
+
+只有本进程请求东方财富获取全市场快照，写入共享内存供各API进程零拷贝读取，
+并负责涨跌停事件入库和快照本地文件的保存/恢复；API进程数增加时上游请求量和快照内存占用不变。
+
+启动方式：
+    python -m app.services.collector
+    SNAPSHOT_SHM_NAME=flowinsight_snapshot uvicorn app.main:app --workers 4
+或设置 API_WORKERS>1 后运行 python -m app.main，由其启动本进程和API进程
+"""
+import asyncio
+import signal
+
+from loguru import logger
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.limit_monitor import limit_monitor
+from app.services.market_snapshot import MarketSnapshotPoller, SharedSnapshotPublisher, market_snapshot_store
+from app.services.system_config import configure_eastmoney_limiter
+from app.services.warmup import load_persisted_snapshot, persist_snapshot
+
+# 未配置 SNAPSHOT_SHM_NAME 时使用的共享内存名称
+DEFAULT_SHM_NAME = "flowinsight_snapshot"
+
+
+async def run_collector(stop: asyncio.Event, shm_name: str):
+    """运行采集任务直到 stop 置位"""
+    db = SessionLocal()
+    try:
+        configure_eastmoney_limiter(db)
+    except Exception as e:
+        logger.warning(f"读取限流配置失败，使用默认值: {e}")
+    finally:
+        db.close()
+
+    publisher = SharedSnapshotPublisher(shm_name, settings.SNAPSHOT_SHM_CAPACITY)
+    market_snapshot_store.subscribe(publisher.on_snapshot)
+    market_snapshot_store.subscribe(limit_monitor.on_snapshot)
+    logger.info(f"快照采集进程已启动，共享内存: {shm_name}，容量: {settings.SNAPSHOT_SHM_CAPACITY}")
+
+    # 先发布本地保存的快照，API进程启动后立即可读
+    if settings.SNAPSHOT_FILE:
+        try:
+            snapshot = await asyncio.to_thread(load_persisted_snapshot, settings.SNAPSHOT_FILE, settings.SNAPSHOT_MAX_AGE)
+            if snapshot is not None:
+                await market_snapshot_store.publish(snapshot)
+                logger.info(f"已恢复本地快照，股票数: {len(snapshot)}")
+        except Exception as e:
+            logger.warning(f"恢复本地快照失败: {e}")
+
+    poller = MarketSnapshotPoller()
+    poller.start()
+    try:
+        await stop.wait()
+    finally:
+        await poller.stop()
+        await asyncio.to_thread(persist_snapshot)
+        publisher.close()
+        logger.info("快照采集进程已退出")
+
+
+def main():
+    shm_name = settings.SNAPSHOT_SHM_NAME or DEFAULT_SHM_NAME
+
+    async def _main():
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        await run_collector(stop, shm_name)
+
+    asyncio.run(_main())
+
+
+if __name__ == "__main__":
+    main()
@@ -3,31 +3,72 @@
 """
 import httpx
 import asyncio
-from typing import Optional, Dict, List, Any
+import time
+from typing import Optional, Dict, List, Any, Callable, Awaitable
 from datetime import datetime, date
 from loguru import logger
 
+from app.utils.metrics import metrics
+from app.utils.rate_limiter import AsyncRateLimiter
+from app.utils.token_bucket import UpstreamBudget
+
+
+# 上游请求指标（按接口路径）
+UPSTREAM_LATENCY = metrics.histogram(
+    "upstream_request_seconds", "东方财富接口请求耗时（不含限流等待）", ("endpoint",)
+)
+UPSTREAM_REQUESTS = metrics.counter(
+    "upstream_requests_total", "东方财富接口请求数", ("endpoint", "outcome")
+)
+
+
+def _endpoint_of(url: str) -> str:
+    """URL 中的接口路径（指标标签）"""
+    return '/' + url.split('//', 1)[-1].partition('/')[2]
+
 
 class EastMoneyAPI:
     """东方财富API封装类"""
     
     def __init__(self, base_url: str = "http://push2.eastmoney.com", 
-                 history_url: str = "http://push2his.eastmoney.com"):
+                 history_url: str = "http://push2his.eastmoney.com",
+                 limiter: Optional[AsyncRateLimiter] = None,
+                 budget: Optional[UpstreamBudget] = None):
         """
         初始化API客户端
         
         Args:
             base_url: 实时数据API基础URL
             history_url: 历史数据API基础URL
+            limiter: 请求限流器（采集任务传入共享限流器，为None时不限流）
+            budget: 上游请求额度（接口请求传入全局额度，用完时抛出 UpstreamBudgetExceeded）
         """
         self.base_url = base_url
         self.history_url = history_url
+        self.limiter = limiter
+        self.budget = budget
+        # 已通过 reserve_budget 预留、尚未使用的请求数
+        self._reserved_calls = 0
         self.client = httpx.AsyncClient(timeout=30.0)
     
     async def close(self):
         """关闭HTTP客户端"""
         await self.client.aclose()
     
+    async def reserve_budget(self, calls: int) -> bool:
+        """
+        批量请求前一次性预留上游额度，预留成功后这批请求不再逐个消耗额度
+
+        Returns:
+            是否预留成功（没有额度限制时总是成功），失败时调用方跳过上游请求、返回已有数据
+        """
+        if self.budget is None:
+            return True
+        if not await self.budget.reserve(calls):
+            return False
+        self._reserved_calls += calls
+        return True
+    
     async def _request(self, url: str, params: Optional[Dict] = None) -> Optional[Dict]:
         """
         发送HTTP请求
@@ -38,11 +79,25 @@ class EastMoneyAPI:
             
         Returns:
             响应数据字典，失败返回None
+            
+        Raises:
+            UpstreamBudgetExceeded: 上游请求额度已用完
         """
+        if self._reserved_calls > 0:
+            self._reserved_calls -= 1
+        elif self.budget is not None:
+            await self.budget.acquire()
+        
+        endpoint = _endpoint_of(url)
         try:
-            response = await self.client.get(url, params=params)
+            if self.limiter is not None:
+                async with self.limiter:
+                    response = await self._get(endpoint, url, params)
+            else:
+                response = await self._get(endpoint, url, params)
             response.raise_for_status()
             data = response.json()
+            UPSTREAM_REQUESTS.inc((endpoint, 'success'))
             
             # 东方财富API通常返回格式: {"rc": 0, "rt": ..., "data": {...}}
             if isinstance(data, dict) and data.get("rc") == 0:
@@ -50,9 +105,18 @@ class EastMoneyAPI:
             return data
             
         except Exception as e:
+            UPSTREAM_REQUESTS.inc((endpoint, 'error'))
             logger.error(f"API请求失败: {url}, 错误: {e}")
             return None
     
+    async def _get(self, endpoint: str, url: str, params: Optional[Dict]) -> httpx.Response:
+        """发送GET请求并记录耗时"""
+        started = time.perf_counter()
+        try:
+            return await self.client.get(url, params=params)
+        finally:
+            UPSTREAM_LATENCY.observe((endpoint,), time.perf_counter() - started)
+    
     # ========== 实时数据API ==========
     
     async def get_realtime_capital_flow_rank(
@@ -91,6 +155,38 @@ class EastMoneyAPI:
         
         return await self._request(url, params)
     
+    async def get_market_snapshot_page(
+        self,
+        page: int = 1,
+        page_size: int = 100
+    ) -> Optional[Dict]:
+        """
+        获取全市场行情快照（分页，按代码排序）
+        
+        在排行榜字段基础上增加开高低收和成交数据，供全市场快照使用
+        
+        Args:
+            page: 页码
+            page_size: 每页数量
+            
+        Returns:
+            快照数据（与排行榜相同的 diff 格式）
+        """
+        url = f"{self.base_url}/api/qt/clist/get"
+        params = {
+            'pn': page,
+            'pz': page_size,
+            'po': 0,  # 排序方式：0-升序
+            'np': 1,
+            'fltt': 2,
+            'invt': 2,
+            'fid': 'f12',
+            'fs': 'm:0+t:6,m:0+t:80,m:1+t:2,m:1+t:23',  # 全市场
+            'fields': 'f12,f14,f2,f3,f5,f6,f15,f16,f17,f18,f62,f184,f66,f69,f72,f75,f78,f81,f84,f87,f124,f1,f13'
+        }
+        
+        return await self._request(url, params)
+    
     async def get_stock_realtime_flow(
         self, 
         stock_code: str, 
@@ -144,6 +240,26 @@ class EastMoneyAPI:
         
         return await self._request(url, params)
     
+    async def get_stocks_realtime_batch(self, secids: List[str]) -> Optional[Dict]:
+        """
+        批量获取多只股票的实时行情和资金流向
+        
+        Args:
+            secids: 东财证券ID列表（如：1.600118），单次建议不超过100个
+            
+        Returns:
+            与排行榜相同格式的数据（可直接用 parse_rank_data 解析）
+        """
+        url = f"{self.base_url}/api/qt/ulist.np/get"
+        params = {
+            'fltt': 2,
+            'invt': 2,
+            'secids': ','.join(secids),
+            'fields': 'f12,f14,f2,f3,f62,f184,f66,f69,f72,f75,f78,f81,f84,f87,f204,f205,f124,f1,f13'
+        }
+        
+        return await self._request(url, params)
+    
     # ========== 历史数据API ==========
     
     async def get_stock_capital_flow_history(
@@ -231,17 +347,55 @@ class EastMoneyAPI:
         
         return result
     
+    def parse_intraday_flow_data(self, klines: List[str]) -> List[Dict]:
+        """
+        解析分钟级资金流向数据
+        
+        Args:
+            klines: 原始数据列表（每行格式：时间,主力,小单,中单,大单,超大单）
+            
+        Returns:
+            解析后的数据列表（各档位为当日累计净流入）
+        """
+        result = []
+        for line in klines:
+            if not line:
+                continue
+            
+            fields = line.split(',')
+            if len(fields) < 6:
+                continue
+            
+            try:
+                result.append({
+                    'time': fields[0],  # 时间（YYYY-MM-DD HH:MM）
+                    'main_inflow': float(fields[1]) if fields[1] else 0,  # 主力净流入
+                    'small_inflow': float(fields[2]) if fields[2] else 0,  # 小单净流入
+                    'medium_inflow': float(fields[3]) if fields[3] else 0,  # 中单净流入
+                    'large_inflow': float(fields[4]) if fields[4] else 0,  # 大单净流入
+                    'super_inflow': float(fields[5]) if fields[5] else 0,  # 超大单净流入
+                })
+            except (ValueError, IndexError) as e:
+                logger.warning(f"解析分钟资金流向失败: {line}, 错误: {e}")
+                continue
+        
+        return result
+    
     # ========== 板块数据API ==========
     
     async def get_sector_capital_flow(
         self,
-        sector_type: str = 'industry'  # industry-行业, concept-概念, area-地域
+        sector_type: str = 'industry',  # industry-行业, concept-概念, area-地域
+        page: int = 1,
+        page_size: int = 100
     ) -> Optional[Dict]:
         """
         获取板块资金流向
         
         Args:
             sector_type: 板块类型
+            page: 页码
+            page_size: 每页数量
             
         Returns:
             板块资金流向数据
@@ -256,8 +410,8 @@ class EastMoneyAPI:
         params = {
             'fid': 'f62',
             'po': 1,
-            'pz': 100,
-            'pn': 1,
+            'pz': page_size,
+            'pn': page,
             'np': 1,
             'fltt': 2,
             'invt': 2,
@@ -267,8 +421,86 @@ class EastMoneyAPI:
         
         return await self._request(url, params)
     
+    async def get_sector_constituents(
+        self,
+        sector_code: str,
+        page: int = 1,
+        page_size: int = 100
+    ) -> Optional[Dict]:
+        """
+        获取板块成分股
+        
+        Args:
+            sector_code: 板块代码（如：BK0477）
+            page: 页码
+            page_size: 每页数量
+            
+        Returns:
+            成分股列表数据
+        """
+        url = f"{self.base_url}/api/qt/clist/get"
+        params = {
+            'fid': 'f12',
+            'po': 0,
+            'pz': page_size,
+            'pn': page,
+            'np': 1,
+            'fltt': 2,
+            'invt': 2,
+            'fs': f'b:{sector_code}',
+            'fields': 'f12,f14,f13'
+        }
+        
+        return await self._request(url, params)
+    
     # ========== 工具方法 ==========
     
+    async def fetch_all_pages(
+        self,
+        fetch_page: Callable[[int], Awaitable[Optional[Dict]]],
+        page_size: int = 100,
+        require_complete: bool = False
+    ) -> Optional[List[Dict]]:
+        """
+        获取分页列表的全部数据
+        
+        先请求第1页得到总数，再并发请求剩余页（并发度由限流器控制）
+        
+        Args:
+            fetch_page: 按页码获取数据的协程函数（返回 {"total": ..., "diff": [...]}）
+            page_size: 每页数量（需与 fetch_page 使用的一致）
+            require_complete: 为True时任一页获取失败即返回None（结果用于比对删除时使用），
+                              否则跳过失败的页
+            
+        Returns:
+            所有页的 diff 列表合并结果
+        """
+        first = await fetch_page(1)
+        if not first or not first.get('diff'):
+            return []
+        
+        items = list(first['diff'])
+        total = first.get('total') or len(items)
+        page_count = (total + page_size - 1) // page_size
+        
+        if page_count > 1:
+            pages = await asyncio.gather(
+                *(fetch_page(page) for page in range(2, page_count + 1)),
+                return_exceptions=True
+            )
+            failed = 0
+            for page, data in enumerate(pages, start=2):
+                if isinstance(data, Exception) or not data or not data.get('diff'):
+                    logger.warning(f"分页数据获取失败: 第 {page}/{page_count} 页")
+                    failed += 1
+                    continue
+                items.extend(data['diff'])
+            if failed and require_complete:
+                logger.warning(f"分页数据不完整（{failed}/{page_count} 页失败，已获取 {len(items)}/{total}），放弃本次结果")
+                return None
+        
+        return items
+    
     def parse_rank_data(self, raw_data: Dict) -> List[Dict]:
         """
         解析排行榜数据
@@ -313,3 +545,23 @@ class EastMoneyAPI:
         
         return stocks
 
+
+
+def create_request_api(limiter: Optional[AsyncRateLimiter] = None) -> EastMoneyAPI:
+    """
+    创建接口请求使用的API客户端
+    
+    使用配置的数据源地址，并受接口请求的全局上游额度限制（不影响后台采集任务）
+    
+    Args:
+        limiter: 请求限流器（并发批量请求时传入共享限流器）
+    """
+    from app.core.config import settings
+    from app.core.rate_limit import upstream_budget
+    
+    return EastMoneyAPI(
+        base_url=settings.EASTMONEY_BASE_URL,
+        history_url=settings.EASTMONEY_HISTORY_URL,
+        limiter=limiter,
+        budget=upstream_budget,
+    )
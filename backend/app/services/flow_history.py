@@ -0,0 +1,157 @@
+"""
+个股历史资金流向模块
+
+提供单只和多只股票历史资金流向的读取、上游补齐和格式转换：
+- 多只股票一次查询读取，数据库中缺失的股票在限流器下并发从上游获取
+- 上游数据按 (stock_id, trade_date) 批量写入，已存在的记录忽略
+"""
+import asyncio
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.orm import Session
+from loguru import logger
+
+from app.models.stock import Stock, CapitalFlow
+from app.services.eastmoney_api import create_request_api
+from app.utils.rate_limiter import eastmoney_limiter
+
+# 历史数据每行字段
+FLOW_ITEM_FIELDS = (
+    'trade_date', 'main_inflow', 'main_inflow_rate', 'super_inflow', 'super_inflow_rate',
+    'large_inflow', 'large_inflow_rate', 'medium_inflow', 'medium_inflow_rate',
+    'small_inflow', 'small_inflow_rate', 'close_price', 'change_percent', 'volume', 'amount',
+)
+
+# 上游历史数据中需要写入 capital_flow 的数值字段
+_HISTORY_VALUE_FIELDS = FLOW_ITEM_FIELDS[1:]
+
+
+def flow_to_dict(flow: CapitalFlow) -> Dict:
+    """capital_flow 记录转换为接口返回格式（空值为0）"""
+    return {
+        "trade_date": flow.trade_date.isoformat(),
+        "main_inflow": float(flow.main_inflow) if flow.main_inflow else 0,
+        "main_inflow_rate": float(flow.main_inflow_rate) if flow.main_inflow_rate else 0,
+        "super_inflow": float(flow.super_inflow) if flow.super_inflow else 0,
+        "super_inflow_rate": float(flow.super_inflow_rate) if flow.super_inflow_rate else 0,
+        "large_inflow": float(flow.large_inflow) if flow.large_inflow else 0,
+        "large_inflow_rate": float(flow.large_inflow_rate) if flow.large_inflow_rate else 0,
+        "medium_inflow": float(flow.medium_inflow) if flow.medium_inflow else 0,
+        "medium_inflow_rate": float(flow.medium_inflow_rate) if flow.medium_inflow_rate else 0,
+        "small_inflow": float(flow.small_inflow) if flow.small_inflow else 0,
+        "small_inflow_rate": float(flow.small_inflow_rate) if flow.small_inflow_rate else 0,
+        "close_price": float(flow.close_price) if flow.close_price else 0,
+        "change_percent": float(flow.change_percent) if flow.change_percent else 0,
+        "volume": int(flow.volume) if flow.volume else 0,
+        "amount": float(flow.amount) if flow.amount else 0,
+    }
+
+
+def history_item_to_dict(item: Dict) -> Dict:
+    """上游历史数据（_parse_history_data 的输出）转换为接口返回格式"""
+    result = {"trade_date": item['trade_date']}
+    for field in _HISTORY_VALUE_FIELDS:
+        value = item.get(field) or 0
+        result[field] = int(value) if field == 'volume' else float(value)
+    return result
+
+
+def load_histories(
+    db: Session,
+    stock_ids: Sequence[int],
+    start_date: date,
+    end_date: date
+) -> Dict[int, List[Dict]]:
+    """
+    一次查询读取多只股票的历史资金流向
+
+    Returns:
+        {stock_id: [记录（按交易日降序）]}，没有数据的股票不在结果中
+    """
+    if not stock_ids:
+        return {}
+    flows = db.query(CapitalFlow).filter(
+        CapitalFlow.stock_id.in_(list(stock_ids)),
+        CapitalFlow.trade_date >= start_date,
+        CapitalFlow.trade_date <= end_date
+    ).order_by(CapitalFlow.stock_id, CapitalFlow.trade_date.desc()).all()
+
+    histories = defaultdict(list)
+    for flow in flows:
+        histories[flow.stock_id].append(flow_to_dict(flow))
+    return dict(histories)
+
+
+def save_history_items(db: Session, stock_id: int, items: List[Dict]):
+    """批量写入上游历史数据（已存在的交易日忽略）"""
+    rows = [
+        {
+            'stock_id': stock_id,
+            'trade_date': datetime.strptime(item['trade_date'], '%Y-%m-%d').date(),
+            **{field: item.get(field, 0) for field in _HISTORY_VALUE_FIELDS},
+        }
+        for item in items if item.get('trade_date')
+    ]
+    if rows:
+        db.execute(mysql_insert(CapitalFlow).prefix_with('IGNORE').values(rows))
+
+
+def _in_range(items: List[Dict], start_date: date, end_date: date) -> List[Dict]:
+    start, end = start_date.isoformat(), end_date.isoformat()
+    return [item for item in items if start <= item.get('trade_date', '') <= end]
+
+
+async def fetch_missing_histories(
+    db: Session,
+    stocks: Sequence[Stock],
+    start_date: date,
+    end_date: date
+) -> Optional[Dict[int, List[Dict]]]:
+    """
+    从上游并发获取多只股票的历史资金流向并写入数据库
+
+    请求经过全局限流器，并发数和请求间隔受 system_config 控制；
+    整批一次性预留上游额度，额度不足时不请求上游
+
+    Returns:
+        {stock_id: [日期范围内的记录（按交易日降序）]}，上游额度不足时返回None
+    """
+    if not stocks:
+        return {}
+
+    api = create_request_api(limiter=eastmoney_limiter)
+    try:
+        if not await api.reserve_budget(len(stocks)):
+            logger.warning(f"上游请求额度不足，跳过 {len(stocks)} 只股票的历史资金流向补齐")
+            return None
+        results = await asyncio.gather(
+            *(
+                api.get_stock_capital_flow_history(
+                    stock_code=stock.stock_code,
+                    market='sh' if stock.exchange == 'SH' else 'sz'
+                )
+                for stock in stocks
+            ),
+            return_exceptions=True
+        )
+    finally:
+        await api.close()
+
+    histories = {}
+    for stock, result in zip(stocks, results):
+        if isinstance(result, Exception):
+            logger.warning(f"获取 {stock.stock_code} 历史资金流向失败: {result}")
+            continue
+        items = _in_range(result or [], start_date, end_date)
+        if not items:
+            continue
+        save_history_items(db, stock.stock_id, items)
+        histories[stock.stock_id] = [
+            history_item_to_dict(item) for item in sorted(items, key=lambda x: x['trade_date'], reverse=True)
+        ]
+
+    db.commit()
+    return histories
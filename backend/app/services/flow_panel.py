@@ -0,0 +1,137 @@
+"""
+资金流向面板数据模块
+
+把 capital_flow 中一段日期范围内全部股票的数据一次性读出，
+整理为 (股票 × 交易日) 的二维数组，供信号、板块、回测等模块做整表计算
+"""
+from datetime import date
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.stock import CapitalFlow
+
+# 资金流向数值列
+FLOW_COLUMNS = (
+    'main_inflow', 'main_inflow_rate',
+    'super_inflow', 'super_inflow_rate',
+    'large_inflow', 'large_inflow_rate',
+    'medium_inflow', 'medium_inflow_rate',
+    'small_inflow', 'small_inflow_rate',
+    'close_price', 'change_percent',
+    'volume', 'amount',
+)
+
+
+class FlowPanel:
+    """资金流向面板（股票 × 交易日），缺失值为NaN"""
+
+    def __init__(self, stock_ids: np.ndarray, dates: List[date], columns: Dict[str, np.ndarray]):
+        """
+        Args:
+            stock_ids: 股票ID数组（升序），对应面板的行
+            dates: 交易日列表（升序），对应面板的列
+            columns: {列名: float64[股票数, 交易日数]}
+        """
+        self.stock_ids = stock_ids
+        self.dates = dates
+        self.columns = columns
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    @property
+    def shape(self) -> tuple:
+        return len(self.stock_ids), len(self.dates)
+
+
+def get_recent_trade_dates(db: Session, days: int, end_date: Optional[date] = None) -> List[date]:
+    """
+    获取截至 end_date 的最近N个交易日（以 capital_flow 中出现的日期为准）
+
+    Returns:
+        交易日列表（升序）
+    """
+    query = select(CapitalFlow.trade_date).distinct()
+    if end_date is not None:
+        query = query.where(CapitalFlow.trade_date <= end_date)
+    query = query.order_by(CapitalFlow.trade_date.desc()).limit(days)
+    return sorted(row[0] for row in db.execute(query).all())
+
+
+def load_flow_panel(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    columns: Sequence[str] = FLOW_COLUMNS,
+    stock_ids: Optional[Sequence[int]] = None
+) -> FlowPanel:
+    """
+    读取日期范围内的资金流向面板
+
+    Args:
+        start_date: 开始日期
+        end_date: 结束日期
+        columns: 需要的数值列
+        stock_ids: 只读取指定股票，为None时读取全部
+
+    Returns:
+        FlowPanel
+    """
+    query = select(
+        CapitalFlow.stock_id,
+        CapitalFlow.trade_date,
+        *(getattr(CapitalFlow, column) for column in columns)
+    ).where(
+        CapitalFlow.trade_date >= start_date,
+        CapitalFlow.trade_date <= end_date,
+        CapitalFlow.is_valid.isnot(False)
+    )
+    if stock_ids is not None:
+        query = query.where(CapitalFlow.stock_id.in_(list(stock_ids)))
+
+    rows = db.execute(query).all()
+    if not rows:
+        return FlowPanel(np.zeros(0, dtype=np.int64), [], {
+            column: np.zeros((0, 0), dtype=np.float64) for column in columns
+        })
+
+    raw_stock_ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    raw_dates = np.array([row[1].toordinal() for row in rows], dtype=np.int64)
+
+    unique_stock_ids, row_pos = np.unique(raw_stock_ids, return_inverse=True)
+    unique_dates, col_pos = np.unique(raw_dates, return_inverse=True)
+    shape = (len(unique_stock_ids), len(unique_dates))
+
+    # Decimal/None 统一转换为 float（None -> NaN）
+    values = np.array([row[2:] for row in rows], dtype=object)
+    values[values == None] = np.nan  # noqa: E711
+    values = values.astype(np.float64)
+
+    panel_columns = {}
+    for i, column in enumerate(columns):
+        matrix = np.full(shape, np.nan, dtype=np.float64)
+        matrix[row_pos, col_pos] = values[:, i]
+        panel_columns[column] = matrix
+
+    return FlowPanel(
+        unique_stock_ids,
+        [date.fromordinal(int(ordinal)) for ordinal in unique_dates],
+        panel_columns
+    )
+
+
+def load_recent_flow_panel(
+    db: Session,
+    days: int,
+    end_date: Optional[date] = None,
+    columns: Sequence[str] = FLOW_COLUMNS,
+    stock_ids: Optional[Sequence[int]] = None
+) -> FlowPanel:
+    """读取截至 end_date 最近N个交易日的资金流向面板"""
+    trade_dates = get_recent_trade_dates(db, days, end_date)
+    if not trade_dates:
+        return load_flow_panel(db, date.min, date.min, columns, stock_ids)
+    return load_flow_panel(db, trade_dates[0], trade_dates[-1], columns, stock_ids)
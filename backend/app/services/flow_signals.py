@@ -0,0 +1,218 @@
+"""
+资金流入异动信号模块
+
+一次读取全部股票最近N个交易日的资金流向面板，整表计算：
+- 主力 / 超大单净流入的滚动 z-score
+- 成交额调整后的主力净流入占比及其 z-score
+- 档位背离（超大单持续流入、小单持续流出）
+触发阈值的股票按交易日保存到 flow_signals 表
+"""
+import warnings
+from datetime import date
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+from loguru import logger
+
+from app.core.database import SessionLocal
+from app.models.signal import FlowSignal
+from app.services.flow_panel import FlowPanel, load_recent_flow_panel
+from app.services.system_config import get_config_value
+
+# 信号类型
+SIGNAL_TYPES = {
+    'main_spike': '主力净流入异动',
+    'super_spike': '超大单净流入异动',
+    'ratio_spike': '主力净流入占比异动',
+    'tier_divergence': '超大单流入小单流出',
+}
+
+# 档位背离统计的最近交易日数
+DIVERGENCE_DAYS = 3
+
+# 档位背离阈值：(超大单 - 小单) / 成交额
+DIVERGENCE_THRESHOLD = 0.05
+
+SIGNAL_COLUMNS = ('main_inflow', 'super_inflow', 'small_inflow', 'amount')
+
+
+def rolling_zscore(matrix: np.ndarray, window: int) -> np.ndarray:
+    """
+    计算每个交易日相对前 window 个交易日的 z-score
+
+    Args:
+        matrix: 二维数组（股票 × 交易日），缺失值为NaN
+        window: 基准窗口长度
+
+    Returns:
+        同形状的 z-score 数组，前 window 列及基准不足时为NaN
+    """
+    _, days = matrix.shape
+    result = np.full(matrix.shape, np.nan, dtype=np.float64)
+    if days <= window:
+        return result
+
+    # 基准窗口视图：baseline[:, t, :] 为第 t+window 天之前的 window 天
+    baseline = np.lib.stride_tricks.sliding_window_view(matrix, window, axis=1)[:, :days - window, :]
+    with warnings.catch_warnings(), np.errstate(invalid='ignore', divide='ignore'):
+        # 全为NaN的基准窗口会触发 "Mean of empty slice" 警告，结果按NaN处理
+        warnings.simplefilter('ignore', RuntimeWarning)
+        count = np.sum(~np.isnan(baseline), axis=2)
+        mean = np.nanmean(baseline, axis=2)
+        std = np.nanstd(baseline, axis=2)
+        z = (matrix[:, window:] - mean) / std
+    z[(count < max(2, window // 2)) | (std == 0)] = np.nan
+    result[:, window:] = z
+    return result
+
+
+def compute_signal_metrics(panel: FlowPanel, window: int) -> Dict[str, np.ndarray]:
+    """
+    计算面板最后一个交易日的信号指标
+
+    Returns:
+        {指标名: float64[股票数]}
+    """
+    main = panel['main_inflow']
+    super_ = panel['super_inflow']
+    small = panel['small_inflow']
+    amount = panel['amount']
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        inflow_ratio = np.where(amount > 0, main / amount, np.nan)
+
+        main_z = rolling_zscore(main[:, -(window + 1):], window)[:, -1]
+        super_z = rolling_zscore(super_[:, -(window + 1):], window)[:, -1]
+        ratio_z = rolling_zscore(inflow_ratio[:, -(window + 1):], window)[:, -1]
+
+        recent = slice(-DIVERGENCE_DAYS, None)
+        super_recent = np.nansum(super_[:, recent], axis=1)
+        small_recent = np.nansum(small[:, recent], axis=1)
+        amount_recent = np.nansum(amount[:, recent], axis=1)
+        divergence = np.where(
+            (super_recent > 0) & (small_recent < 0) & (amount_recent > 0),
+            (super_recent - small_recent) / amount_recent,
+            0.0
+        )
+
+    return {
+        'main_inflow': main[:, -1],
+        'main_z': main_z,
+        'super_inflow': super_[:, -1],
+        'super_z': super_z,
+        'inflow_ratio': inflow_ratio[:, -1],
+        'inflow_ratio_z': ratio_z,
+        'divergence': divergence,
+    }
+
+
+def flag_signals(metrics: Dict[str, np.ndarray], z_threshold: float) -> Dict[str, np.ndarray]:
+    """
+    按阈值标记信号（只标记流入方向）
+
+    Returns:
+        {信号类型: bool[股票数]}
+    """
+    with np.errstate(invalid='ignore'):
+        return {
+            'main_spike': (metrics['main_z'] >= z_threshold) & (metrics['main_inflow'] > 0),
+            'super_spike': (metrics['super_z'] >= z_threshold) & (metrics['super_inflow'] > 0),
+            'ratio_spike': (metrics['inflow_ratio_z'] >= z_threshold) & (metrics['inflow_ratio'] > 0),
+            'tier_divergence': metrics['divergence'] >= DIVERGENCE_THRESHOLD,
+        }
+
+
+def compute_signals(panel: FlowPanel, window: int, z_threshold: float) -> List[Dict]:
+    """
+    计算面板最后一个交易日触发信号的股票
+
+    Returns:
+        可直接写入 flow_signals 的字典列表
+    """
+    if panel.shape[1] == 0:
+        return []
+
+    metrics = compute_signal_metrics(panel, window)
+    flags = flag_signals(metrics, z_threshold)
+
+    flag_matrix = np.column_stack([flags[signal_type] for signal_type in SIGNAL_TYPES])
+    flagged = np.flatnonzero(flag_matrix.any(axis=1))
+
+    # 综合得分：各 z-score 超出阈值部分之和 + 背离强度
+    z_excess = np.column_stack([
+        np.nan_to_num(metrics[name]) - z_threshold for name in ('main_z', 'super_z', 'inflow_ratio_z')
+    ])
+    score = np.clip(z_excess, 0, None).sum(axis=1) + metrics['divergence'] * 10
+
+    trade_date = panel.dates[-1]
+    signal_names = list(SIGNAL_TYPES)
+
+    def _value(array, pos):
+        value = array[pos]
+        return None if np.isnan(value) else round(float(value), 6)
+
+    return [
+        {
+            'stock_id': int(panel.stock_ids[pos]),
+            'trade_date': trade_date,
+            'main_inflow': _value(metrics['main_inflow'], pos),
+            'main_z': _value(metrics['main_z'], pos),
+            'super_z': _value(metrics['super_z'], pos),
+            'inflow_ratio': _value(metrics['inflow_ratio'], pos),
+            'inflow_ratio_z': _value(metrics['inflow_ratio_z'], pos),
+            'divergence': _value(metrics['divergence'], pos),
+            'signal_types': ','.join(
+                name for name, hit in zip(signal_names, flag_matrix[pos]) if hit
+            ),
+            'score': round(float(score[pos]), 4),
+        }
+        for pos in flagged.tolist()
+    ]
+
+
+def save_signals(db: Session, trade_date: date, signals: List[Dict]):
+    """覆盖写入某个交易日的信号"""
+    db.query(FlowSignal).filter(FlowSignal.trade_date == trade_date).delete(synchronize_session=False)
+    if signals:
+        db.bulk_insert_mappings(FlowSignal, signals)
+    db.commit()
+
+
+def compute_and_save_signals(
+    trade_date: Optional[date] = None,
+    window: Optional[int] = None,
+    z_threshold: Optional[float] = None
+) -> int:
+    """
+    计算并保存某个交易日的资金流入异动信号
+
+    Args:
+        trade_date: 交易日，为None时取 capital_flow 最新交易日
+        window: 基准窗口（交易日），为None时读取 system_config.signal_window_days
+        z_threshold: z-score 阈值，为None时读取 system_config.signal_z_threshold
+
+    Returns:
+        触发信号的股票数
+    """
+    db = SessionLocal()
+    try:
+        window = window or get_config_value(db, 'signal_window_days', 20)
+        z_threshold = z_threshold or get_config_value(db, 'signal_z_threshold', 2.0)
+
+        panel = load_recent_flow_panel(db, window + 1, trade_date, columns=SIGNAL_COLUMNS)
+        if not panel.dates:
+            logger.warning("资金流向数据为空，跳过信号计算")
+            return 0
+
+        signals = compute_signals(panel, window, z_threshold)
+        save_signals(db, panel.dates[-1], signals)
+        logger.info(f"{panel.dates[-1]} 信号计算完成，股票数: {panel.shape[0]}，触发: {len(signals)}")
+        return len(signals)
+
+    except Exception as e:
+        logger.error(f"信号计算出错: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
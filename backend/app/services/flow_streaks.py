@@ -0,0 +1,195 @@
+"""
+主力连续净流入状态模块
+
+每只股票保存一行状态（当前连续流入天数、连续期间累计金额、最近60日流入位图），
+每个新交易日只需用当日主力净流入对全部股票做一次 O(1) 的整表更新，
+"连续K日流入" / "最近M日中N日流入" 的筛选直接查询状态表，无需扫描 capital_flow
+"""
+from datetime import date
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import select, func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.orm import Session
+from loguru import logger
+
+from app.core.database import SessionLocal
+from app.models.stock import CapitalFlow
+from app.models.streak import FlowStreak
+
+# 流入位图保存的交易日数
+WINDOW_BITS = 60
+
+# window_count 统计的交易日数
+DEFAULT_WINDOW = 20
+
+_BITS_MASK = np.uint64((1 << WINDOW_BITS) - 1)
+
+# 字节 -> 置位数 查找表
+_POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def window_mask(window: int) -> int:
+    """最近 window 个交易日对应的位图掩码"""
+    return (1 << min(window, WINDOW_BITS)) - 1
+
+
+def popcount(bits: np.ndarray, window: int = WINDOW_BITS) -> np.ndarray:
+    """统计位图中最近 window 个交易日的流入天数"""
+    masked = np.ascontiguousarray(bits & np.uint64(window_mask(window)), dtype=np.uint64)
+    return _POPCOUNT_TABLE[masked.view(np.uint8)].reshape(-1, 8).sum(axis=1).astype(np.int64)
+
+
+class StreakState:
+    """全部股票的连续流入状态（数组形式，按 stock_id 升序）"""
+
+    def __init__(self, stock_ids: np.ndarray, last_dates: np.ndarray, streaks: np.ndarray,
+                 amounts: np.ndarray, bits: np.ndarray):
+        self.stock_ids = stock_ids
+        self.last_dates = last_dates  # 日期序数（date.toordinal），0 表示从未更新
+        self.streaks = streaks
+        self.amounts = amounts
+        self.bits = bits
+        self.changed = np.zeros(len(stock_ids), dtype=bool)
+
+    @classmethod
+    def load(cls, db: Session) -> "StreakState":
+        """从 flow_streaks 表加载状态"""
+        rows = db.execute(select(
+            FlowStreak.stock_id, FlowStreak.last_trade_date, FlowStreak.current_streak,
+            FlowStreak.streak_amount, FlowStreak.window_bits
+        ).order_by(FlowStreak.stock_id)).all()
+
+        return cls(
+            np.array([row[0] for row in rows], dtype=np.int64),
+            np.array([row[1].toordinal() for row in rows], dtype=np.int64),
+            np.array([row[2] for row in rows], dtype=np.int64),
+            np.array([float(row[3] or 0) for row in rows], dtype=np.float64),
+            np.array([row[4] for row in rows], dtype=np.uint64),
+        )
+
+    def _ensure_stocks(self, stock_ids: np.ndarray) -> np.ndarray:
+        """补充新出现的股票，返回 stock_ids 在状态数组中的位置"""
+        missing = np.setdiff1d(stock_ids, self.stock_ids)
+        if len(missing):
+            merged = np.concatenate([self.stock_ids, missing])
+            order = np.argsort(merged, kind='stable')
+            extra = len(missing)
+            self.stock_ids = merged[order]
+            self.last_dates = np.concatenate([self.last_dates, np.zeros(extra, dtype=np.int64)])[order]
+            self.streaks = np.concatenate([self.streaks, np.zeros(extra, dtype=np.int64)])[order]
+            self.amounts = np.concatenate([self.amounts, np.zeros(extra, dtype=np.float64)])[order]
+            self.bits = np.concatenate([self.bits, np.zeros(extra, dtype=np.uint64)])[order]
+            self.changed = np.concatenate([self.changed, np.zeros(extra, dtype=bool)])[order]
+        return np.searchsorted(self.stock_ids, stock_ids)
+
+    def apply_day(self, trade_date: date, stock_ids: np.ndarray, main_inflow: np.ndarray) -> int:
+        """
+        用一个交易日的主力净流入更新状态
+
+        当日没有数据的股票（停牌等）保持原状态；已更新到该日或之后的股票跳过，保证重复执行幂等
+
+        Returns:
+            更新的股票数
+        """
+        ordinal = trade_date.toordinal()
+        pos = self._ensure_stocks(stock_ids)
+
+        eligible = self.last_dates[pos] < ordinal
+        pos, main_inflow = pos[eligible], main_inflow[eligible]
+        inflow = main_inflow > 0
+
+        self.streaks[pos] = np.where(inflow, self.streaks[pos] + 1, 0)
+        self.amounts[pos] = np.where(inflow, self.amounts[pos] + main_inflow, 0.0)
+        self.bits[pos] = ((self.bits[pos] << np.uint64(1)) | inflow.astype(np.uint64)) & _BITS_MASK
+        self.last_dates[pos] = ordinal
+        self.changed[pos] = True
+        return len(pos)
+
+    def changed_rows(self) -> List[Dict]:
+        """已变化的状态行（用于写回数据库）"""
+        pos = np.flatnonzero(self.changed)
+        counts = popcount(self.bits[pos], DEFAULT_WINDOW)
+        return [
+            {
+                'stock_id': int(self.stock_ids[p]),
+                'last_trade_date': date.fromordinal(int(self.last_dates[p])),
+                'current_streak': int(self.streaks[p]),
+                'streak_amount': round(float(self.amounts[p]), 2),
+                'window_bits': int(self.bits[p]),
+                'window_count': int(count),
+            }
+            for p, count in zip(pos.tolist(), counts.tolist())
+        ]
+
+
+def load_day_inflows(db: Session, trade_date: date) -> tuple:
+    """读取一个交易日全部股票的主力净流入"""
+    rows = db.execute(select(CapitalFlow.stock_id, CapitalFlow.main_inflow).where(
+        CapitalFlow.trade_date == trade_date,
+        CapitalFlow.main_inflow.isnot(None)
+    ).order_by(CapitalFlow.stock_id)).all()
+    stock_ids = np.array([row[0] for row in rows], dtype=np.int64)
+    inflows = np.array([float(row[1]) for row in rows], dtype=np.float64)
+    return stock_ids, inflows
+
+
+def save_streaks(db: Session, rows: List[Dict], batch_size: int = 1000):
+    """批量写回状态"""
+    for i in range(0, len(rows), batch_size):
+        stmt = mysql_insert(FlowStreak).values(rows[i:i + batch_size])
+        stmt = stmt.on_duplicate_key_update(
+            last_trade_date=stmt.inserted.last_trade_date,
+            current_streak=stmt.inserted.current_streak,
+            streak_amount=stmt.inserted.streak_amount,
+            window_bits=stmt.inserted.window_bits,
+            window_count=stmt.inserted.window_count,
+        )
+        db.execute(stmt)
+    db.commit()
+
+
+def update_flow_streaks(until_date: Optional[date] = None) -> int:
+    """
+    把状态增量更新到 until_date（默认 capital_flow 最新交易日）
+
+    只处理状态表中最后更新日之后的交易日；状态表为空时从最近60个交易日开始初始化
+
+    Returns:
+        处理的交易日数
+    """
+    db = SessionLocal()
+    try:
+        watermark = db.query(func.max(FlowStreak.last_trade_date)).scalar()
+
+        query = select(CapitalFlow.trade_date).distinct()
+        if watermark is not None:
+            query = query.where(CapitalFlow.trade_date > watermark)
+        if until_date is not None:
+            query = query.where(CapitalFlow.trade_date <= until_date)
+        trade_dates = sorted(row[0] for row in db.execute(query).all())
+        if watermark is None:
+            trade_dates = trade_dates[-WINDOW_BITS:]
+
+        if not trade_dates:
+            logger.info("连续流入状态已是最新")
+            return 0
+
+        state = StreakState.load(db)
+        for trade_date in trade_dates:
+            stock_ids, inflows = load_day_inflows(db, trade_date)
+            updated = state.apply_day(trade_date, stock_ids, inflows)
+            logger.info(f"{trade_date} 连续流入状态更新: {updated} 只股票")
+
+        rows = state.changed_rows()
+        save_streaks(db, rows)
+        logger.info(f"连续流入状态更新完成，交易日: {len(trade_dates)}，写入: {len(rows)}")
+        return len(trade_dates)
+
+    except Exception as e:
+        logger.error(f"连续流入状态更新出错: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
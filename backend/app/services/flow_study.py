@@ -0,0 +1,286 @@
+"""
+资金流向预测能力研究模块
+
+对每个资金流向指标（主力 / 超大单 / 大单 / 中单 / 小单净流入及其占比），
+按交易日整表计算与未来 N 日收益的秩相关系数（Rank IC）和分位组收益
+
+- 面板按自然年分块从 capital_flow 读取，以 (年份, 数据指纹) 缓存到磁盘，
+  再次研究时只重新读取数据有变化的年份
+- 截面排名、分组收益全部按 (股票 × 交易日) 矩阵计算，不做逐日循环
+"""
+import hashlib
+import json
+import os
+import time
+from datetime import date
+from typing import Dict, List, Sequence
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from loguru import logger
+
+from app.models.stock import CapitalFlow
+from app.services.backtest import TRADING_DAYS_PER_YEAR, cross_section_rank_pct
+from app.services.flow_panel import FlowPanel, load_flow_panel
+
+# 研究的资金流向指标
+STUDY_METRICS = (
+    'main_inflow', 'main_inflow_rate',
+    'super_inflow', 'super_inflow_rate',
+    'large_inflow', 'large_inflow_rate',
+    'medium_inflow', 'medium_inflow_rate',
+    'small_inflow', 'small_inflow_rate',
+)
+
+# 默认预测周期（交易日）
+DEFAULT_HORIZONS = (1, 5, 20)
+
+# 默认分位组数
+DEFAULT_QUANTILES = 5
+
+STUDY_COLUMNS = STUDY_METRICS + ('change_percent',)
+
+
+# ========== 面板缓存 ==========
+
+def _year_fingerprint(db: Session, start_date: date, end_date: date) -> str:
+    """日期范围内 capital_flow 的数据指纹（行数 + 最后更新时间）"""
+    count, updated_at = db.query(func.count(CapitalFlow.flow_id), func.max(CapitalFlow.updated_at)).filter(
+        CapitalFlow.trade_date >= start_date,
+        CapitalFlow.trade_date <= end_date
+    ).one()
+    return f"{count}:{updated_at}"
+
+
+def _save_panel(path: str, panel: FlowPanel):
+    np.savez(
+        path,
+        stock_ids=panel.stock_ids,
+        dates=np.array([d.toordinal() for d in panel.dates], dtype=np.int64),
+        **panel.columns
+    )
+
+
+def _load_panel(path: str, columns: Sequence[str]) -> FlowPanel:
+    with np.load(path) as data:
+        return FlowPanel(
+            data['stock_ids'],
+            [date.fromordinal(int(ordinal)) for ordinal in data['dates']],
+            {column: data[column] for column in columns}
+        )
+
+
+def load_cached_panel(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    cache_dir: str,
+    columns: Sequence[str] = STUDY_COLUMNS,
+    refresh: bool = False
+) -> FlowPanel:
+    """
+    按年分块读取面板（命中磁盘缓存的年份不访问 capital_flow 明细）并合并
+
+    Args:
+        refresh: 忽略缓存重新读取
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    column_key = hashlib.md5(','.join(columns).encode()).hexdigest()[:8]
+
+    chunks = []
+    for year in range(start_date.year, end_date.year + 1):
+        chunk_start = max(start_date, date(year, 1, 1))
+        chunk_end = min(end_date, date(year, 12, 31))
+        fingerprint = _year_fingerprint(db, chunk_start, chunk_end)
+        key = hashlib.md5(f"{chunk_start}:{chunk_end}:{fingerprint}".encode()).hexdigest()[:12]
+        path = os.path.join(cache_dir, f"panel_{year}_{column_key}_{key}.npz")
+
+        if os.path.exists(path) and not refresh:
+            chunk = _load_panel(path, columns)
+            logger.debug(f"{year} 年面板命中缓存")
+        else:
+            started = time.perf_counter()
+            chunk = load_flow_panel(db, chunk_start, chunk_end, columns=columns)
+            _save_panel(path, chunk)
+            logger.info(f"{year} 年面板已读取并缓存，耗时: {time.perf_counter() - started:.1f}s")
+
+        if chunk.dates:
+            chunks.append(chunk)
+
+    return merge_panels(chunks, columns)
+
+
+def merge_panels(chunks: List[FlowPanel], columns: Sequence[str]) -> FlowPanel:
+    """按交易日拼接面板（股票取并集）"""
+    if not chunks:
+        return FlowPanel(np.zeros(0, dtype=np.int64), [], {
+            column: np.zeros((0, 0), dtype=np.float64) for column in columns
+        })
+
+    stock_ids = np.unique(np.concatenate([chunk.stock_ids for chunk in chunks]))
+    dates = [d for chunk in chunks for d in chunk.dates]
+    merged = {column: np.full((len(stock_ids), len(dates)), np.nan, dtype=np.float64) for column in columns}
+
+    offset = 0
+    for chunk in chunks:
+        rows = np.searchsorted(stock_ids, chunk.stock_ids)
+        cols = slice(offset, offset + len(chunk.dates))
+        for column in columns:
+            merged[column][rows, cols] = chunk[column]
+        offset += len(chunk.dates)
+
+    return FlowPanel(stock_ids, dates, merged)
+
+
+# ========== 指标计算 ==========
+
+def forward_returns(change_percent: np.ndarray, horizon: int) -> np.ndarray:
+    """
+    第 t 日收盘到第 t+horizon 日收盘的累计收益
+
+    区间内缺失的涨跌幅（停牌）按0计；当日无数据或区间超出面板的位置为NaN
+    """
+    log_return = np.log1p(np.nan_to_num(change_percent) / 100)
+    cumsum = np.cumsum(log_return, axis=1)
+    result = np.full(change_percent.shape, np.nan, dtype=np.float64)
+    if horizon < change_percent.shape[1]:
+        result[:, :-horizon] = np.expm1(cumsum[:, horizon:] - cumsum[:, :-horizon])
+    result[np.isnan(change_percent)] = np.nan
+    return result
+
+
+def daily_rank_ic(x_rank: np.ndarray, y_rank: np.ndarray) -> np.ndarray:
+    """
+    每个交易日横截面上两组排名的相关系数
+
+    Args:
+        x_rank / y_rank: 同一有效样本上的截面百分位排名（无效位置为NaN）
+
+    Returns:
+        每个交易日的 Rank IC，样本不足的交易日为NaN
+    """
+    valid = ~np.isnan(x_rank) & ~np.isnan(y_rank)
+    n = valid.sum(axis=0)
+    x = np.where(valid, x_rank, 0.0)
+    y = np.where(valid, y_rank, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x_mean = x.sum(axis=0) / n
+        y_mean = y.sum(axis=0) / n
+        x_c = np.where(valid, x - x_mean, 0.0)
+        y_c = np.where(valid, y - y_mean, 0.0)
+        ic = (x_c * y_c).sum(axis=0) / np.sqrt((x_c ** 2).sum(axis=0) * (y_c ** 2).sum(axis=0))
+    ic[n < 10] = np.nan
+    return ic
+
+
+def quantile_returns(x_rank: np.ndarray, returns: np.ndarray, quantiles: int) -> np.ndarray:
+    """
+    每个交易日按排名分组的平均收益
+
+    Returns:
+        float64[交易日数, 分组数]，第0组为指标最小的一组
+    """
+    valid = ~np.isnan(x_rank) & ~np.isnan(returns)
+    days = x_rank.shape[1]
+    bucket = np.minimum((np.nan_to_num(x_rank) * quantiles).astype(np.int64), quantiles - 1)
+    day_index = np.broadcast_to(np.arange(days), x_rank.shape)
+    flat = (day_index * quantiles + bucket)[valid]
+
+    sums = np.bincount(flat, weights=returns[valid], minlength=days * quantiles)
+    counts = np.bincount(flat, minlength=days * quantiles)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (sums / counts).reshape(days, quantiles)
+
+
+def summarize_ic(ic: np.ndarray, horizon: int) -> Dict:
+    """IC 统计（t 值使用不重叠的采样，避免多日收益重叠高估显著性）"""
+    values = ic[~np.isnan(ic)]
+    sampled = ic[::horizon]
+    sampled = sampled[~np.isnan(sampled)]
+    if len(values) < 2:
+        return {'ic_mean': None, 'ic_std': None, 'icir': None, 'ic_tstat': None, 'ic_positive_rate': None, 'days': len(values)}
+
+    ic_mean, ic_std = float(values.mean()), float(values.std(ddof=1))
+    tstat = (
+        float(sampled.mean() / sampled.std(ddof=1) * np.sqrt(len(sampled)))
+        if len(sampled) > 1 and sampled.std(ddof=1) > 0 else None
+    )
+    return {
+        'ic_mean': round(ic_mean, 6),
+        'ic_std': round(ic_std, 6),
+        'icir': round(ic_mean / ic_std, 4) if ic_std > 0 else None,
+        'ic_tstat': round(tstat, 4) if tstat is not None else None,
+        'ic_positive_rate': round(float((values > 0).mean()), 4),
+        'days': int(len(values)),
+    }
+
+
+def run_flow_study(
+    panel: FlowPanel,
+    horizons: Sequence[int] = DEFAULT_HORIZONS,
+    quantiles: int = DEFAULT_QUANTILES,
+    metrics: Sequence[str] = STUDY_METRICS
+) -> Dict:
+    """
+    计算各指标对各预测周期的 IC 和分位组收益
+
+    同一预测周期内所有指标使用相同的有效样本（指标全部有值且未来收益有值），
+    使各指标的结果可直接比较
+
+    Returns:
+        {'start_date', 'end_date', 'stocks', 'days', 'horizons': {周期: {指标: 统计}}, 'runtime_seconds'}
+    """
+    started = time.perf_counter()
+    valid = ~np.isnan(panel['change_percent'])
+    for metric in metrics:
+        valid &= ~np.isnan(panel[metric])
+
+    # 未来收益只在面板末尾的 horizon 个交易日缺失（整列无效），
+    # 因此指标排名与预测周期无关，每个指标只排名一次
+    x_ranks = {metric: cross_section_rank_pct(np.where(valid, panel[metric], np.nan)) for metric in metrics}
+
+    results = {}
+    for horizon in horizons:
+        returns = np.where(valid, forward_returns(panel['change_percent'], horizon), np.nan)
+        y_rank = cross_section_rank_pct(returns)
+
+        horizon_result = {}
+        for metric in metrics:
+            x_rank = x_ranks[metric]
+            ic = daily_rank_ic(x_rank, y_rank)
+
+            bucket_returns = quantile_returns(x_rank, returns, quantiles)
+            with np.errstate(invalid='ignore'):
+                bucket_mean = np.nanmean(bucket_returns, axis=0) if len(bucket_returns) else np.full(quantiles, np.nan)
+                spread = bucket_returns[:, -1] - bucket_returns[:, 0]
+            spread = spread[~np.isnan(spread)]
+
+            horizon_result[metric] = {
+                **summarize_ic(ic, horizon),
+                'quantile_returns': [None if np.isnan(v) else round(float(v), 6) for v in bucket_mean],
+                'long_short': round(float(spread.mean()), 6) if len(spread) else None,
+                'long_short_annualized': (
+                    round(float(spread.mean()) * TRADING_DAYS_PER_YEAR / horizon, 6) if len(spread) else None
+                ),
+            }
+        results[horizon] = horizon_result
+
+    return {
+        'start_date': panel.dates[0].isoformat() if panel.dates else None,
+        'end_date': panel.dates[-1].isoformat() if panel.dates else None,
+        'stocks': int(panel.shape[0]),
+        'days': int(panel.shape[1]),
+        'quantiles': quantiles,
+        'horizons': results,
+        'runtime_seconds': round(time.perf_counter() - started, 3),
+    }
+
+
+def write_study_output(output_dir: str, study: Dict) -> str:
+    """保存研究结果为 JSON"""
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"flow_study_{study['start_date']}_{study['end_date']}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(study, f, ensure_ascii=False, indent=2)
+    return path
@@ -0,0 +1,190 @@
+"""
+持股智能建议模块
+
+按 suggestion_interval 周期，对所有用户持股的去重股票集合一次性读取近期资金流向面板，
+整表计算资金特征（持续主力流出、超大单派发、主力吸筹等）和综合评分，写入共享缓存。
+持股接口只按 stock_id 读取缓存结果，计算量只与去重后的股票数有关，与用户数和持股数无关
+"""
+import asyncio
+from datetime import datetime
+from typing import Dict, Iterable, List
+
+import numpy as np
+from sqlalchemy import select
+from loguru import logger
+
+from app.core.database import SessionLocal
+from app.models.holding import Holding
+from app.services.flow_panel import FlowPanel, load_recent_flow_panel
+from app.services.poller import IntervalPoller
+from app.services.user_stock_poller import get_local_quotes
+from app.utils.cache import shared_cache
+
+# 特征使用的交易日数
+SUGGESTION_DAYS = 10
+
+# 短期窗口（交易日）
+SHORT_WINDOW = 5
+
+SUGGESTION_COLUMNS = ('main_inflow', 'super_inflow', 'small_inflow', 'amount')
+
+# 缓存键前缀
+SUGGESTION_CACHE_PREFIX = "suggestion:"
+
+# 建议等级：(最低评分, 等级, 说明)，按评分从高到低匹配
+SUGGESTION_LEVELS = (
+    (40, 'add', '资金持续流入，可考虑加仓'),
+    (15, 'hold', '资金面偏强，继续持有'),
+    (-15, 'watch', '资金面中性，观望'),
+    (-40, 'caution', '资金面偏弱，注意风险'),
+    (-100, 'reduce', '主力持续流出，建议减仓'),
+)
+
+
+def suggestion_cache_key(stock_id: int) -> str:
+    """持股建议的缓存键"""
+    return f"{SUGGESTION_CACHE_PREFIX}{stock_id}"
+
+
+def get_cached_suggestions(stock_ids: Iterable[int]) -> Dict[int, Dict]:
+    """
+    从共享缓存批量读取持股建议
+
+    Returns:
+        {stock_id: 建议}，只包含命中的股票
+    """
+    cached = shared_cache.get_many(suggestion_cache_key(stock_id) for stock_id in stock_ids)
+    return {int(key[len(SUGGESTION_CACHE_PREFIX):]): value for key, value in cached.items()}
+
+
+def trailing_count(mask: np.ndarray) -> np.ndarray:
+    """每行末尾连续为 True 的个数"""
+    reversed_mask = mask[:, ::-1]
+    first_false = np.argmin(reversed_mask, axis=1)
+    return np.where(reversed_mask.all(axis=1), mask.shape[1], first_false)
+
+
+def compute_suggestion_features(panel: FlowPanel, today_rate: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    计算面板中每只股票的资金特征
+
+    Args:
+        panel: 近期资金流向面板
+        today_rate: 当日实时主力净流入占比(%)，无实时数据为NaN
+
+    Returns:
+        {特征名: 数组[股票数]}
+    """
+    main = panel['main_inflow']
+    recent = slice(-SHORT_WINDOW, None)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        main_short = np.nansum(main[:, recent], axis=1)
+        amount_short = np.nansum(panel['amount'][:, recent], axis=1)
+        super_short = np.nansum(panel['super_inflow'][:, recent], axis=1)
+        small_short = np.nansum(panel['small_inflow'][:, recent], axis=1)
+
+        return {
+            'outflow_days': trailing_count(main < 0),
+            'inflow_days': np.sum(main > 0, axis=1),
+            'main_ratio': np.where(amount_short > 0, main_short / amount_short, 0.0),
+            'distribution': (super_short < 0) & (small_short > 0),
+            'accumulation': (super_short > 0) & (small_short < 0),
+            'today_rate': today_rate,
+        }
+
+
+def score_suggestions(features: Dict[str, np.ndarray], days: int) -> np.ndarray:
+    """由资金特征计算综合评分（-100 ~ 100）"""
+    score = (
+        -12.0 * np.maximum(features['outflow_days'] - 1, 0)
+        + np.clip(features['main_ratio'] * 400, -30, 30)
+        - 25.0 * features['distribution']
+        + 25.0 * features['accumulation']
+        + 2.5 * (features['inflow_days'] - days / 2)
+        + 1.5 * np.clip(np.nan_to_num(features['today_rate']), -10, 10)
+    )
+    return np.clip(score, -100, 100)
+
+
+def _reasons(features: Dict[str, np.ndarray], pos: int) -> List[str]:
+    """单只股票触发的特征说明"""
+    reasons = []
+    outflow_days = int(features['outflow_days'][pos])
+    if outflow_days >= 3:
+        reasons.append(f"主力连续{outflow_days}日净流出")
+    if features['distribution'][pos]:
+        reasons.append(f"近{SHORT_WINDOW}日超大单净流出、小单净流入")
+    if features['accumulation'][pos]:
+        reasons.append(f"近{SHORT_WINDOW}日超大单净流入、小单净流出")
+    ratio = float(features['main_ratio'][pos])
+    if abs(ratio) >= 0.03:
+        reasons.append(f"近{SHORT_WINDOW}日主力净{'流入' if ratio > 0 else '流出'}占成交额{abs(ratio) * 100:.1f}%")
+    today_rate = features['today_rate'][pos]
+    if not np.isnan(today_rate) and abs(today_rate) >= 5:
+        reasons.append(f"今日主力净{'流入' if today_rate > 0 else '流出'}占比{abs(today_rate):.1f}%")
+    return reasons
+
+
+def compute_holding_suggestions() -> Dict[int, Dict]:
+    """
+    计算所有持股股票（去重）的建议
+
+    Returns:
+        {stock_id: {'score', 'level', 'label', 'reasons', 'trade_date', 'updated_at'}}
+    """
+    db = SessionLocal()
+    try:
+        held = db.execute(select(Holding.stock_id, Holding.stock_code).distinct()).all()
+        if not held:
+            return {}
+        code_map = dict(held)
+        panel = load_recent_flow_panel(
+            db, SUGGESTION_DAYS, columns=SUGGESTION_COLUMNS, stock_ids=list(code_map)
+        )
+    finally:
+        db.close()
+
+    if not panel.dates:
+        return {}
+
+    quotes = get_local_quotes(code_map[stock_id] for stock_id in panel.stock_ids.tolist())
+    today_rate = np.array([
+        float(quotes[code_map[stock_id]].get('main_inflow_rate') or 0)
+        if code_map[stock_id] in quotes else np.nan
+        for stock_id in panel.stock_ids.tolist()
+    ], dtype=np.float64)
+
+    features = compute_suggestion_features(panel, today_rate)
+    scores = score_suggestions(features, panel.shape[1])
+
+    updated_at = datetime.now().isoformat()
+    trade_date = panel.dates[-1].isoformat()
+    suggestions = {}
+    for pos, stock_id in enumerate(panel.stock_ids.tolist()):
+        score = float(scores[pos])
+        level, label = next((level, label) for floor, level, label in SUGGESTION_LEVELS if score >= floor)
+        suggestions[stock_id] = {
+            'score': round(score, 1),
+            'level': level,
+            'label': label,
+            'reasons': _reasons(features, pos),
+            'trade_date': trade_date,
+            'updated_at': updated_at,
+        }
+    return suggestions
+
+
+class HoldingSuggestionPoller(IntervalPoller):
+    """持股智能建议轮询任务"""
+
+    name = "持股智能建议"
+    interval_key = "suggestion_interval"
+    default_interval = 300
+
+    async def run_once(self):
+        suggestions = await asyncio.to_thread(compute_holding_suggestions)
+        shared_cache.set_many(
+            {suggestion_cache_key(stock_id): value for stock_id, value in suggestions.items()},
+            ttl=self.interval * 2
+        )
+        logger.debug(f"{self.name} 完成，股票数: {len(suggestions)}")
@@ -0,0 +1,250 @@
+"""
+分钟级资金流向采集与存储模块
+
+每只股票每个交易日的分钟资金流向压缩为一个 float32[240][5] 定长数组，
+按 (stock_id, trade_date) 存为一行，避免每分钟一行带来的写入和存储开销
+"""
+import asyncio
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.orm import Session
+from loguru import logger
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.intraday import IntradayFlow
+from app.models.stock import Stock
+from app.services.eastmoney_api import EastMoneyAPI
+from app.services.stock_universe import get_user_universe, get_top_turnover_universe
+from app.services.system_config import get_config_value, configure_eastmoney_limiter
+from app.utils.rate_limiter import eastmoney_limiter
+
+# 每个交易日的分钟数：上午 09:31-11:30，下午 13:01-15:00
+MINUTES_PER_DAY = 240
+
+# 存储档位顺序
+FLOW_TIERS = ('main_inflow', 'super_inflow', 'large_inflow', 'medium_inflow', 'small_inflow')
+
+# 存储数据类型（小端 float32）
+FLOW_DTYPE = np.dtype('<f4')
+
+_MORNING_START = 9 * 60 + 31
+_MORNING_END = 11 * 60 + 30
+_AFTERNOON_START = 13 * 60 + 1
+_AFTERNOON_END = 15 * 60
+
+
+def minute_index(time_str: str) -> Optional[int]:
+    """
+    将时间转换为交易分钟下标
+
+    Args:
+        time_str: 时间字符串（YYYY-MM-DD HH:MM 或 HH:MM）
+
+    Returns:
+        0-239 的分钟下标，非交易时段返回None
+    """
+    try:
+        hhmm = time_str.strip().split(' ')[-1]
+        hour, minute = hhmm.split(':')[:2]
+        minutes = int(hour) * 60 + int(minute)
+    except (ValueError, AttributeError):
+        return None
+
+    if _MORNING_START <= minutes <= _MORNING_END:
+        return minutes - _MORNING_START
+    if _AFTERNOON_START <= minutes <= _AFTERNOON_END:
+        return 120 + minutes - _AFTERNOON_START
+    return None
+
+
+def minute_labels() -> List[str]:
+    """返回 240 个交易分钟的 HH:MM 标签"""
+    labels = []
+    for start, end in ((_MORNING_START, _MORNING_END), (_AFTERNOON_START, _AFTERNOON_END)):
+        for minutes in range(start, end + 1):
+            labels.append(f"{minutes // 60:02d}:{minutes % 60:02d}")
+    return labels
+
+
+def build_intraday_matrix(items: List[Dict]) -> Tuple[Optional[date], np.ndarray, int]:
+    """
+    将解析后的分钟数据转换为定长数组
+
+    Args:
+        items: EastMoneyAPI.parse_intraday_flow_data 的返回结果
+
+    Returns:
+        (交易日期, float32[240][5] 数组（未采集的分钟为NaN）, 已采集分钟数)
+    """
+    matrix = np.full((MINUTES_PER_DAY, len(FLOW_TIERS)), np.nan, dtype=FLOW_DTYPE)
+    trade_date = None
+
+    for item in items:
+        index = minute_index(item.get('time', ''))
+        if index is None:
+            continue
+        if trade_date is None and ' ' in item['time']:
+            try:
+                trade_date = datetime.strptime(item['time'].split(' ')[0], '%Y-%m-%d').date()
+            except ValueError:
+                pass
+        matrix[index] = [item.get(tier, 0) for tier in FLOW_TIERS]
+
+    minute_count = int((~np.isnan(matrix[:, 0])).sum())
+    return trade_date, matrix, minute_count
+
+
+def encode_flow_matrix(matrix: np.ndarray) -> bytes:
+    """数组编码为二进制（240 × 5 × 4 = 4800 字节）"""
+    return np.ascontiguousarray(matrix, dtype=FLOW_DTYPE).tobytes()
+
+
+def decode_flow_matrix(data: bytes) -> np.ndarray:
+    """二进制解码为 float32[240][5] 数组"""
+    return np.frombuffer(data, dtype=FLOW_DTYPE).reshape(MINUTES_PER_DAY, len(FLOW_TIERS))
+
+
+# ========== 采集范围 ==========
+
+async def resolve_universe(db: Session, api: EastMoneyAPI, universe: str, top_n: int) -> List[Stock]:
+    """
+    解析采集范围
+
+    Args:
+        universe: user-持股和收藏, top-成交额前N, both-两者合并
+        top_n: 成交额前N只
+    """
+    stocks: Dict[int, Stock] = {}
+    if universe in ('user', 'both'):
+        for stock in get_user_universe(db):
+            stocks[stock.stock_id] = stock
+    if universe in ('top', 'both'):
+        for stock in await get_top_turnover_universe(db, api, top_n):
+            stocks[stock.stock_id] = stock
+    return list(stocks.values())
+
+
+# ========== 采集与存储 ==========
+
+async def fetch_stock_intraday_flow(api: EastMoneyAPI, stock: Stock) -> Optional[Dict]:
+    """
+    获取单只股票当日的分钟资金流向
+
+    Returns:
+        可直接写入 intraday_flow 的字典，失败返回None
+    """
+    market = 'sh' if stock.exchange == 'SH' else 'sz'
+    data = await api.get_stock_realtime_flow(stock.stock_code, market=market)
+    if not data or not data.get('klines'):
+        return None
+
+    items = api.parse_intraday_flow_data(data['klines'])
+    trade_date, matrix, minute_count = build_intraday_matrix(items)
+    if minute_count == 0:
+        return None
+
+    return {
+        'stock_id': stock.stock_id,
+        'trade_date': trade_date or date.today(),
+        'minute_count': minute_count,
+        'flow_data': encode_flow_matrix(matrix),
+    }
+
+
+def save_intraday_flows(db: Session, rows: List[Dict]) -> int:
+    """
+    批量写入分钟资金流向（同一股票同一天重复采集时覆盖）
+
+    Returns:
+        写入行数
+    """
+    if not rows:
+        return 0
+
+    stmt = mysql_insert(IntradayFlow).values(rows)
+    stmt = stmt.on_duplicate_key_update(
+        minute_count=stmt.inserted.minute_count,
+        flow_data=stmt.inserted.flow_data,
+    )
+    db.execute(stmt)
+    db.commit()
+    return len(rows)
+
+
+async def collect_intraday_flows(universe: Optional[str] = None, top_n: Optional[int] = None) -> int:
+    """
+    采集指定范围内所有股票当日的分钟资金流向
+
+    Args:
+        universe: 采集范围，为None时读取 system_config.intraday_universe
+        top_n: 成交额前N只，为None时读取 system_config.intraday_top_n
+
+    Returns:
+        写入的股票数
+    """
+    db = SessionLocal()
+    api = EastMoneyAPI(
+        base_url=settings.EASTMONEY_BASE_URL,
+        history_url=settings.EASTMONEY_HISTORY_URL,
+        limiter=eastmoney_limiter,
+    )
+
+    try:
+        configure_eastmoney_limiter(db)
+        universe = universe or get_config_value(db, 'intraday_universe', 'user')
+        top_n = top_n or get_config_value(db, 'intraday_top_n', 300)
+
+        stocks = await resolve_universe(db, api, universe, top_n)
+        logger.info(f"开始采集分钟资金流向，范围: {universe}，股票数: {len(stocks)}")
+
+        results = await asyncio.gather(
+            *(fetch_stock_intraday_flow(api, stock) for stock in stocks),
+            return_exceptions=True
+        )
+
+        rows = []
+        for stock, result in zip(stocks, results):
+            if isinstance(result, Exception):
+                logger.warning(f"采集分钟资金流向失败 {stock.stock_code}: {result}")
+            elif result:
+                rows.append(result)
+
+        saved = save_intraday_flows(db, rows)
+        logger.info(f"分钟资金流向采集完成，写入: {saved}，失败或无数据: {len(stocks) - saved}")
+        return saved
+
+    except Exception as e:
+        logger.error(f"分钟资金流向采集出错: {e}")
+        db.rollback()
+        raise
+    finally:
+        await api.close()
+        db.close()
+
+
+def load_intraday_flows(
+    db: Session,
+    stock_id: int,
+    start_date: date,
+    end_date: date
+) -> List[Tuple[date, np.ndarray, int]]:
+    """
+    读取日期范围内的分钟资金流向
+
+    Returns:
+        [(交易日期, float32[240][5] 数组, 已采集分钟数), ...]，按日期升序
+    """
+    records = db.query(IntradayFlow).filter(
+        IntradayFlow.stock_id == stock_id,
+        IntradayFlow.trade_date >= start_date,
+        IntradayFlow.trade_date <= end_date
+    ).order_by(IntradayFlow.trade_date).all()
+
+    return [
+        (record.trade_date, decode_flow_matrix(record.flow_data), record.minute_count)
+        for record in records
+    ]
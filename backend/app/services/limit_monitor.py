@@ -0,0 +1,312 @@
+"""
+涨跌停监控模块
+
+对每个全市场快照按板块涨跌幅限制整表计算涨跌停价，
+与上一快照的状态比对，识别新涨停、炸板、回封等事件并记录
+"""
+import asyncio
+import time
+from collections import deque
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+from loguru import logger
+
+from app.core.database import SessionLocal
+from app.models.limit_event import LimitEvent
+from app.models.stock import Stock
+from app.services.market_snapshot import MarketSnapshot
+
+# 涨跌幅限制
+LIMIT_RATIO_MAIN = 0.10  # 主板
+LIMIT_RATIO_ST = 0.05  # 主板ST
+LIMIT_RATIO_GEM_STAR = 0.20  # 创业板、科创板（含ST）
+
+# 新股上市后不设涨跌幅限制的自然日数（近似前5个交易日）
+NEW_LISTING_DAYS = 7
+
+# 价格比较容差
+PRICE_TOLERANCE = 0.001
+
+# 事件类型
+LIMIT_EVENT_TYPES = {
+    'limit_up': '涨停',
+    'limit_up_break': '炸板',
+    'limit_up_reseal': '回封',
+    'limit_down': '跌停',
+    'limit_down_break': '翘板',
+    'limit_down_reseal': '回封跌停',
+}
+
+
+def compute_limit_ratios(
+    codes: np.ndarray,
+    names: np.ndarray,
+    is_st: np.ndarray,
+    is_gem: np.ndarray,
+    is_star: np.ndarray,
+    no_limit: np.ndarray
+) -> np.ndarray:
+    """
+    计算每只股票的涨跌幅限制
+
+    股票表中的板块标记缺失时，按代码前缀（300/301 创业板、688 科创板）
+    和名称（含 ST）补充判断
+
+    Returns:
+        涨跌幅限制数组，无涨跌幅限制的股票为NaN
+    """
+    codes = np.asarray(codes, dtype='U6')
+    names = np.asarray(names, dtype=str)
+    gem = is_gem | np.char.startswith(codes, '30')
+    star = is_star | np.char.startswith(codes, '688')
+    st = is_st | (np.char.find(names, 'ST') >= 0)
+
+    ratio = np.where(gem | star, LIMIT_RATIO_GEM_STAR, np.where(st, LIMIT_RATIO_ST, LIMIT_RATIO_MAIN))
+    return np.where(no_limit, np.nan, ratio)
+
+
+def compute_limit_prices(pre_close: np.ndarray, ratio: np.ndarray):
+    """
+    计算涨跌停价（四舍五入到分）
+
+    Returns:
+        (涨停价数组, 跌停价数组)
+    """
+    limit_up = np.floor(pre_close * (1 + ratio) * 100 + 0.5 + 1e-6) / 100
+    limit_down = np.floor(pre_close * (1 - ratio) * 100 + 0.5 + 1e-6) / 100
+    return limit_up, limit_down
+
+
+class LimitMonitor:
+    """涨跌停监控引擎"""
+
+    def __init__(self, max_recent_events: int = 2000):
+        self.trade_date: Optional[date] = None
+        self.recent_events = deque(maxlen=max_recent_events)
+        self.last_eval_seconds: Optional[float] = None
+        # 是否写入事件表（多进程部署时只由采集进程写入，API进程只维护状态）
+        self.persist_events = True
+
+        # 上一快照的状态（按 self.codes 对齐）
+        self.codes: Optional[np.ndarray] = None
+        self.at_up = self.at_down = None
+        self.broke_up = self.broke_down = None
+        self.limit_up = self.limit_down = None
+        self.snapshot: Optional[MarketSnapshot] = None
+
+        # 股票维度信息（按交易日加载一次）
+        self._stock_info: Dict[str, tuple] = {}
+        self._stock_info_date: Optional[date] = None
+        self._flag_codes: Optional[np.ndarray] = None
+        self._flag_arrays: Optional[tuple] = None
+
+    # ========== 股票维度 ==========
+
+    def load_stock_info(self, trade_date: date):
+        """加载股票ID、ST/创业板/科创板标记和上市日期"""
+        db = SessionLocal()
+        try:
+            rows = db.query(
+                Stock.stock_code, Stock.stock_id, Stock.is_st, Stock.is_gem, Stock.is_star, Stock.listing_date
+            ).all()
+        finally:
+            db.close()
+
+        new_listing_since = trade_date - timedelta(days=NEW_LISTING_DAYS)
+        self._stock_info = {
+            code: (
+                stock_id,
+                bool(is_st),
+                bool(is_gem),
+                bool(is_star),
+                listing_date is not None and listing_date > new_listing_since,
+            )
+            for code, stock_id, is_st, is_gem, is_star, listing_date in rows
+        }
+        self._stock_info_date = trade_date
+        self._flag_codes = None
+
+    def ensure_stock_info(self, trade_date: date) -> int:
+        """按交易日加载股票维度信息（已加载时跳过），返回股票数"""
+        if self._stock_info_date != trade_date:
+            self.load_stock_info(trade_date)
+        return len(self._stock_info)
+
+    def _align_flags(self, snapshot: MarketSnapshot) -> tuple:
+        """把股票维度信息对齐到快照顺序（代码集合不变时复用）"""
+        if self._flag_codes is not None and np.array_equal(self._flag_codes, snapshot.codes):
+            return self._flag_arrays
+
+        default = (None, False, False, False, False)
+        info = [self._stock_info.get(code, default) for code in snapshot.codes.tolist()]
+        stock_ids = np.array([item[0] for item in info], dtype=object)
+        flags = np.array([item[1:] for item in info], dtype=bool).reshape(len(info), 4)
+        ratio = compute_limit_ratios(
+            snapshot.codes, snapshot.names, flags[:, 0], flags[:, 1], flags[:, 2], flags[:, 3]
+        )
+
+        self._flag_codes = snapshot.codes
+        self._flag_arrays = (stock_ids, ratio)
+        return self._flag_arrays
+
+    # ========== 状态比对 ==========
+
+    def _previous_state(self, snapshot: MarketSnapshot) -> tuple:
+        """取上一快照状态并对齐到新快照顺序"""
+        n = len(snapshot)
+        if self.codes is None or len(self.codes) == 0:
+            empty = np.zeros(n, dtype=bool)
+            return empty, empty, empty, empty
+
+        if np.array_equal(self.codes, snapshot.codes):
+            return self.at_up, self.at_down, self.broke_up, self.broke_down
+
+        pos = np.searchsorted(self.codes, snapshot.codes)
+        pos = np.clip(pos, 0, len(self.codes) - 1)
+        found = self.codes[pos] == snapshot.codes
+        return tuple(
+            np.where(found, state[pos], False)
+            for state in (self.at_up, self.at_down, self.broke_up, self.broke_down)
+        )
+
+    def evaluate(self, snapshot: MarketSnapshot) -> List[Dict]:
+        """
+        评估一个快照，返回新产生的事件
+
+        交易日取自行情时间（非交易时段轮询得到的仍是上一交易日的行情）；
+        进程启动后的第一个快照和新交易日的第一个快照只建立状态，不产生事件，
+        避免重启或跨日时把仍处于涨跌停的股票重复记录
+        """
+        started = time.perf_counter()
+        trade_date = snapshot.trade_date
+        emit = self.codes is not None and trade_date == self.trade_date
+
+        if trade_date != self.trade_date:
+            # 新交易日，清空状态
+            self.trade_date = trade_date
+            if self.codes is not None:
+                self.codes = self.codes[:0]
+                self.at_up = self.at_down = self.broke_up = self.broke_down = np.zeros(0, dtype=bool)
+
+        stock_ids, ratio = self._align_flags(snapshot)
+        price = snapshot['current_price']
+        pre_close = snapshot['pre_close_price']
+        high = snapshot['high_price']
+        low = snapshot['low_price']
+
+        with np.errstate(invalid='ignore'):
+            valid = (price > 0) & (pre_close > 0) & ~np.isnan(ratio)
+            limit_up, limit_down = compute_limit_prices(pre_close, ratio)
+
+            at_up = valid & (price >= limit_up - PRICE_TOLERANCE)
+            at_down = valid & (price <= limit_down + PRICE_TOLERANCE)
+            touched_up = valid & (high >= limit_up - PRICE_TOLERANCE)
+            touched_down = valid & (low <= limit_down + PRICE_TOLERANCE)
+
+        prev_up, prev_down, prev_broke_up, prev_broke_down = self._previous_state(snapshot)
+
+        # 涨停：新封板区分首次涨停和回封；炸板包括两次快照之间触及涨停但未封住
+        new_up = at_up & ~prev_up
+        break_up = ~at_up & (prev_up | (touched_up & ~prev_broke_up))
+        new_down = at_down & ~prev_down
+        break_down = ~at_down & (prev_down | (touched_down & ~prev_broke_down))
+
+        masks = {
+            'limit_up': new_up & ~prev_broke_up,
+            'limit_up_reseal': new_up & prev_broke_up,
+            'limit_up_break': break_up,
+            'limit_down': new_down & ~prev_broke_down,
+            'limit_down_reseal': new_down & prev_broke_down,
+            'limit_down_break': break_down,
+        }
+
+        events = []
+        if emit:
+            event_time = snapshot.created_at
+            for event_type, mask in masks.items():
+                limit_price = limit_up if event_type.startswith('limit_up') else limit_down
+                for pos in np.flatnonzero(mask).tolist():
+                    events.append({
+                        'stock_id': stock_ids[pos],
+                        'stock_code': str(snapshot.codes[pos]),
+                        'stock_name': snapshot.names[pos],
+                        'trade_date': trade_date,
+                        'event_time': event_time,
+                        'event_type': event_type,
+                        'price': float(price[pos]),
+                        'limit_price': float(limit_price[pos]),
+                        'change_percent': float(snapshot['change_percent'][pos]),
+                        'main_inflow': float(np.nan_to_num(snapshot['main_inflow'][pos])),
+                    })
+
+        # 保存状态
+        self.codes = snapshot.codes
+        self.at_up, self.at_down = at_up, at_down
+        self.broke_up = prev_broke_up | break_up
+        self.broke_down = prev_broke_down | break_down
+        self.limit_up, self.limit_down = limit_up, limit_down
+        self.snapshot = snapshot
+
+        self.last_eval_seconds = time.perf_counter() - started
+        return events
+
+    # ========== 快照订阅 ==========
+
+    @staticmethod
+    def save_events(events: List[Dict]):
+        """批量写入事件"""
+        db = SessionLocal()
+        try:
+            db.bulk_insert_mappings(LimitEvent, events)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def on_snapshot(self, previous: Optional[MarketSnapshot], snapshot: MarketSnapshot):
+        """全市场快照更新回调"""
+        trade_date = snapshot.trade_date
+        if self._stock_info_date != trade_date:
+            await asyncio.to_thread(self.load_stock_info, trade_date)
+
+        events = self.evaluate(snapshot)
+        logger.debug(f"涨跌停监控完成，股票数: {len(snapshot)}，事件: {len(events)}，耗时: {self.last_eval_seconds * 1000:.1f}ms")
+
+        if events:
+            self.recent_events.extend(events)
+            if self.persist_events:
+                await asyncio.to_thread(self.save_events, events)
+
+    def status(self) -> Dict:
+        """当前涨跌停状态"""
+        if self.snapshot is None:
+            return {'updated_at': None, 'limit_up': [], 'limit_down': [], 'limit_up_broken': 0, 'limit_down_broken': 0}
+
+        def _items(mask, limit_price):
+            return [
+                {
+                    'stock_code': str(self.codes[pos]),
+                    'stock_name': self.snapshot.names[pos],
+                    'price': float(self.snapshot['current_price'][pos]),
+                    'limit_price': float(limit_price[pos]),
+                    'change_percent': float(self.snapshot['change_percent'][pos]),
+                }
+                for pos in np.flatnonzero(mask).tolist()
+            ]
+
+        return {
+            'updated_at': self.snapshot.created_at.isoformat(),
+            'eval_ms': round(self.last_eval_seconds * 1000, 2) if self.last_eval_seconds is not None else None,
+            'limit_up': _items(self.at_up, self.limit_up),
+            'limit_down': _items(self.at_down, self.limit_down),
+            'limit_up_broken': int((self.broke_up & ~self.at_up).sum()),
+            'limit_down_broken': int((self.broke_down & ~self.at_down).sum()),
+        }
+
+
+# 全局涨跌停监控
+limit_monitor = LimitMonitor()
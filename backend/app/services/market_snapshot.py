@@ -0,0 +1,315 @@
+"""
+全市场快照模块
+
+周期性获取全市场行情和资金流向，整理为按股票代码排序的列式数组，
+供涨跌停监控等需要整表计算的模块使用。
+
+多进程部署时由采集进程获取快照并写入共享内存（SharedSnapshotPublisher），
+各API进程读取共享内存（SharedSnapshotFollower），不各自请求上游
+"""
+import os
+from datetime import date, datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+from loguru import logger
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.eastmoney_api import EastMoneyAPI
+from app.services.poller import IntervalPoller
+from app.services.system_config import get_config_value
+from app.utils.rate_limiter import eastmoney_limiter
+from app.utils.shared_snapshot import SharedSnapshotLayoutError, SharedSnapshotReader, SharedSnapshotWriter
+
+# 快照每页数量
+SNAPSHOT_PAGE_SIZE = 100
+
+# 快照数值列 -> 东方财富字段
+SNAPSHOT_COLUMNS = {
+    'current_price': 'f2',  # 最新价
+    'change_percent': 'f3',  # 涨跌幅
+    'volume': 'f5',  # 成交量（手）
+    'amount': 'f6',  # 成交额
+    'high_price': 'f15',  # 最高价
+    'low_price': 'f16',  # 最低价
+    'open_price': 'f17',  # 开盘价
+    'pre_close_price': 'f18',  # 昨收价
+    'main_inflow': 'f62',  # 主力净流入
+    'main_inflow_rate': 'f184',  # 主力净流入占比
+    'super_inflow': 'f66',  # 超大单净流入
+    'super_inflow_rate': 'f69',  # 超大单净流入占比
+    'large_inflow': 'f72',  # 大单净流入
+    'large_inflow_rate': 'f75',  # 大单净流入占比
+    'medium_inflow': 'f78',  # 中单净流入
+    'medium_inflow_rate': 'f81',  # 中单净流入占比
+    'small_inflow': 'f84',  # 小单净流入
+    'small_inflow_rate': 'f87',  # 小单净流入占比
+    'quote_time': 'f124',  # 行情时间（Unix 时间戳）
+}
+
+
+def _to_float(value) -> float:
+    """东方财富数值转换（停牌等情况返回 "-"，转换为NaN）"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class MarketSnapshot:
+    """全市场快照（列式数组，按股票代码升序）"""
+
+    def __init__(
+        self,
+        codes: np.ndarray,
+        names: np.ndarray,
+        columns: Dict[str, np.ndarray],
+        created_at: Optional[datetime] = None
+    ):
+        """
+        Args:
+            codes: 股票代码数组（升序）
+            names: 股票名称数组
+            columns: 数值列 {列名: float64数组}
+            created_at: 快照时间
+        """
+        self.codes = codes
+        self.names = names
+        self.columns = columns
+        self.created_at = created_at or datetime.now()
+
+    @classmethod
+    def from_items(cls, items: List[Dict], created_at: Optional[datetime] = None) -> "MarketSnapshot":
+        """由接口返回的 diff 列表构建快照（按代码去重并排序）"""
+        unique = {}
+        for item in items:
+            code = item.get('f12')
+            if code:
+                unique[code] = item
+        ordered = [unique[code] for code in sorted(unique)]
+
+        codes = np.array([item['f12'] for item in ordered], dtype='U6')
+        names = np.array([item.get('f14', '') for item in ordered], dtype=object)
+        columns = {
+            name: np.array([_to_float(item.get(field)) for item in ordered], dtype=np.float64)
+            for name, field in SNAPSHOT_COLUMNS.items()
+        }
+        return cls(codes, names, columns, created_at)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def trade_date(self) -> date:
+        """行情所属交易日（取最新的行情时间；没有行情时间时取快照时间）"""
+        quote_time = self.columns.get('quote_time')
+        if quote_time is not None:
+            with np.errstate(invalid='ignore'):
+                valid = quote_time[quote_time > 0]
+            if len(valid):
+                return datetime.fromtimestamp(float(valid.max())).date()
+        return self.created_at.date()
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    def positions(self, codes) -> np.ndarray:
+        """
+        查找股票代码在快照中的位置
+
+        Returns:
+            位置数组，不在快照中的代码为 -1
+        """
+        codes = np.asarray(codes, dtype='U6')
+        if len(self.codes) == 0:
+            return np.full(len(codes), -1, dtype=np.int64)
+        pos = np.searchsorted(self.codes, codes)
+        pos = np.clip(pos, 0, len(self.codes) - 1)
+        return np.where(self.codes[pos] == codes, pos, -1)
+
+    def save(self, path: str):
+        """
+        保存到本地文件（.npz，先写临时文件再替换，中途退出不会留下不完整的文件）
+        """
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(target.name + '.tmp')
+        with open(tmp, 'wb') as f:
+            np.savez(
+                f,
+                codes=self.codes,
+                names=self.names.astype(str),
+                created_at=np.array(self.created_at.isoformat()),
+                **{f"col_{name}": values for name, values in self.columns.items()}
+            )
+        os.replace(tmp, target)
+
+    @classmethod
+    def load(cls, path: str) -> "MarketSnapshot":
+        """从 save 保存的文件读取"""
+        with np.load(path, allow_pickle=False) as data:
+            # 旧版本文件缺少的列按NaN补齐
+            columns = {
+                name: data[f"col_{name}"] if f"col_{name}" in data.files else np.full(len(data['codes']), np.nan)
+                for name in SNAPSHOT_COLUMNS
+            }
+            return cls(
+                data['codes'].astype('U6'),
+                data['names'].astype(object),
+                columns,
+                datetime.fromisoformat(str(data['created_at']))
+            )
+
+    def record(self, pos: int) -> Dict:
+        """取单只股票的快照数据（NaN 转换为 None）"""
+        record = {'stock_code': str(self.codes[pos]), 'stock_name': self.names[pos]}
+        for name, values in self.columns.items():
+            value = values[pos]
+            record[name] = None if np.isnan(value) else float(value)
+        return record
+
+
+SnapshotListener = Callable[[Optional[MarketSnapshot], MarketSnapshot], Awaitable[None]]
+
+
+class SnapshotStore:
+    """当前快照的持有者，快照更新时通知订阅者"""
+
+    def __init__(self):
+        self.current: Optional[MarketSnapshot] = None
+        self._listeners: List[SnapshotListener] = []
+
+    def subscribe(self, listener: SnapshotListener):
+        """订阅快照更新，listener(上一快照, 新快照)"""
+        self._listeners.append(listener)
+
+    async def publish(self, snapshot: MarketSnapshot):
+        """发布新快照并依次通知订阅者"""
+        previous, self.current = self.current, snapshot
+        for listener in self._listeners:
+            try:
+                await listener(previous, snapshot)
+            except Exception as e:
+                logger.error(f"快照订阅者处理失败: {e}")
+
+
+# 全局快照
+market_snapshot_store = SnapshotStore()
+
+
+async def fetch_market_snapshot(api: EastMoneyAPI) -> Optional[MarketSnapshot]:
+    """分页并发获取全市场快照"""
+    items = await api.fetch_all_pages(
+        lambda page: api.get_market_snapshot_page(page=page, page_size=SNAPSHOT_PAGE_SIZE),
+        page_size=SNAPSHOT_PAGE_SIZE
+    )
+    if not items:
+        return None
+    return MarketSnapshot.from_items(items)
+
+
+class MarketSnapshotPoller(IntervalPoller):
+    """
+    全市场快照轮询任务
+
+    周期取 market_collection_interval 和 limit_up_monitor_interval 中较小者，
+    以满足涨跌停监控的刷新频率
+    """
+
+    name = "全市场快照"
+    interval_key = "market_collection_interval"
+    default_interval = 300
+
+    def __init__(self, store: SnapshotStore = market_snapshot_store):
+        super().__init__()
+        self.store = store
+        self.api = EastMoneyAPI(
+            base_url=settings.EASTMONEY_BASE_URL,
+            history_url=settings.EASTMONEY_HISTORY_URL,
+            limiter=eastmoney_limiter,
+        )
+
+    def load_interval(self):
+        db = SessionLocal()
+        try:
+            self.interval = min(
+                get_config_value(db, 'market_collection_interval', self.default_interval),
+                get_config_value(db, 'limit_up_monitor_interval', self.default_interval),
+            )
+        finally:
+            db.close()
+
+    async def close(self):
+        await self.api.close()
+
+    async def run_once(self):
+        snapshot = await fetch_market_snapshot(self.api)
+        if snapshot is None:
+            logger.warning(f"{self.name} 获取失败")
+            return
+        await self.store.publish(snapshot)
+        logger.debug(f"{self.name} 更新完成，股票数: {len(snapshot)}")
+
+
+class SharedSnapshotPublisher:
+    """把每个新快照写入共享内存（采集进程订阅 market_snapshot_store）"""
+
+    def __init__(self, name: str, capacity: int):
+        self.writer = SharedSnapshotWriter.create(name, capacity, tuple(SNAPSHOT_COLUMNS))
+
+    async def on_snapshot(self, previous: Optional[MarketSnapshot], snapshot: MarketSnapshot):
+        generation = self.writer.publish(
+            snapshot.codes, snapshot.names, snapshot.columns, snapshot.created_at.timestamp()
+        )
+        logger.debug(f"共享内存快照已更新，版本: {generation}，股票数: {len(snapshot)}")
+
+    def close(self):
+        """关闭并删除共享内存段"""
+        self.writer.close()
+        self.writer.unlink()
+
+
+class SharedSnapshotFollower(IntervalPoller):
+    """
+    共享内存快照读取任务（API进程）
+
+    按固定间隔检查版本号，有新版本时构建快照并发布到本进程；共享内存尚未创建时下一周期重试
+
+    数值列直接使用共享内存上的只读视图（不复制），在采集进程再发布两次之前有效，
+    检查间隔应小于采集周期；股票代码和名称复制一份，订阅者（如涨跌停监控）跨版本缓存代码数组时
+    不会因同一个槽被原地覆盖而误判代码集合未变化
+    """
+
+    name = "共享快照读取"
+
+    def __init__(self, shm_name: str, interval: float = 1.0, store: SnapshotStore = market_snapshot_store):
+        super().__init__()
+        self.interval = interval
+        self.shm_name = shm_name
+        self.store = store
+        self.reader: Optional[SharedSnapshotReader] = None
+        self.generation = 0
+
+    async def close(self):
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
+
+    async def run_once(self):
+        if self.reader is None:
+            try:
+                self.reader = SharedSnapshotReader.attach(self.shm_name, tuple(SNAPSHOT_COLUMNS))
+            except SharedSnapshotLayoutError as e:
+                logger.debug(f"{self.name} 等待采集进程: {e}")
+                return
+            logger.info(f"{self.name} 已连接共享内存: {self.shm_name}")
+
+        view = self.reader.read()
+        if view is None or view.generation == self.generation:
+            return
+        self.generation = view.generation
+        await self.store.publish(MarketSnapshot(
+            view.codes.copy(), view.names.copy(), view.columns, datetime.fromtimestamp(view.created_at)
+        ))
@@ -0,0 +1,45 @@
+"""
+用户权限模块
+
+管理员为 user_groups.group_level >= ADMIN_GROUP_LEVEL 的有效用户组成员
+"""
+from sqlalchemy import or_, func
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.user import UserGroup, UserGroupRelation
+from app.utils.cache import shared_cache
+
+# 管理员用户组级别
+ADMIN_GROUP_LEVEL = 99
+
+# 管理员判断结果缓存（秒）
+ADMIN_CACHE_TTL = 60
+
+
+def is_admin(db: Session, user_id: int) -> bool:
+    """用户是否属于有效的管理员组"""
+    return db.query(UserGroupRelation.relation_id).join(
+        UserGroup, UserGroup.group_id == UserGroupRelation.group_id
+    ).filter(
+        UserGroupRelation.user_id == user_id,
+        UserGroupRelation.status == 'active',
+        or_(UserGroupRelation.expires_at.is_(None), UserGroupRelation.expires_at > func.now()),
+        UserGroup.group_level >= ADMIN_GROUP_LEVEL,
+        UserGroup.status == 'active'
+    ).first() is not None
+
+
+def is_admin_cached(user_id: int) -> bool:
+    """用户是否为管理员（结果缓存 ADMIN_CACHE_TTL 秒，供没有数据库会话的中间件使用）"""
+    key = f"admin:{user_id}"
+    cached = shared_cache.get(key)
+    if cached is not None:
+        return cached
+    db = SessionLocal()
+    try:
+        result = is_admin(db, user_id)
+    finally:
+        db.close()
+    shared_cache.set(key, result, ttl=ADMIN_CACHE_TTL)
+    return result
@@ -0,0 +1,101 @@
+"""
+后台轮询任务基础模块
+
+轮询任务在API进程内以固定周期运行，周期从 system_config 读取
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Optional
+
+from loguru import logger
+
+from app.core.database import SessionLocal
+from app.services.system_config import get_config_value
+from app.utils.metrics import metrics
+
+# 轮询任务指标（按任务类名）
+POLLER_DURATION = metrics.histogram(
+    "poller_run_seconds", "轮询任务单次执行耗时", ("poller",),
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+)
+POLLER_RUNS = metrics.counter("poller_runs_total", "轮询任务执行次数", ("poller", "outcome"))
+
+
+class IntervalPoller:
+    """固定周期轮询任务基类"""
+
+    # 任务名称（用于日志）
+    name: str = "poller"
+    # 周期配置键（system_config.config_key）
+    interval_key: Optional[str] = None
+    # 默认周期（秒）
+    default_interval: float = 60
+
+    def __init__(self):
+        self.interval = self.default_interval
+        self.last_run_at: Optional[datetime] = None
+        self.last_duration: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        # 第一次执行完成（无论成功与否）后置位，供启动预热等待
+        self.first_run = asyncio.Event()
+
+    async def run_once(self):
+        """执行一次轮询（子类实现）"""
+        raise NotImplementedError
+
+    async def close(self):
+        """释放资源（子类按需实现）"""
+
+    def load_interval(self):
+        """从 system_config 读取轮询周期"""
+        if not self.interval_key:
+            return
+        db = SessionLocal()
+        try:
+            self.interval = get_config_value(db, self.interval_key, self.default_interval)
+        finally:
+            db.close()
+
+    async def _loop(self):
+        """轮询主循环"""
+        try:
+            await asyncio.to_thread(self.load_interval)
+        except Exception as e:
+            logger.warning(f"{self.name} 读取轮询周期失败，使用默认值 {self.interval}s: {e}")
+
+        logger.info(f"{self.name} 已启动，周期: {self.interval}s")
+        while True:
+            started = time.monotonic()
+            outcome = 'success'
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                outcome = 'error'
+                logger.error(f"{self.name} 执行失败: {e}")
+
+            self.last_run_at = datetime.now()
+            self.last_duration = time.monotonic() - started
+            labels = (type(self).__name__,)
+            POLLER_DURATION.observe(labels, self.last_duration)
+            POLLER_RUNS.inc(labels + (outcome,))
+            self.first_run.set()
+            await asyncio.sleep(max(0.0, self.interval - self.last_duration))
+
+    def start(self):
+        """在当前事件循环中启动轮询"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        """停止轮询"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.close()
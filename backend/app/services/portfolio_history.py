@@ -0,0 +1,187 @@
+"""
+持仓市值历史模块
+
+一次读取全部持股和相关股票的收盘价面板，按 (持股 × 交易日) 整表计算市值和成本，
+再按用户聚合为 (用户 × 交易日) 的市值、成本和浮动盈亏，结果写入 portfolio_history
+
+持股表只记录当前持仓，历史按 "买入日起持有当前数量" 计算；未填买入日的持股从计算区间起点开始计入
+"""
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.orm import Session
+from loguru import logger
+
+from app.core.database import SessionLocal
+from app.models.holding import Holding, PortfolioHistory
+from app.services.flow_panel import load_flow_panel
+
+# 未填买入日时默认回溯的自然日数
+DEFAULT_HISTORY_DAYS = 365
+
+
+def forward_fill(matrix: np.ndarray) -> np.ndarray:
+    """沿交易日方向用最近一个有效值填充NaN（停牌日沿用停牌前收盘价）"""
+    valid = ~np.isnan(matrix)
+    index = np.where(valid, np.arange(matrix.shape[1]), 0)
+    np.maximum.accumulate(index, axis=1, out=index)
+    filled = matrix[np.arange(matrix.shape[0])[:, None], index]
+    # 第一个有效值之前保持NaN
+    filled[~np.maximum.accumulate(valid, axis=1)] = np.nan
+    return filled
+
+
+def compute_portfolio_matrix(
+    user_ids: np.ndarray,
+    holding_pos: np.ndarray,
+    quantity: np.ndarray,
+    cost_price: np.ndarray,
+    start_index: np.ndarray,
+    close: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """
+    按用户聚合每日持仓市值
+
+    Args:
+        user_ids: 每条持股的用户ID
+        holding_pos: 每条持股对应的收盘价面板行号
+        quantity / cost_price: 每条持股的数量和成本价
+        start_index: 每条持股开始计入的交易日列号
+        close: 收盘价面板（股票 × 交易日，已向前填充）
+
+    Returns:
+        {'user_ids': 用户ID[用户数], 'market_value' / 'cost' / 'holding_count': [用户数, 交易日数]}
+    """
+    days = close.shape[1]
+    active = np.arange(days)[None, :] >= start_index[:, None]
+    price = close[holding_pos]
+
+    # 收盘价缺失（买入日前尚无数据）时按成本价计，盈亏为0
+    price = np.where(np.isnan(price), cost_price[:, None], price)
+    value = np.where(active, price * quantity[:, None], 0.0)
+    cost = np.where(active, (cost_price * quantity)[:, None], 0.0)
+
+    unique_users, user_pos = np.unique(user_ids, return_inverse=True)
+
+    def _by_user(matrix):
+        return np.column_stack([
+            np.bincount(user_pos, weights=matrix[:, t], minlength=len(unique_users)) for t in range(days)
+        ]).reshape(len(unique_users), days)
+
+    return {
+        'user_ids': unique_users,
+        'market_value': _by_user(value),
+        'cost': _by_user(cost),
+        'holding_count': _by_user(active.astype(np.float64)).astype(np.int64),
+    }
+
+
+def build_history_rows(result: Dict[str, np.ndarray], dates: List[date]) -> List[Dict]:
+    """整理为 portfolio_history 行（只保留有持仓的交易日）"""
+    market_value, cost = result['market_value'], result['cost']
+    profit_loss = market_value - cost
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rate = np.where(cost > 0, profit_loss / cost * 100, np.nan)
+
+    rows = []
+    user_index, day_index = np.nonzero(result['holding_count'] > 0)
+    for u, t in zip(user_index.tolist(), day_index.tolist()):
+        rows.append({
+            'user_id': int(result['user_ids'][u]),
+            'trade_date': dates[t],
+            'market_value': round(float(market_value[u, t]), 2),
+            'cost': round(float(cost[u, t]), 2),
+            'profit_loss': round(float(profit_loss[u, t]), 2),
+            'profit_loss_rate': None if np.isnan(rate[u, t]) else round(float(rate[u, t]), 4),
+            'holding_count': int(result['holding_count'][u, t]),
+        })
+    return rows
+
+
+# 重新计算时覆盖的列
+HISTORY_UPDATE_COLUMNS = ('market_value', 'cost', 'profit_loss', 'profit_loss_rate', 'holding_count')
+
+
+def save_history(db: Session, rows: List[Dict], batch_size: int = 1000):
+    """
+    按 (用户, 交易日) 写入持仓市值，已有记录覆盖
+
+    只改写本次计算出的行：持股表只有当前持仓，已清仓用户的历史记录保留不动
+    """
+    for i in range(0, len(rows), batch_size):
+        stmt = mysql_insert(PortfolioHistory).values(rows[i:i + batch_size])
+        stmt = stmt.on_duplicate_key_update({column: stmt.inserted[column] for column in HISTORY_UPDATE_COLUMNS})
+        db.execute(stmt)
+    db.commit()
+
+
+def compute_portfolio_history(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> int:
+    """
+    计算全部用户的每日持仓市值
+
+    Args:
+        start_date: 开始日期，为None时取最早的买入日（没有买入日时回溯 DEFAULT_HISTORY_DAYS 天）
+        end_date: 结束日期，为None时取今天
+
+    Returns:
+        写入的记录数
+    """
+    db = SessionLocal()
+    try:
+        holdings = db.query(
+            Holding.user_id, Holding.stock_id, Holding.quantity, Holding.cost_price, Holding.buy_date
+        ).all()
+        if not holdings:
+            logger.info("没有持股记录，跳过持仓市值计算")
+            return 0
+
+        end_date = end_date or date.today()
+        if start_date is None:
+            earliest = db.query(func.min(Holding.buy_date)).scalar()
+            start_date = earliest or end_date - timedelta(days=DEFAULT_HISTORY_DAYS)
+
+        stock_ids = sorted({row.stock_id for row in holdings})
+        panel = load_flow_panel(db, start_date, end_date, columns=('close_price',), stock_ids=stock_ids)
+        if not panel.dates:
+            logger.warning("计算区间内没有收盘价数据")
+            return 0
+
+        close = forward_fill(panel['close_price'])
+
+        # 面板中没有收盘价的股票放在额外的一行（全部为NaN，按成本价计）
+        close = np.vstack([close, np.full((1, close.shape[1]), np.nan)])
+        row_map = {stock_id: i for i, stock_id in enumerate(panel.stock_ids.tolist())}
+        date_ordinals = np.array([d.toordinal() for d in panel.dates], dtype=np.int64)
+        start_ordinal = start_date.toordinal()
+
+        result = compute_portfolio_matrix(
+            user_ids=np.array([row.user_id for row in holdings], dtype=np.int64),
+            holding_pos=np.array([row_map.get(row.stock_id, len(row_map)) for row in holdings], dtype=np.int64),
+            quantity=np.array([row.quantity for row in holdings], dtype=np.float64),
+            cost_price=np.array([float(row.cost_price) for row in holdings], dtype=np.float64),
+            start_index=np.searchsorted(date_ordinals, np.array([
+                (row.buy_date.toordinal() if row.buy_date else start_ordinal) for row in holdings
+            ], dtype=np.int64)),
+            close=close,
+        )
+
+        rows = build_history_rows(result, panel.dates)
+        save_history(db, rows)
+        logger.info(
+            f"持仓市值计算完成，用户数: {len(result['user_ids'])}，持股数: {len(holdings)}，"
+            f"交易日: {len(panel.dates)}，写入: {len(rows)}"
+        )
+        return len(rows)
+
+    except Exception as e:
+        logger.error(f"持仓市值计算出错: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
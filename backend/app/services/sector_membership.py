@@ -0,0 +1,233 @@
+"""
+板块成分股模块
+
+并发采集各板块成分股并与已存储的成分关系做差异比对，只写入变化部分；
+同时提供基于成分关系的板块聚合，使板块合计可直接由个股数据计算，无需逐板块请求上游
+"""
+import asyncio
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+from loguru import logger
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.sector import Sector, SectorStock
+from app.models.stock import Stock
+from app.services.eastmoney_api import EastMoneyAPI
+from app.services.system_config import configure_eastmoney_limiter
+from app.utils.rate_limiter import eastmoney_limiter
+
+# 成分股列表每页数量
+CONSTITUENT_PAGE_SIZE = 100
+
+
+# ========== 成分关系读取 ==========
+
+def load_membership(db: Session) -> Dict[int, Set[int]]:
+    """
+    读取全部板块成分关系
+
+    Returns:
+        {sector_id: {stock_id, ...}}
+    """
+    membership: Dict[int, Set[int]] = {}
+    for sector_id, stock_id in db.query(SectorStock.sector_id, SectorStock.stock_id).all():
+        membership.setdefault(sector_id, set()).add(stock_id)
+    return membership
+
+
+class MembershipIndex:
+    """
+    板块成分关系的数组索引
+
+    把 (板块, 股票) 关系展开为两个等长的位置数组，
+    板块聚合只需一次 np.bincount，不需要逐板块循环
+    """
+
+    def __init__(self, membership: Dict[int, Set[int]], stock_ids: Sequence[int]):
+        """
+        Args:
+            membership: load_membership 的返回结果
+            stock_ids: 个股数据数组对应的 stock_id 顺序
+        """
+        self.sector_ids = np.array(sorted(membership.keys()), dtype=np.int64)
+        stock_pos = {stock_id: i for i, stock_id in enumerate(stock_ids)}
+
+        pair_sector, pair_stock = [], []
+        for sector_pos, sector_id in enumerate(self.sector_ids.tolist()):
+            for stock_id in membership[sector_id]:
+                pos = stock_pos.get(stock_id)
+                if pos is not None:
+                    pair_sector.append(sector_pos)
+                    pair_stock.append(pos)
+
+        self.pair_sector = np.array(pair_sector, dtype=np.int64)
+        self.pair_stock = np.array(pair_stock, dtype=np.int64)
+        self.sector_size = np.bincount(self.pair_sector, minlength=len(self.sector_ids))
+
+    def sum(self, values: np.ndarray) -> np.ndarray:
+        """
+        按板块求和
+
+        Args:
+            values: 个股数值，形状为 (股票数,) 或 (股票数, 列数)；NaN 视为0
+
+        Returns:
+            板块合计，形状为 (板块数,) 或 (板块数, 列数)
+        """
+        values = np.nan_to_num(np.asarray(values, dtype=np.float64))
+        picked = values[self.pair_stock]
+        if picked.ndim == 1:
+            return np.bincount(self.pair_sector, weights=picked, minlength=len(self.sector_ids))
+
+        # 逐列 bincount 比 np.add.at 快一个数量级
+        return np.column_stack([
+            np.bincount(self.pair_sector, weights=picked[:, i], minlength=len(self.sector_ids))
+            for i in range(picked.shape[1])
+        ]).reshape(len(self.sector_ids), picked.shape[1])
+
+
+# ========== 成分股采集 ==========
+
+async def fetch_sector_constituents(api: EastMoneyAPI, sector_code: str) -> Optional[List[str]]:
+    """
+    获取单个板块的全部成分股代码
+
+    Returns:
+        股票代码列表，请求失败或任一页失败返回None（与"成分为空"区分，避免按不完整列表误删成分关系）
+    """
+    items = await api.fetch_all_pages(
+        lambda page: api.get_sector_constituents(
+            sector_code,
+            page=page,
+            page_size=CONSTITUENT_PAGE_SIZE
+        ),
+        page_size=CONSTITUENT_PAGE_SIZE,
+        require_complete=True
+    )
+    if not items:
+        return None
+    return [item.get('f12') for item in items if item.get('f12')]
+
+
+def diff_membership(stored: Set[int], fetched: Set[int]) -> Tuple[Set[int], Set[int]]:
+    """
+    比对成分关系
+
+    Returns:
+        (新增的 stock_id, 移除的 stock_id)
+    """
+    return fetched - stored, stored - fetched
+
+
+def save_membership_changes(
+    db: Session,
+    sector: Sector,
+    added: Set[int],
+    removed: Set[int],
+    members: Dict[int, str]
+):
+    """
+    写入单个板块的成分变化，并同步 sectors 表的成分数和代码列表
+
+    Args:
+        members: 板块当前全部成分 {stock_id: stock_code}
+    """
+    if removed:
+        db.query(SectorStock).filter(
+            SectorStock.sector_id == sector.sector_id,
+            SectorStock.stock_id.in_(list(removed))
+        ).delete(synchronize_session=False)
+
+    if added:
+        db.bulk_insert_mappings(SectorStock, [
+            {'sector_id': sector.sector_id, 'stock_id': stock_id, 'stock_code': members[stock_id]}
+            for stock_id in added
+        ])
+
+    sector.stock_count = len(members)
+    sector.stock_codes = ','.join(sorted(members.values()))
+
+
+async def collect_sector_stocks(sector_type: Optional[str] = None) -> Dict[str, int]:
+    """
+    采集全部（或指定类型）板块的成分股，只写入变化部分
+
+    Args:
+        sector_type: 板块类型 (industry/concept/area)，为None时采集全部
+
+    Returns:
+        统计信息 {sectors, changed, added, removed, failed}
+    """
+    db = SessionLocal()
+    api = EastMoneyAPI(
+        base_url=settings.EASTMONEY_BASE_URL,
+        history_url=settings.EASTMONEY_HISTORY_URL,
+        limiter=eastmoney_limiter,
+    )
+    stats = {'sectors': 0, 'changed': 0, 'added': 0, 'removed': 0, 'failed': 0}
+
+    try:
+        configure_eastmoney_limiter(db)
+
+        query = db.query(Sector).filter(Sector.status == 'active')
+        if sector_type:
+            query = query.filter(Sector.sector_type == sector_type)
+        sectors = query.all()
+        stats['sectors'] = len(sectors)
+        logger.info(f"开始采集板块成分股，板块数: {len(sectors)}")
+
+        results = await asyncio.gather(
+            *(fetch_sector_constituents(api, sector.sector_code) for sector in sectors),
+            return_exceptions=True
+        )
+
+        stored_membership = load_membership(db)
+        stock_id_by_code = dict(db.query(Stock.stock_code, Stock.stock_id).all())
+        unknown_codes = set()
+
+        for sector, result in zip(sectors, results):
+            if isinstance(result, Exception) or result is None:
+                stats['failed'] += 1
+                logger.warning(f"获取板块成分股失败 {sector.sector_code}: {result}")
+                continue
+
+            members = {}
+            for code in result:
+                stock_id = stock_id_by_code.get(code)
+                if stock_id is None:
+                    unknown_codes.add(code)
+                else:
+                    members[stock_id] = code
+
+            added, removed = diff_membership(
+                stored_membership.get(sector.sector_id, set()),
+                set(members.keys())
+            )
+            if not added and not removed and sector.stock_count == len(members):
+                continue
+
+            save_membership_changes(db, sector, added, removed, members)
+            stats['changed'] += 1
+            stats['added'] += len(added)
+            stats['removed'] += len(removed)
+
+        db.commit()
+
+        if unknown_codes:
+            logger.info(f"{len(unknown_codes)} 只成分股不在股票表中，已跳过（可先运行 collect_stocks.py）")
+        logger.info(
+            f"板块成分股采集完成！变化板块: {stats['changed']}, 新增关系: {stats['added']}, "
+            f"移除关系: {stats['removed']}, 失败: {stats['failed']}"
+        )
+        return stats
+
+    except Exception as e:
+        logger.error(f"板块成分股采集出错: {e}")
+        db.rollback()
+        raise
+    finally:
+        await api.close()
+        db.close()
@@ -0,0 +1,214 @@
+"""
+板块轮动分析模块
+
+用板块成分关系把个股资金流向面板聚合为板块 × 交易日的资金流向，
+整表计算全部板块的排名变化、资金动量和广度（主力净流入成分股占比），
+结果按交易日保存到 sector_flows，并把最新排名回写 sectors.hot_rank
+
+成分关系使用当前的 sector_stocks，回算历史交易日时不考虑成分股调整
+"""
+from datetime import date
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.orm import Session
+from loguru import logger
+
+from app.core.database import SessionLocal
+from app.models.sector import Sector, SectorFlow
+from app.services.flow_panel import FlowPanel, load_recent_flow_panel
+from app.services.sector_membership import MembershipIndex, load_membership
+from app.services.system_config import get_config_value
+
+# 聚合的资金流向列
+SECTOR_SUM_COLUMNS = ('main_inflow', 'super_inflow', 'large_inflow', 'medium_inflow', 'small_inflow', 'amount')
+
+SECTOR_PANEL_COLUMNS = SECTOR_SUM_COLUMNS + ('change_percent',)
+
+
+def _rolling_sum(matrix: np.ndarray, window: int) -> np.ndarray:
+    """沿交易日方向的滚动求和（不足 window 天时按已有天数）"""
+    cumsum = np.cumsum(matrix, axis=1)
+    result = cumsum.copy()
+    result[:, window:] = cumsum[:, window:] - cumsum[:, :-window]
+    return result
+
+
+def rank_within_groups(values: np.ndarray, groups: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """
+    按分组对每个交易日降序排名
+
+    Args:
+        values: 板块 × 交易日
+        groups: 每个板块的分组（板块类型）
+        valid: 参与排名的位置，其他位置排名为0
+
+    Returns:
+        排名数组（从1开始），与 values 同形状
+    """
+    ranks = np.zeros(values.shape, dtype=np.int64)
+    for group in np.unique(groups):
+        rows = np.flatnonzero(groups == group)
+        group_values = np.where(valid[rows], values[rows], -np.inf)
+        order = np.argsort(-group_values, axis=0, kind='stable')
+        group_ranks = np.empty_like(order)
+        np.put_along_axis(
+            group_ranks, order,
+            np.broadcast_to(np.arange(1, len(rows) + 1)[:, None], order.shape).copy(),
+            axis=0
+        )
+        ranks[rows] = np.where(valid[rows], group_ranks, 0)
+    return ranks
+
+
+def compute_sector_metrics(
+    panel: FlowPanel,
+    index: MembershipIndex,
+    sector_types: np.ndarray,
+    momentum_days: int
+) -> Dict[str, np.ndarray]:
+    """
+    计算全部板块在面板各交易日的资金流向指标
+
+    Args:
+        panel: 个股资金流向面板
+        index: 按 panel.stock_ids 建立的成分关系索引
+        sector_types: 与 index.sector_ids 对齐的板块类型
+        momentum_days: 动量窗口（交易日）
+
+    Returns:
+        {指标名: float64/int64[板块数, 交易日数]}
+    """
+    metrics = {column: index.sum(panel[column]) for column in SECTOR_SUM_COLUMNS}
+
+    has_data = ~np.isnan(panel['main_inflow'])
+    stock_count = index.sum(has_data.astype(np.float64))
+    inflow_count = index.sum((panel['main_inflow'] > 0).astype(np.float64))
+    change_sum = index.sum(panel['change_percent'])
+
+    valid = stock_count > 0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        amount = metrics['amount']
+        metrics['inflow_ratio'] = np.where(amount > 0, metrics['main_inflow'] / amount, np.nan)
+        metrics['breadth'] = np.where(valid, inflow_count / stock_count, np.nan)
+        metrics['avg_change_percent'] = np.where(valid, change_sum / stock_count, np.nan)
+
+        window_main = _rolling_sum(metrics['main_inflow'], momentum_days)
+        window_amount = _rolling_sum(amount, momentum_days)
+        metrics['momentum'] = np.where(window_amount > 0, window_main / window_amount, np.nan)
+
+    ranks = rank_within_groups(metrics['main_inflow'], sector_types, valid)
+    rank_change = np.zeros(ranks.shape, dtype=np.int64)
+    rank_change[:, 1:] = np.where(
+        (ranks[:, 1:] > 0) & (ranks[:, :-1] > 0), ranks[:, :-1] - ranks[:, 1:], 0
+    )
+
+    metrics['flow_rank'] = ranks
+    metrics['rank_change'] = rank_change
+    metrics['stock_count'] = stock_count.astype(np.int64)
+    return metrics
+
+
+def build_sector_flow_rows(
+    sector_ids: np.ndarray,
+    dates: List[date],
+    metrics: Dict[str, np.ndarray],
+    days: int
+) -> List[Dict]:
+    """把最后 days 个交易日的指标整理为 sector_flows 行"""
+    def _value(value, digits):
+        return None if np.isnan(value) else round(float(value), digits)
+
+    rows = []
+    for col in range(max(len(dates) - days, 0), len(dates)):
+        for pos in np.flatnonzero(metrics['stock_count'][:, col] > 0).tolist():
+            rows.append({
+                'sector_id': int(sector_ids[pos]),
+                'trade_date': dates[col],
+                **{column: _value(metrics[column][pos, col], 2) for column in SECTOR_SUM_COLUMNS},
+                'inflow_ratio': _value(metrics['inflow_ratio'][pos, col], 6),
+                'avg_change_percent': _value(metrics['avg_change_percent'][pos, col], 4),
+                'breadth': _value(metrics['breadth'][pos, col], 4),
+                'momentum': _value(metrics['momentum'][pos, col], 6),
+                'flow_rank': int(metrics['flow_rank'][pos, col]),
+                'rank_change': int(metrics['rank_change'][pos, col]),
+                'stock_count': int(metrics['stock_count'][pos, col]),
+            })
+    return rows
+
+
+def save_sector_flows(db: Session, rows: List[Dict], batch_size: int = 1000):
+    """批量写入板块资金流向（同板块同交易日覆盖）"""
+    update_columns = [column for column in rows[0] if column not in ('sector_id', 'trade_date')] if rows else []
+    for i in range(0, len(rows), batch_size):
+        stmt = mysql_insert(SectorFlow).values(rows[i:i + batch_size])
+        stmt = stmt.on_duplicate_key_update({column: stmt.inserted[column] for column in update_columns})
+        db.execute(stmt)
+    db.commit()
+
+
+def update_hot_rank(db: Session, sector_ids: np.ndarray, ranks: np.ndarray):
+    """回写 sectors.hot_rank（无数据的板块置空）"""
+    db.bulk_update_mappings(Sector, [
+        {'sector_id': int(sector_id), 'hot_rank': int(rank) if rank > 0 else None}
+        for sector_id, rank in zip(sector_ids.tolist(), ranks.tolist())
+    ])
+    db.commit()
+
+
+def compute_sector_flows(
+    trade_date: Optional[date] = None,
+    days: int = 1,
+    momentum_days: Optional[int] = None
+) -> int:
+    """
+    计算并保存板块资金流向
+
+    Args:
+        trade_date: 截止交易日，为None时取 capital_flow 最新交易日
+        days: 计算截止日之前的交易日数（用于回算）
+        momentum_days: 动量窗口，为None时读取 system_config.sector_momentum_days
+
+    Returns:
+        写入的记录数
+    """
+    db = SessionLocal()
+    try:
+        momentum_days = momentum_days or get_config_value(db, 'sector_momentum_days', 5)
+
+        membership = load_membership(db)
+        if not membership:
+            logger.warning("板块成分关系为空，请先运行 collect_sector_stocks.py")
+            return 0
+
+        # 多读取的交易日用于首日的动量和排名变化
+        panel = load_recent_flow_panel(
+            db, days + momentum_days, trade_date, columns=SECTOR_PANEL_COLUMNS
+        )
+        if not panel.dates:
+            logger.warning("资金流向数据为空，跳过板块资金流向计算")
+            return 0
+
+        index = MembershipIndex(membership, panel.stock_ids.tolist())
+        type_map = dict(db.query(Sector.sector_id, Sector.sector_type).all())
+        sector_types = np.array([type_map.get(sector_id, '') for sector_id in index.sector_ids.tolist()])
+
+        metrics = compute_sector_metrics(panel, index, sector_types, momentum_days)
+        rows = build_sector_flow_rows(index.sector_ids, panel.dates, metrics, days)
+        save_sector_flows(db, rows)
+
+        if trade_date is None:
+            update_hot_rank(db, index.sector_ids, metrics['flow_rank'][:, -1])
+
+        logger.info(
+            f"板块资金流向计算完成，截止: {panel.dates[-1]}，板块数: {len(index.sector_ids)}，写入: {len(rows)}"
+        )
+        return len(rows)
+
+    except Exception as e:
+        logger.error(f"板块资金流向计算出错: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,41 @@
+"""
+股票范围模块
+
+提供各采集/轮询任务共用的股票范围查询
+"""
+from typing import List
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.holding import Holding, Watchlist
+from app.models.stock import Stock
+from app.services.eastmoney_api import EastMoneyAPI
+
+
+def get_user_universe(db: Session) -> List[Stock]:
+    """获取所有用户持股和收藏的股票（去重）"""
+    user_stock_ids = select(Holding.stock_id).union(select(Watchlist.stock_id))
+    return db.query(Stock).filter(Stock.stock_id.in_(user_stock_ids)).all()
+
+
+async def get_top_turnover_universe(db: Session, api: EastMoneyAPI, top_n: int) -> List[Stock]:
+    """获取成交额前N的股票（仅包含数据库中已有的股票）"""
+    codes = []
+    page = 1
+    while len(codes) < top_n:
+        raw_data = await api.get_realtime_capital_flow_rank(
+            page=page,
+            page_size=100,
+            sort_field='f6'  # f6=成交额
+        )
+        if not raw_data or not raw_data.get('diff'):
+            break
+        codes.extend(item.get('f12') for item in raw_data['diff'] if item.get('f12'))
+        page += 1
+
+    codes = codes[:top_n]
+    if not codes:
+        return []
+
+    return db.query(Stock).filter(Stock.stock_code.in_(codes)).all()
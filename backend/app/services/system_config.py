@@ -0,0 +1,54 @@
+"""
+系统配置读取模块
+
+从 system_config 表读取频率控制等运行参数，并按 config_type 转换类型
+"""
+import json
+from typing import Any
+
+from sqlalchemy.orm import Session
+from loguru import logger
+
+from app.models.system_config import SystemConfig
+from app.utils.rate_limiter import eastmoney_limiter
+
+
+def _convert_value(value: str, config_type: str) -> Any:
+    """按配置类型转换配置值"""
+    if config_type == 'int':
+        return int(value)
+    if config_type == 'float':
+        return float(value)
+    if config_type == 'json':
+        return json.loads(value)
+    return value
+
+
+def get_config_value(db: Session, config_key: str, default: Any = None) -> Any:
+    """
+    读取单个系统配置
+    
+    Args:
+        db: 数据库会话
+        config_key: 配置键
+        default: 配置不存在或解析失败时的默认值
+        
+    Returns:
+        转换后的配置值
+    """
+    try:
+        config = db.query(SystemConfig).filter(SystemConfig.config_key == config_key).first()
+        if config is None:
+            return default
+        return _convert_value(config.config_value, config.config_type)
+    except Exception as e:
+        logger.warning(f"读取系统配置失败: {config_key}, 错误: {e}")
+        return default
+
+
+def configure_eastmoney_limiter(db: Session):
+    """根据 system_config 调整共享的东方财富请求限流器"""
+    eastmoney_limiter.configure(
+        max_concurrent=get_config_value(db, 'max_concurrent_requests', eastmoney_limiter.max_concurrent),
+        interval=get_config_value(db, 'api_request_interval', eastmoney_limiter.interval),
+    )
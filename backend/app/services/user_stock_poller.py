@@ -0,0 +1,180 @@
+"""
+用户关注股票轮询模块
+
+按 user_stock_interval 周期，对所有用户持股和收藏股票的去重集合批量获取
+实时行情和资金流向，写入共享缓存。上游请求数只与去重后的股票数有关，与用户数无关
+"""
+import asyncio
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from loguru import logger
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.eastmoney_api import EastMoneyAPI, create_request_api
+from app.services.market_snapshot import market_snapshot_store
+from app.services.poller import IntervalPoller
+from app.services.stock_universe import get_user_universe
+from app.utils.cache import shared_cache
+from app.utils.rate_limiter import eastmoney_limiter
+
+# 单次批量请求的股票数
+BATCH_SIZE = 100
+
+# 缓存键前缀
+QUOTE_CACHE_PREFIX = "quote:"
+
+# 按需补齐的实时数据缓存时间（秒），之后由轮询任务接管
+QUOTE_MISS_TTL = 60
+
+
+def quote_cache_key(stock_code: str) -> str:
+    """股票实时数据的缓存键"""
+    return f"{QUOTE_CACHE_PREFIX}{stock_code}"
+
+
+def get_cached_quotes(stock_codes: Iterable[str]) -> Dict[str, Dict]:
+    """
+    从共享缓存批量读取股票实时数据
+
+    Returns:
+        {股票代码: parse_rank_data 格式的字典}，只包含命中的股票
+    """
+    cached = shared_cache.get_many(quote_cache_key(code) for code in stock_codes)
+    return {key[len(QUOTE_CACHE_PREFIX):]: value for key, value in cached.items()}
+
+
+def get_local_quotes(stock_codes: Iterable[str]) -> Dict[str, Dict]:
+    """
+    从本进程数据批量读取股票实时数据（不请求上游）
+
+    依次读取共享缓存（用户股票轮询写入）和全市场快照；
+    多进程部署时API进程不运行用户股票轮询，实时数据全部来自共享内存快照
+
+    Returns:
+        {股票代码: parse_rank_data 格式的字典}，只包含命中的股票
+    """
+    stock_codes = list(stock_codes)
+    quotes = get_cached_quotes(stock_codes)
+
+    missing = [code for code in stock_codes if code not in quotes]
+    snapshot = market_snapshot_store.current
+    if missing and snapshot is not None:
+        for code, pos in zip(missing, snapshot.positions(missing).tolist()):
+            if pos >= 0:
+                quotes[code] = snapshot.record(pos)
+    return quotes
+
+
+async def get_realtime_quotes(stocks: Sequence[Tuple[str, str]]) -> Dict[str, Dict]:
+    """
+    批量获取一组股票的实时数据
+
+    先读取本进程数据（共享缓存和全市场快照），
+    仍未命中的股票（如刚添加、轮询尚未覆盖）按批量接口一次性获取并写入缓存；
+    上游额度按批次一次性预留，额度不足时只返回本地数据
+
+    Args:
+        stocks: (股票代码, secid) 列表
+
+    Returns:
+        {股票代码: 实时数据}，字段名与 parse_rank_data 一致，获取失败的股票不在结果中
+    """
+    quotes = get_local_quotes(code for code, _ in stocks)
+    missing = [(code, secid) for code, secid in stocks if code not in quotes]
+
+    secids = list(dict.fromkeys(secid for _, secid in missing if secid))
+    if not secids:
+        return quotes
+
+    batches = [secids[i:i + BATCH_SIZE] for i in range(0, len(secids), BATCH_SIZE)]
+    api = create_request_api(limiter=eastmoney_limiter)
+    try:
+        if not await api.reserve_budget(len(batches)):
+            logger.warning(f"上游请求额度不足，{len(secids)} 只股票只返回本地数据")
+            return quotes
+        results = await asyncio.gather(
+            *(api.get_stocks_realtime_batch(batch) for batch in batches),
+            return_exceptions=True
+        )
+    finally:
+        await api.close()
+
+    fetched = {}
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning(f"批量获取实时数据失败: {result}")
+            continue
+        for item in api.parse_rank_data(result):
+            if item.get('stock_code'):
+                fetched[item['stock_code']] = item
+
+    shared_cache.set_many({quote_cache_key(code): item for code, item in fetched.items()}, ttl=QUOTE_MISS_TTL)
+    quotes.update(fetched)
+    return quotes
+
+
+def quote_number(value) -> Optional[float]:
+    """实时数据数值转换（停牌等情况上游返回 "-"，转换为None）"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class UserStockPoller(IntervalPoller):
+    """用户关注股票轮询任务"""
+
+    name = "用户股票轮询"
+    interval_key = "user_stock_interval"
+    default_interval = 60
+
+    def __init__(self):
+        super().__init__()
+        self.api = EastMoneyAPI(
+            base_url=settings.EASTMONEY_BASE_URL,
+            history_url=settings.EASTMONEY_HISTORY_URL,
+            limiter=eastmoney_limiter,
+        )
+
+    async def close(self):
+        await self.api.close()
+
+    @staticmethod
+    def load_universe() -> List[Tuple[str, str]]:
+        """加载所有用户关注股票的 (股票代码, secid)"""
+        db = SessionLocal()
+        try:
+            return [(stock.stock_code, stock.secid) for stock in get_user_universe(db)]
+        finally:
+            db.close()
+
+    async def fetch_batch(self, secids: List[str]) -> List[Dict]:
+        """批量获取一组股票的实时数据"""
+        raw_data = await self.api.get_stocks_realtime_batch(secids)
+        return self.api.parse_rank_data(raw_data)
+
+    async def run_once(self):
+        universe = await asyncio.to_thread(self.load_universe)
+        if not universe:
+            return
+
+        secids = [secid for _, secid in universe]
+        batches = [secids[i:i + BATCH_SIZE] for i in range(0, len(secids), BATCH_SIZE)]
+        results = await asyncio.gather(
+            *(self.fetch_batch(batch) for batch in batches),
+            return_exceptions=True
+        )
+
+        quotes = {}
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"{self.name} 批量获取失败: {result}")
+                continue
+            for item in result:
+                if item.get('stock_code'):
+                    quotes[quote_cache_key(item['stock_code'])] = item
+
+        # 缓存保留两个周期，单次轮询失败时仍可读取上一轮数据
+        shared_cache.set_many(quotes, ttl=self.interval * 2)
+        logger.debug(f"{self.name} 完成，股票数: {len(universe)}，请求数: {len(batches)}，更新: {len(quotes)}")
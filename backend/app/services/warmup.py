@@ -0,0 +1,138 @@
+"""
+启动预热模块
+
+应用启动后在后台依次完成：
+- 从本地文件恢复上次退出时的全市场快照（不超过 SNAPSHOT_MAX_AGE 秒）
+- 加载股票维度信息（涨跌停监控使用的ID、板块标记、上市日期）
+- 等待各轮询任务完成第一次执行（最新快照、用户股票行情、持股建议等滚动计算结果写入缓存）
+
+预热完成前 /health/ready 返回503，负载均衡不把请求转发到本进程，避免重启后请求全部穿透到上游；
+应用退出时把当前快照写回文件
+"""
+import asyncio
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+from app.core.config import settings
+from app.services.limit_monitor import limit_monitor
+from app.services.market_snapshot import MarketSnapshot, SnapshotStore, market_snapshot_store
+from app.services.poller import IntervalPoller
+
+
+class WarmupState:
+    """预热进度（/health 输出）"""
+
+    def __init__(self):
+        self.ready = False
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.steps: Dict[str, Dict] = {}
+
+    def record(self, name: str, status: str, started: float, detail: Optional[str] = None):
+        """记录一个预热步骤的结果（ok / skipped / failed / timeout）"""
+        self.steps[name] = {'status': status, 'seconds': round(time.perf_counter() - started, 3)}
+        if detail:
+            self.steps[name]['detail'] = detail
+
+    def to_dict(self) -> Dict:
+        return {
+            'ready': self.ready,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'steps': self.steps,
+        }
+
+
+# 全局预热状态
+warmup_state = WarmupState()
+
+
+def load_persisted_snapshot(path: str, max_age: float) -> Optional[MarketSnapshot]:
+    """读取本地保存的快照，文件不存在或超过 max_age 秒返回None"""
+    if not Path(path).exists():
+        return None
+    snapshot = MarketSnapshot.load(path)
+    if (datetime.now() - snapshot.created_at).total_seconds() > max_age:
+        logger.info(f"本地快照已过期（{snapshot.created_at:%Y-%m-%d %H:%M:%S}），不恢复")
+        return None
+    return snapshot
+
+
+def persist_snapshot(store: SnapshotStore = market_snapshot_store, path: str = settings.SNAPSHOT_FILE):
+    """保存当前快照到本地文件（没有快照时不处理）"""
+    if store.current is None or not path:
+        return
+    try:
+        store.current.save(path)
+        logger.info(f"全市场快照已保存: {path}，股票数: {len(store.current)}")
+    except OSError as e:
+        logger.warning(f"保存全市场快照失败: {e}")
+
+
+async def run_warmup(
+    pollers: List[IntervalPoller],
+    state: WarmupState = warmup_state,
+    store: SnapshotStore = market_snapshot_store,
+    snapshot_file: Optional[str] = settings.SNAPSHOT_FILE
+):
+    """
+    执行启动预热，完成后（包括步骤失败或超时）标记为就绪
+
+    先恢复本地快照再启动轮询任务，保证恢复的旧快照不会覆盖轮询获取的新快照
+
+    Args:
+        pollers: 轮询任务（由预热启动），等待其第一次执行完成
+        snapshot_file: 本地快照文件，为空时不恢复
+    """
+    state.started_at = datetime.now()
+
+    started = time.perf_counter()
+    if store.current is not None:
+        state.record('snapshot_file', 'skipped', started, '已有快照')
+    elif not snapshot_file:
+        state.record('snapshot_file', 'skipped', started, '未配置快照文件')
+    else:
+        try:
+            snapshot = await asyncio.to_thread(load_persisted_snapshot, snapshot_file, settings.SNAPSHOT_MAX_AGE)
+            if snapshot is None:
+                state.record('snapshot_file', 'skipped', started, '没有可用的本地快照')
+            else:
+                await store.publish(snapshot)
+                state.record('snapshot_file', 'ok', started, f"股票数: {len(snapshot)}，快照时间: {snapshot.created_at.isoformat()}")
+        except Exception as e:
+            state.record('snapshot_file', 'failed', started, str(e))
+            logger.warning(f"恢复本地快照失败: {e}")
+
+    for poller in pollers:
+        poller.start()
+
+    started = time.perf_counter()
+    try:
+        count = await asyncio.to_thread(limit_monitor.ensure_stock_info, date.today())
+        state.record('stock_info', 'ok', started, f"股票数: {count}")
+    except Exception as e:
+        state.record('stock_info', 'failed', started, str(e))
+        logger.warning(f"加载股票维度信息失败: {e}")
+
+    started = time.perf_counter()
+    if pollers:
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(poller.first_run.wait() for poller in pollers)),
+                timeout=settings.WARMUP_TIMEOUT
+            )
+            state.record('pollers', 'ok', started)
+        except asyncio.TimeoutError:
+            pending = [poller.name for poller in pollers if not poller.first_run.is_set()]
+            state.record('pollers', 'timeout', started, f"未完成: {', '.join(pending)}")
+            logger.warning(f"预热等待轮询任务超时（{settings.WARMUP_TIMEOUT}s），未完成: {', '.join(pending)}")
+    else:
+        state.record('pollers', 'skipped', started, '未开启后台轮询')
+
+    state.ready = True
+    state.finished_at = datetime.now()
+    logger.info(f"启动预热完成，耗时: {(state.finished_at - state.started_at).total_seconds():.2f}s")
@@ -0,0 +1,98 @@
+"""
+进程内共享缓存模块
+
+轮询任务把行情和资金流向写入共享缓存，API请求直接读取，避免重复访问上游
+"""
+import time
+from typing import Any, Dict, Iterable, Optional
+
+
+class TTLCache:
+    """带过期时间的键值缓存"""
+
+    def __init__(self, default_ttl: float = 60.0, max_size: Optional[int] = None):
+        """
+        初始化缓存
+
+        Args:
+            default_ttl: 默认过期时间（秒）
+            max_size: 最多保留的键数，超出时先清理过期键，仍超出则按写入顺序淘汰最早的键；None 表示不限制
+        """
+        self.default_ttl = default_ttl
+        self.max_size = max_size
+        self._store: Dict[str, tuple] = {}
+        # 命中统计
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """读取缓存，不存在或已过期返回默认值"""
+        entry = self._store.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._store.pop(key, None)
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """批量读取缓存，只返回命中的键"""
+        now = time.monotonic()
+        result = {}
+        requested = 0
+        for key in keys:
+            requested += 1
+            entry = self._store.get(key)
+            if entry is not None and entry[0] >= now:
+                result[key] = entry[1]
+        self.hits += len(result)
+        self.misses += requested - len(result)
+        return result
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """写入缓存"""
+        # 先删除再写入，保持字典顺序即写入顺序
+        self._store.pop(key, None)
+        self._store[key] = (time.monotonic() + (ttl or self.default_ttl), value)
+        self._enforce_max_size()
+
+    def set_many(self, mapping: Dict[str, Any], ttl: Optional[float] = None):
+        """批量写入缓存"""
+        expires_at = time.monotonic() + (ttl or self.default_ttl)
+        for key, value in mapping.items():
+            self._store.pop(key, None)
+            self._store[key] = (expires_at, value)
+        self._enforce_max_size()
+
+    def _enforce_max_size(self):
+        if self.max_size is None or len(self._store) <= self.max_size:
+            return
+        self.purge_expired()
+        if len(self._store) > self.max_size:
+            # 淘汰到上限的90%，避免之后每次写入都触发整表清理
+            target = self.max_size - self.max_size // 10
+            for key in list(self._store)[:len(self._store) - target]:
+                self._store.pop(key, None)
+
+    def delete(self, key: str):
+        """删除缓存"""
+        self._store.pop(key, None)
+
+    def purge_expired(self) -> int:
+        """清理已过期的缓存，返回清理数量"""
+        now = time.monotonic()
+        expired = [key for key, (expires_at, _) in self._store.items() if expires_at < now]
+        for key in expired:
+            self._store.pop(key, None)
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+
+# 全局共享缓存（键可能由请求参数组成，限制键数防止内存无限增长）
+shared_cache = TTLCache(max_size=100000)
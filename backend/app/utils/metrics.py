@@ -0,0 +1,167 @@
+"""
+进程内指标模块
+
+提供计数器、直方图和按需采集的仪表，按 Prometheus 文本格式输出。
+记录指标只做字典查找和整数累加，不加锁（事件循环内调用；线程中调用时个别计数可能丢失，不影响统计意义）
+"""
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# 默认延迟分桶（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """计数器"""
+
+    type_name = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, labels: Tuple = (), amount: float = 1):
+        """累加（labels 按 labelnames 顺序给出）"""
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Histogram:
+    """直方图"""
+
+    type_name = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [各分桶计数（非累计，最后一个为 +Inf）, 总和]
+        self._values: Dict[Tuple, list] = {}
+
+    def observe(self, labels: Tuple, value: float):
+        """记录一次观测值（labels 按 labelnames 顺序给出）"""
+        entry = self._values.get(labels)
+        if entry is None:
+            entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+
+    def samples(self) -> Iterable[str]:
+        bounds = self.buckets + (float('inf'),)
+        for labels, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            label_text = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{label_text} {_format_value(total)}"
+            yield f"{self.name}_count{label_text} {cumulative}"
+
+
+class Gauge:
+    """仪表（输出时调用采集函数取值）"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        collect: Callable[[], Dict[Tuple, float]] = None,
+        type_name: str = 'gauge'
+    ):
+        """
+        Args:
+            collect: 采集函数，返回 {labels: 值}
+            type_name: 指标类型，采集的是其他对象自身维护的累计值时为 counter
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+        self.type_name = type_name
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in (self.collect() or {}).items():
+            if value is None:
+                continue
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class MetricsRegistry:
+    """指标注册表"""
+
+    def __init__(self, prefix: str = "flowinsight_"):
+        self.prefix = prefix
+        self._metrics: List = []
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """注册计数器"""
+        return self._register(Counter(self.prefix + name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """注册直方图"""
+        return self._register(Histogram(self.prefix + name, documentation, labelnames, buckets))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        collect: Callable[[], Dict[Tuple, float]] = None,
+        type_name: str = 'gauge'
+    ) -> Gauge:
+        """注册仪表（输出时调用 collect 取值）"""
+        return self._register(Gauge(self.prefix + name, documentation, labelnames, collect, type_name))
+
+    def render(self) -> str:
+        """输出 Prometheus 文本格式"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+# 全局指标注册表
+metrics = MetricsRegistry()
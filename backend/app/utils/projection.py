@@ -0,0 +1,56 @@
+"""
+列表响应的字段投影和列式输出
+
+列表接口支持：
+- fields=a,b,c 只返回指定字段
+- format=columns 返回列式结构 {"fields": [...], "columns": {字段: [值, ...]}}，
+  避免每一行重复字段名
+"""
+from typing import Dict, List, Optional, Sequence
+
+# 列表输出格式
+LIST_FORMATS = ('rows', 'columns')
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> Optional[List[str]]:
+    """
+    解析 fields 参数
+
+    Returns:
+        字段列表（保持请求顺序、去重），未指定时返回None
+
+    Raises:
+        ValueError: 包含不支持的字段
+    """
+    if not fields:
+        return None
+    selected = list(dict.fromkeys(field.strip() for field in fields.split(',') if field.strip()))
+    invalid = [field for field in selected if field not in allowed]
+    if invalid:
+        raise ValueError(f"无效的字段: {', '.join(invalid)}")
+    return selected or None
+
+
+def shape_items(items: List[Dict], fields: Optional[List[str]], output_format: str = 'rows'):
+    """
+    按字段投影和输出格式整理列表
+
+    Args:
+        items: 行列表
+        fields: 需要的字段，None 表示全部
+        output_format: rows 行式 / columns 列式
+
+    Returns:
+        行式返回字典列表；列式返回 {"fields": [...], "columns": {...}}
+    """
+    if output_format == 'columns':
+        if fields is None:
+            fields = list(items[0].keys()) if items else []
+        return {
+            'fields': fields,
+            'columns': {field: [item.get(field) for item in items] for field in fields},
+        }
+
+    if fields is None:
+        return items
+    return [{field: item.get(field) for field in fields} for item in items]
@@ -0,0 +1,109 @@
+"""
+上游请求限流模块
+
+所有访问东方财富API的采集任务共享同一个限流器，
+同时限制并发数（max_concurrent_requests）和请求速率（api_request_interval）
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Optional
+
+
+class AsyncRateLimiter:
+    """异步限流器（并发数 + 请求间隔）"""
+
+    def __init__(self, max_concurrent: int = 5, interval: float = 1.0):
+        """
+        初始化限流器
+
+        Args:
+            max_concurrent: 最大并发请求数
+            interval: 请求间隔（秒），每个并发槽位在该间隔内最多发起一次请求，
+                      即整体速率不超过 max_concurrent / interval 次/秒
+        """
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.interval = max(0.0, float(interval))
+        # 并发许可用计数 + 等待队列实现（而不是 Semaphore），运行中调整 max_concurrent 时不替换同步原语
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._lock: Optional[asyncio.Lock] = None
+        self._next_slot = 0.0
+
+    def configure(self, max_concurrent: Optional[int] = None, interval: Optional[float] = None):
+        """
+        更新限流参数（通常在启动时根据 system_config 调整）
+
+        已持有的许可不受影响：调小时等已有请求释放到新上限以下后才放行，调大时立即唤醒等待者
+        """
+        if max_concurrent is not None:
+            self.max_concurrent = max(1, int(max_concurrent))
+            self._wake_waiters()
+        if interval is not None:
+            self.interval = max(0.0, float(interval))
+
+    def _ensure_primitives(self):
+        """延迟创建同步原语，保证绑定到当前事件循环"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+    def _wake_waiters(self):
+        """按空闲许可数唤醒等待者（被唤醒后重新检查上限）"""
+        free = self.max_concurrent - self._active
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    async def _acquire_slot(self):
+        while self._active >= self.max_concurrent:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                # 已被唤醒但随即取消时把名额交给下一个等待者
+                self._wake_waiters()
+                raise
+        self._active += 1
+
+    async def acquire(self):
+        """获取一个请求许可（会按速率等待）"""
+        self._ensure_primitives()
+        await self._acquire_slot()
+
+        spacing = self.interval / self.max_concurrent
+        if spacing <= 0:
+            return
+
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + spacing
+
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self.release()
+                raise
+
+    def release(self):
+        """释放请求许可"""
+        if self._active > 0:
+            self._active -= 1
+            self._wake_waiters()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
+
+
+# 全局共享的东方财富请求限流器
+eastmoney_limiter = AsyncRateLimiter()
@@ -0,0 +1,239 @@
+"""
+共享内存快照模块
+
+一个写进程把列式快照（代码、名称、若干 float64 列）写入 multiprocessing.shared_memory，
+多个读进程直接以 NumPy 视图读取，不复制数据。
+
+内存布局（固定，按 capacity 预分配）：
+    头部 | 槽0: codes[U6] names[U16] values[列数, capacity] | 槽1: 同上
+
+两个槽交替写入（双缓冲）：写进程写非活动槽，写完后在 seqlock 保护下切换活动槽并递增版本号。
+读进程在 seq 为偶数且读取前后不变时取得一致的 (活动槽, 版本号, 行数, 快照时间)，
+之后直接使用活动槽的视图。
+
+视图只在两个版本内有效：写进程再发布两次后同一个槽会被原地覆盖，
+继续持有旧视图的代码会看到新数据（数组对象不变，np.array_equal 比较旧视图和新视图总是相等）。
+需要跨版本保留的数组（如用于比对代码集合是否变化）必须复制
+"""
+import time
+import zlib
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 头部标识和布局版本（布局变化时递增，读写两端不一致时拒绝读取）
+MAGIC = 0x46495353  # "FISS"
+LAYOUT_VERSION = 1
+
+HEADER_DTYPE = np.dtype([
+    ('magic', '<u4'),
+    ('layout_version', '<u4'),
+    ('capacity', '<u4'),
+    ('column_count', '<u4'),
+    ('columns_crc', '<u4'),  # 列名校验（列顺序或名称变化时读端拒绝读取）
+    ('seq', '<u8'),  # seqlock 序号，奇数表示正在切换
+    ('generation', '<u8'),  # 已发布的快照版本号
+    ('active', '<u4'),  # 活动槽
+    ('count', '<u4', (2,)),  # 各槽的行数
+    ('created_at', '<f8', (2,)),  # 各槽的快照时间（Unix 时间戳）
+])
+HEADER_SIZE = 128
+assert HEADER_DTYPE.itemsize <= HEADER_SIZE
+
+CODE_DTYPE = np.dtype('<U6')
+NAME_DTYPE = np.dtype('<U16')
+
+
+def _columns_crc(columns: Sequence[str]) -> int:
+    return zlib.crc32(','.join(columns).encode('utf-8'))
+
+
+class SharedSnapshotLayoutError(Exception):
+    """共享内存不存在或布局与当前代码不一致"""
+
+
+class SharedSnapshotView:
+    """读到的一个快照版本（数组均为共享内存上的只读视图，写进程再发布两次后被覆盖）"""
+
+    def __init__(self, generation: int, created_at: float, codes: np.ndarray, names: np.ndarray,
+                 columns: Dict[str, np.ndarray]):
+        self.generation = generation
+        self.created_at = created_at
+        self.codes = codes
+        self.names = names
+        self.columns = columns
+
+
+class _SharedSnapshotBuffer:
+    """共享内存段和各数组视图"""
+
+    def __init__(self, shm: shared_memory.SharedMemory, capacity: int, columns: Sequence[str]):
+        self.shm = shm
+        self.capacity = capacity
+        self.column_names = tuple(columns)
+        self.header = np.ndarray((), dtype=HEADER_DTYPE, buffer=shm.buf, offset=0)
+
+        offset = HEADER_SIZE
+        self.slots = []
+        for _ in range(2):
+            codes = np.ndarray((capacity,), dtype=CODE_DTYPE, buffer=shm.buf, offset=offset)
+            offset += codes.nbytes
+            names = np.ndarray((capacity,), dtype=NAME_DTYPE, buffer=shm.buf, offset=offset)
+            offset += names.nbytes
+            values = np.ndarray((len(self.column_names), capacity), dtype='<f8', buffer=shm.buf, offset=offset)
+            offset += values.nbytes
+            self.slots.append((codes, names, values))
+
+    @staticmethod
+    def size_of(capacity: int, column_count: int) -> int:
+        slot = capacity * (CODE_DTYPE.itemsize + NAME_DTYPE.itemsize + 8 * column_count)
+        return HEADER_SIZE + 2 * slot
+
+    def close(self):
+        # 仍有视图引用共享内存时无法关闭映射，进程退出时由系统回收
+        self.header = None
+        self.slots = []
+        try:
+            self.shm.close()
+        except BufferError:
+            pass
+
+
+class SharedSnapshotWriter(_SharedSnapshotBuffer):
+    """快照写端（只允许一个写进程）"""
+
+    @classmethod
+    def create(cls, name: str, capacity: int, columns: Sequence[str]) -> "SharedSnapshotWriter":
+        """
+        创建共享内存段；同名段已存在（如写进程异常退出后重启）且大小足够时复用，
+        读进程无需重新连接
+        """
+        size = cls.size_of(capacity, len(columns))
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            previous_generation = 0
+        except FileExistsError:
+            shm = shared_memory.SharedMemory(name=name)
+            if shm.size < size:
+                shm.close()
+                shm.unlink()
+                shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+                previous_generation = 0
+            else:
+                header = np.ndarray((), dtype=HEADER_DTYPE, buffer=shm.buf)
+                previous_generation = int(header['generation']) if header['magic'] == MAGIC else 0
+                del header
+
+        writer = cls(shm, capacity, columns)
+        header = writer.header
+        if header['seq'] % 2 == 0:
+            # 初始化期间读端等待（上次异常退出时可能已是奇数）
+            header['seq'] += 1
+        header['magic'] = MAGIC
+        header['layout_version'] = LAYOUT_VERSION
+        header['capacity'] = capacity
+        header['column_count'] = len(columns)
+        header['columns_crc'] = _columns_crc(columns)
+        header['generation'] = previous_generation
+        header['seq'] += 1
+        return writer
+
+    def publish(self, codes: np.ndarray, names: np.ndarray, columns: Dict[str, np.ndarray],
+                created_at: Optional[float] = None) -> int:
+        """
+        写入一个快照版本
+
+        Returns:
+            新版本号
+
+        Raises:
+            ValueError: 行数超过 capacity
+        """
+        count = len(codes)
+        if count > self.capacity:
+            raise ValueError(f"快照行数 {count} 超过共享内存容量 {self.capacity}")
+
+        header = self.header
+        slot = 1 - int(header['active'])
+        slot_codes, slot_names, slot_values = self.slots[slot]
+        slot_codes[:count] = codes
+        slot_names[:count] = names
+        for i, column in enumerate(self.column_names):
+            slot_values[i, :count] = columns[column]
+
+        # seqlock：奇数期间读端重试，切换完成后 seq 回到偶数
+        header['seq'] += 1
+        header['count'][slot] = count
+        header['created_at'][slot] = created_at if created_at is not None else time.time()
+        header['active'] = slot
+        header['generation'] += 1
+        header['seq'] += 1
+        return int(header['generation'])
+
+    def unlink(self):
+        """删除共享内存段（写进程正常退出时调用）"""
+        self.shm.unlink()
+
+
+class SharedSnapshotReader(_SharedSnapshotBuffer):
+    """快照读端"""
+
+    @classmethod
+    def attach(cls, name: str, columns: Sequence[str]) -> "SharedSnapshotReader":
+        """
+        连接已存在的共享内存段
+
+        Raises:
+            SharedSnapshotLayoutError: 段不存在或布局不一致
+        """
+        try:
+            shm = shared_memory.SharedMemory(name=name)
+        except FileNotFoundError:
+            raise SharedSnapshotLayoutError(f"共享内存 {name} 不存在")
+        # Python 3.13 之前连接已有段也会登记到 resource_tracker，读进程退出时会把段删除
+        try:
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        except Exception:
+            pass
+
+        header = np.ndarray((), dtype=HEADER_DTYPE, buffer=shm.buf)
+        magic, version = int(header['magic']), int(header['layout_version'])
+        capacity, column_count = int(header['capacity']), int(header['column_count'])
+        columns_crc = int(header['columns_crc'])
+        del header
+        if magic != MAGIC or version != LAYOUT_VERSION or columns_crc != _columns_crc(columns) \
+                or shm.size < cls.size_of(capacity, column_count):
+            shm.close()
+            raise SharedSnapshotLayoutError(f"共享内存 {name} 布局不一致（版本 {version}，列数 {column_count}）")
+        return cls(shm, capacity, columns)
+
+    @property
+    def generation(self) -> int:
+        return int(self.header['generation'])
+
+    def _read_header(self, max_spins: int) -> Tuple[int, int, int, float]:
+        header = self.header
+        for _ in range(max_spins):
+            seq = int(header['seq'])
+            if seq % 2 == 0:
+                slot = int(header['active'])
+                generation = int(header['generation'])
+                count = int(header['count'][slot])
+                created_at = float(header['created_at'][slot])
+                if int(header['seq']) == seq:
+                    return slot, generation, count, created_at
+            time.sleep(0)
+        raise TimeoutError("共享内存快照持续处于写入状态")
+
+    def read(self, max_spins: int = 1000) -> Optional[SharedSnapshotView]:
+        """读取当前版本（零拷贝），尚未发布过快照时返回None"""
+        slot, generation, count, created_at = self._read_header(max_spins)
+        if generation == 0:
+            return None
+        codes, names, values = self.slots[slot]
+        columns = {column: values[i, :count] for i, column in enumerate(self.column_names)}
+        arrays = [codes[:count], names[:count], *columns.values()]
+        for array in arrays:
+            array.flags.writeable = False
+        return SharedSnapshotView(generation, created_at, arrays[0], arrays[1], columns)
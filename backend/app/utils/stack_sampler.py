@@ -0,0 +1,67 @@
+"""
+调用栈采样模块
+
+在独立线程中按固定间隔读取目标线程的当前调用栈，累计为折叠栈格式
+（"根;...;叶 次数"，可直接用于 flamegraph.pl / speedscope 生成火焰图）。
+采样只读取栈帧，不在目标线程中插桩，开销与采样间隔有关、与被测代码无关
+"""
+import sys
+import threading
+from collections import Counter
+from typing import Dict, Optional
+
+# 单个调用栈最多保留的帧数（从叶子方向截取）
+MAX_STACK_DEPTH = 128
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{code.co_name}"
+
+
+def collapse_stack(frame) -> str:
+    """栈帧转换为折叠栈字符串（根在前）"""
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+class StackSampler:
+    """对单个线程的调用栈定时采样"""
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = 0.005):
+        """
+        Args:
+            thread_id: 目标线程ID，默认为创建采样器的线程
+            interval: 采样间隔（秒）
+        """
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.samples[collapse_stack(frame)] += 1
+
+    def start(self):
+        """开始采样"""
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Dict[str, int]:
+        """停止采样，返回 {折叠栈: 采样次数}"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return dict(self.samples)
+
+    @staticmethod
+    def format_collapsed(samples: Dict[str, int]) -> str:
+        """输出折叠栈文本（按采样次数降序）"""
+        return ''.join(f"{stack} {count}\n" for stack, count in sorted(samples.items(), key=lambda x: -x[1]))
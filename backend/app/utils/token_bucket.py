@@ -0,0 +1,179 @@
+"""
+令牌桶限流模块
+
+- MemoryBucketStore: 进程内令牌桶，单进程部署使用
+- RedisBucketStore: Redis 令牌桶（Lua 脚本原子更新），多进程部署时共享额度
+- UpstreamBudget: 接口请求访问东方财富的全局额度，用完时抛出 UpstreamBudgetExceeded；
+  批量请求一次性预留额度，不足时只返回部分数据
+
+令牌桶按 rate（个/秒）补充、最多积累 burst 个，每次请求消耗1个；
+额度不足时返回需要等待的秒数（Retry-After）
+"""
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import List, Optional
+
+from loguru import logger
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover
+    aioredis = None
+
+
+class MemoryBucketStore:
+    """进程内令牌桶存储（按 LRU 保留最近使用的键）"""
+
+    def __init__(self, max_keys: int = 100000):
+        """
+        Args:
+            max_keys: 最多保留的桶数，超出时淘汰最久未使用的桶（淘汰的桶视为已满）
+        """
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def acquire(self, key: str, rate: float, burst: float, cost: float = 1.0) -> float:
+        """
+        消耗令牌
+
+        Returns:
+            0 表示通过，否则为需要等待的秒数
+        """
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated_at) * rate)
+
+        retry_after = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            retry_after = (cost - tokens) / rate
+
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+
+# 令牌桶 Lua 脚本：KEYS[1]=桶键，ARGV=rate, burst, cost；返回需要等待的秒数（字符串）
+_TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    retry_after = (cost - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(retry_after)
+"""
+
+
+class RedisBucketStore:
+    """
+    Redis 令牌桶存储
+
+    多个进程共享同一组桶；Redis 不可用时放行请求（只记录日志），避免限流组件故障导致接口不可用
+    """
+
+    def __init__(self, client, prefix: str = "ratelimit:"):
+        """
+        Args:
+            client: redis.asyncio 客户端
+            prefix: 键前缀
+        """
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(_TOKEN_BUCKET_SCRIPT)
+
+    async def acquire(self, key: str, rate: float, burst: float, cost: float = 1.0) -> float:
+        """
+        消耗令牌
+
+        Returns:
+            0 表示通过，否则为需要等待的秒数
+        """
+        try:
+            result = await self._script(keys=[self.prefix + key], args=[rate, burst, cost])
+            return float(result)
+        except Exception as e:
+            logger.warning(f"Redis 限流失败，放行请求: {e}")
+            return 0.0
+
+
+def create_bucket_store(backend: str = "memory", **redis_options):
+    """
+    创建令牌桶存储
+
+    Args:
+        backend: memory 进程内 / redis 多进程共享
+        redis_options: Redis 连接参数（host, port, db, password）
+    """
+    if backend == "redis":
+        if aioredis is None:
+            logger.warning("未安装 redis，限流使用进程内存储")
+        else:
+            return RedisBucketStore(aioredis.Redis(**redis_options))
+    return MemoryBucketStore()
+
+
+class UpstreamBudgetExceeded(Exception):
+    """上游请求额度已用完"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"上游请求额度已用完，请 {retry_after:.1f} 秒后重试")
+        self.retry_after = retry_after
+
+
+# 当前请求中被拒绝的上游额度等待时间（由限流中间件设置，接口内部捕获异常后仍可据此返回429）
+budget_rejections: ContextVar[Optional[List[float]]] = ContextVar('budget_rejections', default=None)
+
+
+class UpstreamBudget:
+    """接口请求访问东方财富的全局额度（不影响后台采集任务）"""
+
+    def __init__(self, store, rate: float = 10.0, burst: float = 20.0, key: str = "upstream:eastmoney"):
+        """
+        Args:
+            store: 令牌桶存储
+            rate: 每秒补充的请求数
+            burst: 最多积累的请求数
+            key: 桶键
+        """
+        self.store = store
+        self.rate = rate
+        self.burst = burst
+        self.key = key
+
+    async def acquire(self):
+        """消耗一次上游请求额度，不足时抛出 UpstreamBudgetExceeded"""
+        retry_after = await self.store.acquire(self.key, self.rate, self.burst)
+        if retry_after > 0:
+            rejections = budget_rejections.get()
+            if rejections is not None:
+                rejections.append(retry_after)
+            raise UpstreamBudgetExceeded(retry_after)
+
+    async def reserve(self, calls: int) -> bool:
+        """
+        为一批上游请求一次性预留额度（消耗 min(calls, burst) 个令牌，批量大于 burst 时按 burst 计）
+
+        额度不足时返回False且不记入 budget_rejections，调用方返回已有的部分数据，不会被替换为429
+        """
+        if calls <= 0:
+            return True
+        retry_after = await self.store.acquire(self.key, self.rate, self.burst, cost=min(float(calls), self.burst))
+        return retry_after <= 0
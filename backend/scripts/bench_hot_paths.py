@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+热点路径微基准脚本
+用合成的全市场规模数据测量解析、格式转换、JSON序列化和资金流向写入的耗时，
+结果保存为 JSON，可与之前保存的基线对比，用于衡量优化效果和发现回退
+"""
+import sys
+import json
+import platform
+import statistics
+import timeit
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# 添加项目根目录到路径
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from loguru import logger
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import mysql
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.orm import Session
+
+from app.models.stock import CapitalFlow
+from app.services.eastmoney_api import EastMoneyAPI
+from app.services.flow_history import (
+    FLOW_ITEM_FIELDS, flow_to_dict, history_item_to_dict, save_history_items
+)
+from app.utils.projection import shape_items
+
+# 配置日志
+logger.add("logs/bench_hot_paths.log", rotation="10 MB", level="INFO")
+
+# 写入基准使用的股票ID（不与真实数据冲突，且每轮都会回滚）
+BENCH_STOCK_ID = -1
+
+
+# ========== 合成数据 ==========
+
+def make_rank_diff(stock_count: int, seed: int) -> Dict:
+    """全市场排行榜原始数据（clist/get 的 data 部分）"""
+    rng = np.random.default_rng(seed)
+    amount = rng.uniform(1e7, 5e9, stock_count)
+    main = rng.uniform(-0.15, 0.15, stock_count) * amount
+    price = rng.uniform(3, 200, stock_count)
+    change = rng.uniform(-10, 10, stock_count)
+    diff = []
+    for i in range(stock_count):
+        flows = main[i] * np.array([0.6, 0.4, -0.5, -0.5])
+        diff.append({
+            'f12': f"{600000 + i:06d}", 'f14': f"股票{i:05d}", 'f1': 2, 'f13': 1,
+            'f2': round(float(price[i]), 2), 'f3': round(float(change[i]), 2),
+            'f62': round(float(main[i]), 2), 'f184': round(float(main[i] / amount[i] * 100), 2),
+            'f66': round(float(flows[0]), 2), 'f69': round(float(flows[0] / amount[i] * 100), 2),
+            'f72': round(float(flows[1]), 2), 'f75': round(float(flows[1] / amount[i] * 100), 2),
+            'f78': round(float(flows[2]), 2), 'f81': round(float(flows[2] / amount[i] * 100), 2),
+            'f84': round(float(flows[3]), 2), 'f87': round(float(flows[3] / amount[i] * 100), 2),
+            'f204': round(float(main[i] * 3), 2), 'f205': round(float(main[i] * 6), 2),
+            'f124': 1700000000 + i,
+        })
+    return {'total': stock_count, 'diff': diff}
+
+
+def make_history_klines(days: int, seed: int) -> List[str]:
+    """单只股票的历史资金流向原始数据（fflow/daykline/get 的 klines）"""
+    rng = np.random.default_rng(seed)
+    start = date(2024, 1, 1)
+    klines = []
+    for i in range(days):
+        amount = rng.uniform(1e7, 5e9)
+        main = rng.uniform(-0.15, 0.15) * amount
+        flows = []
+        for value in (main, main * 0.6, main * 0.4, -main * 0.5, -main * 0.5):
+            flows.extend((f"{value:.1f}", f"{value / amount * 100:.2f}"))
+        price = rng.uniform(3, 200)
+        klines.append(','.join([
+            (start + timedelta(days=i)).isoformat(), *flows,
+            f"{price:.2f}", f"{rng.uniform(-10, 10):.2f}", str(int(amount / price / 100)), f"{amount:.1f}",
+        ]))
+    return klines
+
+
+def make_flow_records(items: List[Dict]) -> List[CapitalFlow]:
+    """数据库查询返回的 capital_flow 记录（数值列为 Decimal，与 MySQL 驱动一致）"""
+    records = []
+    for item in items:
+        values = {
+            field: Decimal(str(item[field])) for field in FLOW_ITEM_FIELDS[1:] if field != 'volume'
+        }
+        records.append(CapitalFlow(
+            stock_id=BENCH_STOCK_ID,
+            trade_date=datetime.strptime(item['trade_date'], '%Y-%m-%d').date(),
+            volume=item['volume'],
+            **values
+        ))
+    return records
+
+
+# ========== 写入 ==========
+
+def insert_per_row(db: Session, stock_id: int, items: List[Dict]):
+    """逐行检查并写入（与 /capital-flow/stock/{stock_code} 补齐历史数据的写法一致）"""
+    for item in items:
+        trade_date = datetime.strptime(item['trade_date'], '%Y-%m-%d').date()
+        existing = db.query(CapitalFlow).filter(
+            CapitalFlow.stock_id == stock_id,
+            CapitalFlow.trade_date == trade_date
+        ).first()
+        if not existing:
+            db.add(CapitalFlow(
+                stock_id=stock_id,
+                trade_date=trade_date,
+                **{field: item.get(field, 0) for field in FLOW_ITEM_FIELDS[1:]}
+            ))
+    db.flush()
+
+
+def build_per_row(items: List[Dict]):
+    """逐行写入的Python侧开销：构造ORM对象并加入会话（不访问数据库）"""
+    db = Session()
+    for item in items:
+        db.add(CapitalFlow(
+            stock_id=BENCH_STOCK_ID,
+            trade_date=datetime.strptime(item['trade_date'], '%Y-%m-%d').date(),
+            **{field: item.get(field, 0) for field in FLOW_ITEM_FIELDS[1:]}
+        ))
+    db.expunge_all()
+
+
+def build_batch(items: List[Dict]):
+    """批量写入的Python侧开销：构造 INSERT IGNORE 语句并编译（不访问数据库）"""
+    rows = [
+        {
+            'stock_id': BENCH_STOCK_ID,
+            'trade_date': datetime.strptime(item['trade_date'], '%Y-%m-%d').date(),
+            **{field: item.get(field, 0) for field in FLOW_ITEM_FIELDS[1:]},
+        }
+        for item in items
+    ]
+    mysql_insert(CapitalFlow).prefix_with('IGNORE').values(rows).compile(dialect=mysql.dialect())
+
+
+def run_in_rollback(engine, write: Callable[[Session], None]) -> Callable[[], None]:
+    """在事务中执行写入后回滚，保证每轮从相同状态开始且不留下数据"""
+    def run():
+        with engine.connect() as connection:
+            transaction = connection.begin()
+            try:
+                write(Session(bind=connection))
+            finally:
+                transaction.rollback()
+    return run
+
+
+# ========== 计时 ==========
+
+def measure(func: Callable[[], object], repeat: int, min_time: float) -> Dict:
+    """
+    测量单次调用耗时
+
+    先自动确定每轮调用次数（单轮不少于 min_time 秒），再重复 repeat 轮，取每次调用的中位数和最小值
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+    per_call = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        'median_ms': round(statistics.median(per_call) * 1000, 4),
+        'min_ms': round(min(per_call) * 1000, 4),
+        'number': number,
+        'repeat': repeat,
+    }
+
+
+def json_render(content) -> bytes:
+    """接口返回字典时 FastAPI 的序列化过程：jsonable_encoder + JSONResponse.render"""
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def build_benchmarks(args) -> Dict[str, Dict]:
+    """{基准名: {'func': 无参函数, 'items': 每次调用处理的行数}}"""
+    api = EastMoneyAPI()
+    rank_raw = make_rank_diff(args.stocks, args.seed)
+    klines = make_history_klines(args.days, args.seed)
+    history_items = api._parse_history_data(klines)
+
+    rank_items = api.parse_rank_data(rank_raw)
+    batch_items = history_items * args.history_stocks
+    records = make_flow_records(history_items) * args.history_stocks
+    batch_dicts = [flow_to_dict(record) for record in records]
+
+    rank_response = {"code": 200, "message": "success", "data": {"items": rank_items, "total": len(rank_items)}}
+    history_response = {"code": 200, "message": "success", "data": {"items": [
+        {"stock": {"stock_code": f"{600000 + i:06d}"}, "flows": batch_dicts[i * args.days:(i + 1) * args.days]}
+        for i in range(args.history_stocks)
+    ]}}
+    history_columns_response = {"code": 200, "message": "success", "data": {"items": [
+        {"stock": item["stock"], "flows": shape_items(item["flows"], None, 'columns')}
+        for item in history_response["data"]["items"]
+    ]}}
+    history_klines = klines * args.history_stocks
+
+    benchmarks = {
+        'parse_rank_data': {'func': lambda: api.parse_rank_data(rank_raw), 'items': args.stocks},
+        'parse_history_data': {'func': lambda: api._parse_history_data(history_klines), 'items': len(history_klines)},
+        'history_item_to_dict': {
+            'func': lambda: [history_item_to_dict(item) for item in batch_items], 'items': len(batch_items)
+        },
+        'flow_to_dict': {'func': lambda: [flow_to_dict(record) for record in records], 'items': len(records)},
+        'shape_items_columns': {
+            'func': lambda: shape_items(batch_dicts, None, 'columns'), 'items': len(batch_dicts)
+        },
+        'json_rank_rows': {'func': lambda: json_render(rank_response), 'items': len(rank_items)},
+        'json_history_rows': {'func': lambda: json_render(history_response), 'items': len(batch_dicts)},
+        'json_history_columns': {'func': lambda: json_render(history_columns_response), 'items': len(batch_dicts)},
+        'insert_build_per_row': {'func': lambda: build_per_row(history_items), 'items': len(history_items)},
+        'insert_build_batch': {'func': lambda: build_batch(history_items), 'items': len(history_items)},
+    }
+
+    if args.database_url:
+        engine = create_engine(args.database_url, pool_pre_ping=True)
+        benchmarks['insert_per_row'] = {
+            'func': run_in_rollback(engine, lambda db: insert_per_row(db, BENCH_STOCK_ID, history_items)),
+            'items': len(history_items),
+        }
+        benchmarks['insert_batch'] = {
+            'func': run_in_rollback(engine, lambda db: save_history_items(db, BENCH_STOCK_ID, history_items)),
+            'items': len(history_items),
+        }
+    return benchmarks
+
+
+def run_benchmarks(args) -> Dict:
+    benchmarks = build_benchmarks(args)
+    selected = [name for name in benchmarks if not args.only or name in args.only.split(',')]
+    results = {}
+    for name in selected:
+        bench = benchmarks[name]
+        result = measure(bench['func'], args.repeat, args.min_time)
+        result['items'] = bench['items']
+        result['us_per_item'] = round(result['median_ms'] * 1000 / bench['items'], 4) if bench['items'] else None
+        results[name] = result
+        logger.info(f"{name}: 中位数 {result['median_ms']}ms，最小 {result['min_ms']}ms（{bench['items']} 行）")
+
+    return {
+        'meta': {
+            'created_at': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'stocks': args.stocks,
+            'history_stocks': args.history_stocks,
+            'days': args.days,
+            'seed': args.seed,
+            'database': bool(args.database_url),
+        },
+        'results': results,
+    }
+
+
+def compare_with_baseline(result: Dict, baseline: Dict, threshold: float) -> Dict[str, List[str]]:
+    """按中位数对比基线，返回 {'regressions': [...], 'improvements': [...]}"""
+    changes = {'regressions': [], 'improvements': []}
+    for name, current in result['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous or not previous.get('median_ms'):
+            continue
+        ratio = current['median_ms'] / previous['median_ms']
+        line = f"{name}: {previous['median_ms']}ms -> {current['median_ms']}ms ({ratio:.2f}x)"
+        if ratio > 1 + threshold:
+            changes['regressions'].append(line)
+        elif ratio < 1 - threshold:
+            changes['improvements'].append(line)
+    return changes
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="热点路径微基准脚本")
+    parser.add_argument(
+        "--stocks",
+        type=int,
+        default=5000,
+        help="排行榜数据的股票数量（全市场规模），默认5000"
+    )
+    parser.add_argument(
+        "--history-stocks",
+        type=int,
+        default=300,
+        help="历史数据的股票数量（批量历史接口上限），默认300"
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=120,
+        help="每只股票的历史交易日数，默认120"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=20240101,
+        help="合成数据的随机种子"
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=7,
+        help="每项基准的重复轮数，默认7"
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.2,
+        help="单轮最短耗时（秒），默认0.2"
+    )
+    parser.add_argument(
+        "--only",
+        type=str,
+        default=None,
+        help="只运行指定基准（逗号分隔）"
+    )
+    parser.add_argument(
+        "--database-url",
+        type=str,
+        default=None,
+        help="测量实际写入的数据库（需已建表，每轮回滚），不指定时只测量写入的Python侧开销"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="结果输出文件（JSON），可作为之后对比的基线"
+    )
+    parser.add_argument(
+        "--baseline",
+        type=str,
+        default=None,
+        help="基线结果文件（JSON）"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="判定变化的耗时变化比例，默认0.1（10%%）"
+    )
+
+    args = parser.parse_args()
+
+    result = run_benchmarks(args)
+    logger.info(f"基准结果:\n{json.dumps(result, ensure_ascii=False, indent=2)}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding='utf-8')
+        logger.info(f"结果已写入: {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        changes = compare_with_baseline(result, baseline, args.threshold)
+        if changes['improvements']:
+            logger.info("比基线快:\n" + "\n".join(changes['improvements']))
+        if changes['regressions']:
+            logger.warning("比基线慢:\n" + "\n".join(changes['regressions']))
+            sys.exit(1)
+        logger.info("与基线相比没有回退")
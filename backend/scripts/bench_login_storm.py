@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+登录风暴压测脚本
+模拟开盘时大量用户同时登录，对比登录风暴前后无关接口的响应延迟
+"""
+import sys
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# 添加项目根目录到路径
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import httpx
+import numpy as np
+from loguru import logger
+
+# 配置日志
+logger.add("logs/bench_login_storm.log", rotation="10 MB", level="INFO")
+
+
+def latency_summary(latencies: List[float]) -> Dict:
+    """延迟统计（毫秒）"""
+    if not latencies:
+        return {'count': 0}
+    values = np.array(latencies) * 1000
+    return {
+        'count': len(values),
+        'p50_ms': round(float(np.percentile(values, 50)), 2),
+        'p95_ms': round(float(np.percentile(values, 95)), 2),
+        'p99_ms': round(float(np.percentile(values, 99)), 2),
+        'max_ms': round(float(values.max()), 2),
+    }
+
+
+async def register_users(client: httpx.AsyncClient, usernames: List[str], password: str, concurrency: int):
+    """注册压测用户（已存在的用户忽略）"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _register(username: str):
+        async with semaphore:
+            response = await client.post("/api/v1/auth/register", json={"username": username, "password": password})
+            if response.status_code not in (201, 400):
+                logger.warning(f"注册 {username} 失败: {response.status_code} {response.text[:200]}")
+
+    await asyncio.gather(*(_register(username) for username in usernames))
+
+
+async def probe(client: httpx.AsyncClient, path: str, interval: float, stop: asyncio.Event, latencies: List[float]):
+    """按固定间隔请求无关接口并记录延迟"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            await client.get(path)
+            latencies.append(time.perf_counter() - started)
+        except httpx.HTTPError as e:
+            logger.warning(f"探测请求失败: {e}")
+        await asyncio.sleep(interval)
+
+
+async def login(client: httpx.AsyncClient, username: str, password: str, results: List):
+    """单次登录，记录 (状态码, 延迟)"""
+    started = time.perf_counter()
+    try:
+        response = await client.post("/api/v1/auth/login", data={"username": username, "password": password})
+        results.append((response.status_code, time.perf_counter() - started))
+    except httpx.HTTPError as e:
+        logger.warning(f"登录 {username} 失败: {e}")
+        results.append((0, time.perf_counter() - started))
+
+
+async def run_benchmark(args) -> Dict:
+    usernames = [f"{args.user_prefix}{i:05d}" for i in range(args.users)]
+    limits = httpx.Limits(max_connections=args.users + 10, max_keepalive_connections=args.users + 10)
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=120.0, limits=limits) as client, \
+            httpx.AsyncClient(base_url=args.base_url, timeout=30.0) as probe_client:
+        if args.register:
+            logger.info(f"注册压测用户: {len(usernames)}")
+            await register_users(client, usernames, args.password, concurrency=10)
+
+        # 基线：无登录时的探测延迟
+        baseline: List[float] = []
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe(probe_client, args.probe_path, args.probe_interval, stop, baseline))
+        await asyncio.sleep(args.baseline_seconds)
+        stop.set()
+        await probe_task
+
+        # 登录风暴期间的探测延迟
+        during: List[float] = []
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe(probe_client, args.probe_path, args.probe_interval, stop, during))
+        logins: List = []
+        started = time.perf_counter()
+        await asyncio.gather(*(login(client, username, args.password, logins) for username in usernames))
+        storm_seconds = time.perf_counter() - started
+        stop.set()
+        await probe_task
+
+    status_counts: Dict[str, int] = {}
+    for status_code, _ in logins:
+        status_counts[str(status_code)] = status_counts.get(str(status_code), 0) + 1
+
+    return {
+        'base_url': args.base_url,
+        'users': args.users,
+        'probe_path': args.probe_path,
+        'storm_seconds': round(storm_seconds, 3),
+        'logins_per_second': round(len(logins) / storm_seconds, 2) if storm_seconds > 0 else None,
+        'login_status': status_counts,
+        'login_latency': latency_summary([latency for _, latency in logins]),
+        'probe_baseline': latency_summary(baseline),
+        'probe_during_storm': latency_summary(during),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="登录风暴压测脚本")
+    parser.add_argument(
+        "--base-url",
+        type=str,
+        default="http://127.0.0.1:8887",
+        help="API服务地址"
+    )
+    parser.add_argument(
+        "--users",
+        type=int,
+        default=200,
+        help="同时登录的用户数，默认200"
+    )
+    parser.add_argument(
+        "--user-prefix",
+        type=str,
+        default="bench_user_",
+        help="压测用户名前缀"
+    )
+    parser.add_argument(
+        "--password",
+        type=str,
+        default="bench-password",
+        help="压测用户密码"
+    )
+    parser.add_argument(
+        "--register",
+        action="store_true",
+        help="压测前注册用户（已存在的忽略）"
+    )
+    parser.add_argument(
+        "--probe-path",
+        type=str,
+        default="/health",
+        help="用于观察延迟的无关接口"
+    )
+    parser.add_argument(
+        "--probe-interval",
+        type=float,
+        default=0.05,
+        help="探测请求间隔（秒）"
+    )
+    parser.add_argument(
+        "--baseline-seconds",
+        type=float,
+        default=5.0,
+        help="基线探测时长（秒）"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="结果输出文件（JSON）"
+    )
+
+    args = parser.parse_args()
+
+    result = asyncio.run(run_benchmark(args))
+    logger.info(f"登录风暴压测结果:\n{json.dumps(result, ensure_ascii=False, indent=2)}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding='utf-8')
+        logger.info(f"结果已写入: {args.output}")
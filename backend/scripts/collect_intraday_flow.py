@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+分钟资金流向采集脚本
+采集持股/收藏股票或成交额前N股票的当日分钟资金流向并保存到数据库
+"""
+import sys
+import os
+import asyncio
+from pathlib import Path
+
+# 添加项目根目录到路径
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.services.intraday_flow import collect_intraday_flows
+from loguru import logger
+
+# 配置日志
+logger.add("logs/collect_intraday_flow.log", rotation="10 MB", level="INFO")
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="分钟资金流向采集脚本")
+    parser.add_argument(
+        "--universe",
+        type=str,
+        choices=['user', 'top', 'both'],
+        default=None,
+        help="采集范围: user(持股和收藏), top(成交额前N), both(两者合并)，默认读取系统配置"
+    )
+    parser.add_argument(
+        "--top-n",
+        type=int,
+        default=None,
+        help="成交额前N只股票，默认读取系统配置"
+    )
+    
+    args = parser.parse_args()
+    
+    # 创建日志目录
+    os.makedirs("logs", exist_ok=True)
+    
+    # 运行采集
+    asyncio.run(collect_intraday_flows(universe=args.universe, top_n=args.top_n))
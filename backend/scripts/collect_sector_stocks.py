@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+板块成分股采集脚本
+并发获取各板块成分股，与数据库中的成分关系比对后只写入变化部分
+"""
+import sys
+import os
+import asyncio
+from pathlib import Path
+
+# 添加项目根目录到路径
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.services.sector_membership import collect_sector_stocks
+from loguru import logger
+
+# 配置日志
+logger.add("logs/collect_sector_stocks.log", rotation="10 MB", level="INFO")
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="板块成分股采集脚本")
+    parser.add_argument(
+        "--type",
+        type=str,
+        choices=['industry', 'concept', 'area', 'all'],
+        default='all',
+        help="板块类型: industry(行业), concept(概念), area(地域), all(全部)"
+    )
+    
+    args = parser.parse_args()
+    
+    # 创建日志目录
+    os.makedirs("logs", exist_ok=True)
+    
+    # 运行采集
+    asyncio.run(collect_sector_stocks(None if args.type == 'all' else args.type))
@@ -6,129 +6,154 @@
 import sys
 import os
 import asyncio
+import time
 from pathlib import Path
-import json
 
 # 添加项目根目录到路径
 backend_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(backend_dir))
 
 from sqlalchemy.orm import Session
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 from datetime import datetime
+from app.core.config import settings
 from app.core.database import SessionLocal
 from app.models.sector import Sector
 from app.services.eastmoney_api import EastMoneyAPI
+from app.services.system_config import configure_eastmoney_limiter
+from app.utils.rate_limiter import eastmoney_limiter
 from loguru import logger
 
 # 配置日志
 logger.add("logs/collect_sectors.log", rotation="10 MB", level="INFO")
 
+# 板块列表每页数量
+SECTOR_PAGE_SIZE = 100
 
-def save_sector_from_api_data(db: Session, sector_item: dict, sector_type: str) -> Sector:
+
+def save_sectors_bulk(db: Session, sectors_data: list, sector_type: str) -> tuple:
     """
-    从API数据保存板块信息到数据库
+    批量保存板块信息到数据库（已存在则更新名称）
+    
+    Returns:
+        (新增数量, 更新数量)
     """
-    sector_code = sector_item.get('f12', '')  # 板块代码
-    sector_name = sector_item.get('f14', '')   # 板块名称
+    rows = {}
+    for sector_item in sectors_data:
+        sector_code = sector_item.get('f12', '')  # 板块代码
+        sector_name = sector_item.get('f14', '')   # 板块名称
+        if sector_code and sector_name:
+            rows[sector_code] = {
+                'sector_code': sector_code,
+                'sector_name': sector_name,
+                'sector_type': sector_type,
+                'status': 'active',
+                'stock_count': 0,
+            }
     
-    if not sector_code or not sector_name:
-        return None
+    if not rows:
+        return 0, 0
     
-    # 检查是否已存在
-    sector = db.query(Sector).filter(
-        Sector.sector_code == sector_code,
-        Sector.sector_type == sector_type
-    ).first()
+    # 一次查询已存在的板块，用于统计新增/更新数量
+    existing_codes = {
+        code for (code,) in db.query(Sector.sector_code).filter(
+            Sector.sector_code.in_(list(rows.keys()))
+        ).all()
+    }
     
-    if sector:
-        # 更新信息
-        sector.sector_name = sector_name
-        sector.updated_at = datetime.now()
-        logger.info(f"更新板块: {sector_code} {sector_name}")
-    else:
-        # 创建新记录
-        sector = Sector(
-            sector_code=sector_code,
-            sector_name=sector_name,
-            sector_type=sector_type,
-            status='active',
-            stock_count=0
-        )
-        db.add(sector)
-        logger.info(f"新增板块: {sector_code} {sector_name}")
+    stmt = mysql_insert(Sector).values(list(rows.values()))
+    stmt = stmt.on_duplicate_key_update(
+        sector_name=stmt.inserted.sector_name,
+        sector_type=stmt.inserted.sector_type,
+        updated_at=datetime.now(),
+    )
+    db.execute(stmt)
+    db.commit()
     
-    return sector
+    total_updated = len(existing_codes)
+    return len(rows) - total_updated, total_updated
 
 
-async def collect_sectors(sector_type: str = 'industry'):
+async def collect_sectors(sector_type: str = 'industry', api: EastMoneyAPI = None):
     """
-    采集板块信息
+    采集板块信息（分页并发获取全部板块）
     
     Args:
         sector_type: 板块类型 (industry/concept/area)
+        api: 共享的API客户端，为None时自行创建
     """
     db = SessionLocal()
-    api = EastMoneyAPI()
+    own_api = api is None
+    if own_api:
+        configure_eastmoney_limiter(db)
+        api = EastMoneyAPI(
+            base_url=settings.EASTMONEY_BASE_URL,
+            history_url=settings.EASTMONEY_HISTORY_URL,
+            limiter=eastmoney_limiter,
+        )
     
     try:
-        total_collected = 0
-        total_updated = 0
-        
         logger.info(f"开始采集 {sector_type} 板块信息...")
         
-        # 获取板块数据
-        raw_data = await api.get_sector_capital_flow(sector_type=sector_type)
+        # 分页并发获取全部板块
+        sectors_data = await api.fetch_all_pages(
+            lambda page: api.get_sector_capital_flow(
+                sector_type=sector_type,
+                page=page,
+                page_size=SECTOR_PAGE_SIZE
+            ),
+            page_size=SECTOR_PAGE_SIZE
+        )
         
-        if not raw_data or 'diff' not in raw_data:
+        if not sectors_data:
             logger.warning(f"{sector_type} 板块数据为空")
             return
         
-        # 解析数据
-        sectors_data = raw_data['diff']
-        
         logger.info(f"获取到 {len(sectors_data)} 个板块")
         
-        # 保存到数据库
-        for sector_item in sectors_data:
-            try:
-                existing = db.query(Sector).filter(
-                    Sector.sector_code == sector_item.get('f12', ''),
-                    Sector.sector_type == sector_type
-                ).first()
-                
-                if existing:
-                    total_updated += 1
-                else:
-                    total_collected += 1
-                
-                save_sector_from_api_data(db, sector_item, sector_type)
-                db.commit()
-            except Exception as e:
-                logger.error(f"保存板块失败 {sector_item.get('f12', 'unknown')}: {e}")
-                db.rollback()
-                continue
+        # 批量保存到数据库
+        total_collected, total_updated = save_sectors_bulk(db, sectors_data, sector_type)
         
         logger.info(f"{sector_type} 板块采集完成！新增: {total_collected}, 更新: {total_updated}")
         
     except Exception as e:
         logger.error(f"采集过程出错: {e}")
+        db.rollback()
         raise
     finally:
-        await api.close()
+        if own_api:
+            await api.close()
         db.close()
 
 
 async def collect_all_sectors():
-    """采集所有类型的板块"""
+    """并发采集所有类型的板块（共享限流器）"""
     sector_types = ['industry', 'concept', 'area']
     
-    for sector_type in sector_types:
-        try:
-            await collect_sectors(sector_type)
-            await asyncio.sleep(2)  # 避免请求过快
-        except Exception as e:
-            logger.error(f"采集 {sector_type} 板块失败: {e}")
-            continue
+    db = SessionLocal()
+    try:
+        configure_eastmoney_limiter(db)
+    finally:
+        db.close()
+    
+    api = EastMoneyAPI(
+        base_url=settings.EASTMONEY_BASE_URL,
+        history_url=settings.EASTMONEY_HISTORY_URL,
+        limiter=eastmoney_limiter,
+    )
+    
+    try:
+        started = time.monotonic()
+        results = await asyncio.gather(
+            *(collect_sectors(sector_type, api=api) for sector_type in sector_types),
+            return_exceptions=True
+        )
+        for sector_type, result in zip(sector_types, results):
+            if isinstance(result, Exception):
+                logger.error(f"采集 {sector_type} 板块失败: {result}")
+        logger.info(f"全部板块采集完成，耗时: {time.monotonic() - started:.1f}s")
+    finally:
+        await api.close()
 
 
 if __name__ == "__main__":
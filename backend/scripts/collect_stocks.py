@@ -14,6 +14,7 @@ sys.path.insert(0, str(backend_dir))
 
 from sqlalchemy.orm import Session
 from datetime import datetime
+from app.core.config import settings
 from app.core.database import SessionLocal
 from app.models.stock import Stock
 from app.services.eastmoney_api import EastMoneyAPI
@@ -78,7 +79,10 @@ async def collect_stocks_from_rank(max_pages: int = 10):
         max_pages: 最大采集页数（每页100条）
     """
     db = SessionLocal()
-    api = EastMoneyAPI()
+    api = EastMoneyAPI(
+        base_url=settings.EASTMONEY_BASE_URL,
+        history_url=settings.EASTMONEY_HISTORY_URL,
+    )
     
     try:
         total_collected = 0
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+资金流入异动信号计算脚本
+收盘后对全部股票计算资金异动信号并保存到数据库
+"""
+import sys
+import os
+from pathlib import Path
+from datetime import datetime
+
+# 添加项目根目录到路径
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.services.flow_signals import compute_and_save_signals
+from loguru import logger
+
+# 配置日志
+logger.add("logs/compute_flow_signals.log", rotation="10 MB", level="INFO")
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="资金流入异动信号计算脚本")
+    parser.add_argument(
+        "--date",
+        type=str,
+        default=None,
+        help="交易日期（YYYY-MM-DD），默认最新交易日"
+    )
+    parser.add_argument(
+        "--window",
+        type=int,
+        default=None,
+        help="基准窗口（交易日），默认读取系统配置"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=None,
+        help="z-score 阈值，默认读取系统配置"
+    )
+    
+    args = parser.parse_args()
+    
+    # 创建日志目录
+    os.makedirs("logs", exist_ok=True)
+    
+    trade_date = datetime.strptime(args.date, '%Y-%m-%d').date() if args.date else None
+    compute_and_save_signals(trade_date=trade_date, window=args.window, z_threshold=args.threshold)
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+持仓市值历史计算脚本
+收盘采集完成后运行，批量计算全部用户的每日持仓市值和浮动盈亏
+"""
+import sys
+import os
+from pathlib import Path
+from datetime import datetime
+
+# 添加项目根目录到路径
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.services.portfolio_history import compute_portfolio_history
+from loguru import logger
+
+# 配置日志
+logger.add("logs/compute_portfolio_history.log", rotation="10 MB", level="INFO")
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="持仓市值历史计算脚本")
+    parser.add_argument(
+        "--start",
+        type=str,
+        default=None,
+        help="开始日期（YYYY-MM-DD），默认最早的买入日"
+    )
+    parser.add_argument(
+        "--end",
+        type=str,
+        default=None,
+        help="结束日期（YYYY-MM-DD），默认今天"
+    )
+    
+    args = parser.parse_args()
+    
+    # 创建日志目录
+    os.makedirs("logs", exist_ok=True)
+    
+    start_date = datetime.strptime(args.start, '%Y-%m-%d').date() if args.start else None
+    end_date = datetime.strptime(args.end, '%Y-%m-%d').date() if args.end else None
+    compute_portfolio_history(start_date=start_date, end_date=end_date)
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+板块资金流向计算脚本
+收盘采集完成后运行，由成分股资金流向聚合板块资金流向、轮动指标并更新板块热度排名
+"""
+import sys
+import os
+from pathlib import Path
+from datetime import datetime
+
+# 添加项目根目录到路径
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.services.sector_rotation import compute_sector_flows
+from loguru import logger
+
+# 配置日志
+logger.add("logs/compute_sector_flows.log", rotation="10 MB", level="INFO")
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="板块资金流向计算脚本")
+    parser.add_argument(
+        "--date",
+        type=str,
+        default=None,
+        help="截止交易日期（YYYY-MM-DD），默认最新交易日"
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=1,
+        help="计算截止日之前的交易日数（用于回算），默认1"
+    )
+    parser.add_argument(
+        "--momentum-days",
+        type=int,
+        default=None,
+        help="资金动量窗口（交易日），默认读取系统配置"
+    )
+    
+    args = parser.parse_args()
+    
+    # 创建日志目录
+    os.makedirs("logs", exist_ok=True)
+    
+    trade_date = datetime.strptime(args.date, '%Y-%m-%d').date() if args.date else None
+    compute_sector_flows(trade_date=trade_date, days=args.days, momentum_days=args.momentum_days)
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+接口压测脚本
+按目标请求速率（开环，按计划时间发出请求，不等待前一个请求完成）驱动主要接口，
+统计实际吞吐量、状态码分布和 p50/p95/p99 延迟，用于在本地发现性能回退
+"""
+import sys
+import asyncio
+import json
+import random
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# 添加项目根目录到路径
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import httpx
+import numpy as np
+from loguru import logger
+
+# 配置日志
+logger.add("logs/load_test.log", rotation="10 MB", level="INFO")
+
+# 默认压测场景：(名称, 路径模板, 权重)，{code} 替换为随机股票代码
+DEFAULT_SCENARIO: List[Tuple[str, str, float]] = [
+    ('rank', '/api/v1/capital-flow/rank?page=1&page_size=50', 4),
+    ('rank_page', '/api/v1/capital-flow/rank?page={page}&page_size=100&sort_field=f204', 1),
+    ('stock_flow', '/api/v1/capital-flow/stock/{code}?days=30', 3),
+    ('stock_info', '/api/v1/stocks/{code}', 2),
+    ('intraday_flow', '/api/v1/intraday-flow/{code}', 1),
+    ('limit_status', '/api/v1/market/limit-status', 1),
+]
+
+
+def latency_summary(latencies: List[float]) -> Dict:
+    """延迟统计（毫秒）"""
+    if not latencies:
+        return {'count': 0}
+    values = np.array(latencies) * 1000
+    return {
+        'count': len(values),
+        'p50_ms': round(float(np.percentile(values, 50)), 2),
+        'p95_ms': round(float(np.percentile(values, 95)), 2),
+        'p99_ms': round(float(np.percentile(values, 99)), 2),
+        'max_ms': round(float(values.max()), 2),
+    }
+
+
+def load_scenario(path: Optional[str]) -> List[Tuple[str, str, float]]:
+    """读取压测场景文件（JSON：[{"name": ..., "path": ..., "weight": ...}]），未指定时使用默认场景"""
+    if not path:
+        return DEFAULT_SCENARIO
+    items = json.loads(Path(path).read_text(encoding='utf-8'))
+    return [(item['name'], item['path'], float(item.get('weight', 1))) for item in items]
+
+
+async def discover_codes(client: httpx.AsyncClient, count: int) -> List[str]:
+    """从排行榜接口取股票代码"""
+    response = await client.get("/api/v1/capital-flow/rank", params={'page': 1, 'page_size': min(count, 100)})
+    data = response.json().get('data') or {}
+    return [item['stock_code'] for item in data.get('items', []) if item.get('stock_code')]
+
+
+async def login(client: httpx.AsyncClient, username: str, password: str) -> str:
+    """登录获取访问令牌"""
+    response = await client.post("/api/v1/auth/login", data={"username": username, "password": password})
+    response.raise_for_status()
+    return response.json()['access_token']
+
+
+class LoadTest:
+    """开环压测：第 i 个请求计划在 start + i/rps 发出，延迟从计划时间算起（包含排队时间）"""
+
+    def __init__(self, client: httpx.AsyncClient, scenario: List[Tuple[str, str, float]],
+                 codes: List[str], max_pages: int = 10, seed: int = 0):
+        self.client = client
+        self.names = [name for name, _, _ in scenario]
+        self.paths = {name: path for name, path, _ in scenario}
+        self.weights = [weight for _, _, weight in scenario]
+        self.codes = codes or ['600000']
+        self.max_pages = max_pages
+        self.rng = random.Random(seed)
+        self.results: List[Tuple[str, int, float]] = []
+        self.late = 0
+
+    def next_request(self) -> Tuple[str, str]:
+        name = self.rng.choices(self.names, weights=self.weights)[0]
+        path = self.paths[name].format(code=self.rng.choice(self.codes), page=self.rng.randint(1, self.max_pages))
+        return name, path
+
+    async def send(self, name: str, path: str, scheduled: float):
+        try:
+            response = await self.client.get(path)
+            status_code = response.status_code
+        except httpx.HTTPError as e:
+            logger.debug(f"请求失败: {path}, 错误: {e}")
+            status_code = 0
+        self.results.append((name, status_code, time.perf_counter() - scheduled))
+
+    async def run(self, rps: float, duration: float) -> float:
+        """按目标速率发出请求，等待全部完成，返回实际发出请求所用时间"""
+        tasks = []
+        total = int(rps * duration)
+        started = time.perf_counter()
+        for i in range(total):
+            scheduled = started + i / rps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            elif delay < -0.01:
+                self.late += 1
+            name, path = self.next_request()
+            tasks.append(asyncio.create_task(self.send(name, path, scheduled)))
+        send_seconds = time.perf_counter() - started
+        await asyncio.gather(*tasks)
+        return send_seconds
+
+    def report(self, send_seconds: float, total_seconds: float) -> Dict:
+        by_endpoint: Dict[str, Dict] = {}
+        for name in self.names:
+            rows = [(status, latency) for n, status, latency in self.results if n == name]
+            if rows:
+                by_endpoint[name] = self._summary(rows)
+        summary = self._summary([(status, latency) for _, status, latency in self.results])
+        summary.update({
+            'send_seconds': round(send_seconds, 3),
+            'total_seconds': round(total_seconds, 3),
+            'throughput_rps': round(len(self.results) / total_seconds, 2) if total_seconds > 0 else None,
+            'late_sends': self.late,
+        })
+        return {'overall': summary, 'endpoints': by_endpoint}
+
+    @staticmethod
+    def _summary(rows: List[Tuple[int, float]]) -> Dict:
+        status_counts: Dict[str, int] = {}
+        for status_code, _ in rows:
+            status_counts[str(status_code)] = status_counts.get(str(status_code), 0) + 1
+        ok = [latency for status_code, latency in rows if 200 <= status_code < 400]
+        return {
+            'requests': len(rows),
+            'errors': len(rows) - len(ok),
+            'status': status_counts,
+            'latency': latency_summary([latency for _, latency in rows]),
+            'success_latency': latency_summary(ok),
+        }
+
+
+async def run_load_test(args) -> Dict:
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+    headers = {}
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        if args.username:
+            headers['Authorization'] = f"Bearer {await login(client, args.username, args.password)}"
+            client.headers.update(headers)
+
+        codes = [code for code in args.codes.split(',') if code] if args.codes else await discover_codes(client, 100)
+        if not codes:
+            logger.warning("未获取到股票代码，使用默认代码 600000")
+        logger.info(f"压测股票代码: {len(codes)} 只")
+
+        test = LoadTest(client, load_scenario(args.scenario), codes, seed=args.seed)
+        if args.warmup > 0:
+            logger.info(f"预热 {args.warmup} 秒")
+            await LoadTest(client, load_scenario(args.scenario), codes, seed=args.seed + 1).run(args.rps, args.warmup)
+
+        logger.info(f"开始压测: 目标 {args.rps} 请求/秒，持续 {args.duration} 秒")
+        started = time.perf_counter()
+        send_seconds = await test.run(args.rps, args.duration)
+        total_seconds = time.perf_counter() - started
+
+    result = {
+        'base_url': args.base_url,
+        'target_rps': args.rps,
+        'duration': args.duration,
+        'connections': args.connections,
+    }
+    result.update(test.report(send_seconds, total_seconds))
+    return result
+
+
+def compare_with_baseline(result: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """对比基线的成功请求 p95/p99，返回超过阈值的回退项"""
+    regressions = []
+    for name, current in result['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(name)
+        if not previous:
+            continue
+        for key in ('p95_ms', 'p99_ms'):
+            old = previous['success_latency'].get(key)
+            new = current['success_latency'].get(key)
+            if old and new and new > old * (1 + threshold):
+                regressions.append(f"{name} {key}: {old} -> {new}")
+    return regressions
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="接口压测脚本")
+    parser.add_argument(
+        "--base-url",
+        type=str,
+        default="http://127.0.0.1:8887",
+        help="API服务地址"
+    )
+    parser.add_argument(
+        "--rps",
+        type=float,
+        default=50,
+        help="目标请求速率（请求/秒），默认50"
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=30,
+        help="压测时长（秒），默认30"
+    )
+    parser.add_argument(
+        "--warmup",
+        type=float,
+        default=5,
+        help="预热时长（秒，不计入结果），默认5"
+    )
+    parser.add_argument(
+        "--connections",
+        type=int,
+        default=100,
+        help="最大连接数，默认100"
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=30.0,
+        help="请求超时（秒），默认30"
+    )
+    parser.add_argument(
+        "--scenario",
+        type=str,
+        default=None,
+        help="压测场景文件（JSON），默认使用内置场景"
+    )
+    parser.add_argument(
+        "--codes",
+        type=str,
+        default=None,
+        help="股票代码（逗号分隔），默认从排行榜接口获取"
+    )
+    parser.add_argument(
+        "--username",
+        type=str,
+        default=None,
+        help="登录用户名（场景包含需要登录的接口时使用）"
+    )
+    parser.add_argument(
+        "--password",
+        type=str,
+        default=None,
+        help="登录密码"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="请求选择的随机种子"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="结果输出文件（JSON）"
+    )
+    parser.add_argument(
+        "--baseline",
+        type=str,
+        default=None,
+        help="基线结果文件（JSON），对比各接口成功请求的 p95/p99"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="判定回退的延迟增幅，默认0.2（20%%）"
+    )
+
+    args = parser.parse_args()
+
+    result = asyncio.run(run_load_test(args))
+    logger.info(f"压测结果:\n{json.dumps(result, ensure_ascii=False, indent=2)}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding='utf-8')
+        logger.info(f"结果已写入: {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        regressions = compare_with_baseline(result, baseline, args.threshold)
+        if regressions:
+            logger.warning("延迟回退:\n" + "\n".join(regressions))
+            sys.exit(1)
+        logger.info("与基线相比没有延迟回退")
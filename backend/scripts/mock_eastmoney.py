@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+东方财富接口本地模拟服务
+回放录制的接口响应（没有录制时按参数生成确定性的模拟数据），支持注入延迟和错误，
+配合 EASTMONEY_BASE_URL / EASTMONEY_HISTORY_URL 指向本服务，在本地压测而不访问真实接口
+"""
+import sys
+import asyncio
+import hashlib
+import json
+import random
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# 添加项目根目录到路径
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import httpx
+from fastapi import Body, FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+from loguru import logger
+
+# 配置日志
+logger.add("logs/mock_eastmoney.log", rotation="10 MB", level="INFO")
+
+# 不参与录制文件匹配的参数（回调名、时间戳、令牌等每次请求都会变化）
+IGNORED_PARAMS = {'_', 'cb', 'ut', 'wbp2u'}
+
+# 历史数据接口（录制时转发到历史数据服务）
+HISTORY_PATHS = {'stock/fflow/daykline/get'}
+
+# 默认字段（请求未指定 fields 时返回）
+CLIST_FIELDS = 'f12,f14,f2,f3,f62,f184,f66,f69,f72,f75,f78,f81,f84,f87,f204,f205,f124,f1,f13'
+
+
+def fixture_key(path: str, params: Dict[str, str]) -> str:
+    """录制文件名（接口路径 + 参数摘要）"""
+    canonical = '&'.join(f"{k}={params[k]}" for k in sorted(params) if k not in IGNORED_PARAMS)
+    digest = hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:16]
+    return f"{path.replace('/', '_')}-{digest}.json"
+
+
+class FixtureStore:
+    """录制的接口响应（每个文件保存一次请求的参数和响应体）"""
+
+    def __init__(self, directory: Optional[str]):
+        self.directory = Path(directory) if directory else None
+        self._cache: Dict[str, Optional[Dict]] = {}
+
+    def load(self, path: str, params: Dict[str, str]) -> Optional[Dict]:
+        if self.directory is None:
+            return None
+        key = fixture_key(path, params)
+        if key not in self._cache:
+            file = self.directory / key
+            self._cache[key] = json.loads(file.read_text(encoding='utf-8'))['response'] if file.exists() else None
+        return self._cache[key]
+
+    def save(self, path: str, params: Dict[str, str], response: Dict):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        key = fixture_key(path, params)
+        record = {'path': path, 'params': params, 'response': response}
+        (self.directory / key).write_text(json.dumps(record, ensure_ascii=False), encoding='utf-8')
+        self._cache[key] = response
+
+    def __len__(self) -> int:
+        return len(list(self.directory.glob('*.json'))) if self.directory and self.directory.exists() else 0
+
+
+class SyntheticMarket:
+    """确定性的模拟行情（同一 seed 下每只股票的数据固定）"""
+
+    def __init__(self, stock_count: int = 5000, sector_count: int = 90, seed: int = 20240101):
+        self.seed = seed
+        rng = random.Random(seed)
+        self.stocks: List[Dict] = []
+        for i in range(stock_count):
+            # 上海 60xxxx（f13=1），深圳 00xxxx/30xxxx（f13=0）
+            if i % 2 == 0:
+                code, exchange, market_code = f"{600000 + i // 2:06d}", 1, 2
+            elif i % 4 == 1:
+                code, exchange, market_code = f"{1 + i // 4:06d}", 0, 6
+            else:
+                code, exchange, market_code = f"{300001 + i // 4:06d}", 0, 80
+            self.stocks.append(self._quote(rng, code, f"模拟{code}", market_code, exchange))
+        self.by_secid = {f"{s['f13']}.{s['f12']}": s for s in self.stocks}
+        self.sectors = [
+            self._quote(rng, f"BK{1000 + i:04d}", f"模拟板块{i + 1}", 90, 90) | {'f128': self.stocks[i]['f14']}
+            for i in range(sector_count)
+        ]
+        self._sorted_cache: Dict[tuple, List[Dict]] = {}
+
+    @staticmethod
+    def _quote(rng: random.Random, code: str, name: str, market_code: int, exchange: int) -> Dict:
+        pre_close = round(rng.uniform(3, 200), 2)
+        change = round(rng.uniform(-10, 10), 2)
+        price = round(pre_close * (1 + change / 100), 2)
+        amount = round(rng.uniform(1e7, 5e9), 2)
+        main = round(rng.uniform(-0.15, 0.15) * amount, 2)
+        super_ = round(main * rng.uniform(0.3, 0.8), 2)
+        large = round(main - super_, 2)
+        medium = round(-main * rng.uniform(0.3, 0.7), 2)
+        small = round(-main - medium, 2)
+        return {
+            'f12': code, 'f14': name, 'f1': market_code, 'f13': exchange,
+            'f2': price, 'f3': change, 'f5': int(amount / max(price, 0.01) / 100), 'f6': amount,
+            'f15': round(max(price, pre_close) * 1.01, 2), 'f16': round(min(price, pre_close) * 0.99, 2),
+            'f17': pre_close, 'f18': pre_close,
+            'f62': main, 'f184': round(main / amount * 100, 2),
+            'f66': super_, 'f69': round(super_ / amount * 100, 2),
+            'f72': large, 'f75': round(large / amount * 100, 2),
+            'f78': medium, 'f81': round(medium / amount * 100, 2),
+            'f84': small, 'f87': round(small / amount * 100, 2),
+            'f204': round(main * rng.uniform(-3, 5), 2), 'f205': round(main * rng.uniform(-5, 10), 2),
+            'f124': int(time.time()),
+        }
+
+    def _rng(self, *parts) -> random.Random:
+        return random.Random(f"{self.seed}:" + ':'.join(map(str, parts)))
+
+    @staticmethod
+    def _select(item: Dict, fields: str) -> Dict:
+        return {f: item.get(f, '-') for f in fields.split(',') if f}
+
+    def _sorted(self, fs: str, fid: str, descending: bool) -> List[Dict]:
+        """按筛选条件和排序字段排好的列表（缓存，避免模拟服务自身成为压测瓶颈）"""
+        key = (fs, fid, descending)
+        if key not in self._sorted_cache:
+            if fs.startswith('m:90'):
+                items = self.sectors
+            elif fs.startswith('b:'):
+                # 板块成分股：按板块编号取固定的一组股票
+                rng = self._rng('sector', fs)
+                items = rng.sample(self.stocks, min(len(self.stocks), rng.randint(20, 200)))
+            else:
+                items = self.stocks
+            self._sorted_cache[key] = sorted(items, key=lambda s: s.get(fid, 0), reverse=descending)
+        return self._sorted_cache[key]
+
+    def clist(self, params: Dict[str, str]) -> Optional[Dict]:
+        items = self._sorted(params.get('fs', ''), params.get('fid', 'f62'), params.get('po', '1') == '1')
+
+        page = max(1, int(params.get('pn', 1)))
+        page_size = max(1, int(params.get('pz', 20)))
+        rows = items[(page - 1) * page_size:page * page_size]
+        if not rows:
+            return None
+        fields = params.get('fields', CLIST_FIELDS)
+        return {'total': len(items), 'diff': [self._select(s, fields) for s in rows]}
+
+    def ulist(self, params: Dict[str, str]) -> Optional[Dict]:
+        fields = params.get('fields', CLIST_FIELDS)
+        rows = [self.by_secid[s] for s in params.get('secids', '').split(',') if s in self.by_secid]
+        if not rows:
+            return None
+        return {'total': len(rows), 'diff': [self._select(s, fields) for s in rows]}
+
+    def quote(self, params: Dict[str, str]) -> Optional[Dict]:
+        stock = self.by_secid.get(params.get('secid', ''))
+        if stock is None:
+            return None
+        return {
+            'f57': stock['f12'], 'f58': stock['f14'],
+            'f43': stock['f2'], 'f44': stock['f15'], 'f45': stock['f16'], 'f46': stock['f17'],
+            'f47': stock['f5'], 'f48': stock['f6'], 'f49': stock['f5'] // 2, 'f50': 1.0,
+            'f169': round(stock['f2'] - stock['f18'], 2), 'f170': stock['f3'], 'f171': 3.5,
+        }
+
+    def intraday_flow(self, params: Dict[str, str]) -> Optional[Dict]:
+        secid = params.get('secid', '')
+        stock = self.by_secid.get(secid)
+        if stock is None:
+            return None
+        # 当日累计分钟资金流向：时间,主力,小单,中单,大单,超大单
+        today = date.today().isoformat()
+        rng = self._rng('intraday', secid, today)
+        klines = []
+        totals = [0.0] * 5
+        minute = datetime.fromisoformat(f"{today} 09:30")
+        for i in range(240):
+            minute += timedelta(minutes=1)
+            if i == 120:
+                minute = datetime.fromisoformat(f"{today} 13:00") + timedelta(minutes=1)
+            step = stock['f6'] / 240 * 0.05
+            main = rng.uniform(-step, step)
+            small = -main * rng.uniform(0.3, 0.6)
+            medium = -main - small
+            large = main * rng.uniform(0.2, 0.7)
+            super_ = main - large
+            for k, value in enumerate((main, small, medium, large, super_)):
+                totals[k] += value
+            klines.append(f"{minute:%Y-%m-%d %H:%M}," + ','.join(f"{v:.1f}" for v in totals))
+        return {'code': stock['f12'], 'market': stock['f13'], 'name': stock['f14'], 'klines': klines}
+
+    def history_flow(self, params: Dict[str, str]) -> Optional[Dict]:
+        secid = params.get('secid', '')
+        stock = self.by_secid.get(secid)
+        if stock is None:
+            return None
+        limit = int(params.get('lmt') or 120)
+        rng = self._rng('history', secid)
+        days: List[date] = []
+        day = date.today()
+        while len(days) < limit:
+            if day.weekday() < 5:
+                days.append(day)
+            day -= timedelta(days=1)
+
+        klines = []
+        price = stock['f18']
+        for day in reversed(days):
+            change = rng.uniform(-5, 5)
+            price = round(max(price * (1 + change / 100), 0.5), 2)
+            amount = rng.uniform(1e7, 5e9)
+            main = rng.uniform(-0.15, 0.15) * amount
+            super_ = main * rng.uniform(0.3, 0.8)
+            large = main - super_
+            medium = -main * rng.uniform(0.3, 0.7)
+            small = -main - medium
+            flows = []
+            for value in (main, super_, large, medium, small):
+                flows.extend((f"{value:.1f}", f"{value / amount * 100:.2f}"))
+            # 日期,主力,主力占比,超大单,占比,大单,占比,中单,占比,小单,占比,收盘价,涨跌幅,成交量,成交额
+            klines.append(','.join([
+                day.isoformat(), *flows, f"{price:.2f}", f"{change:.2f}",
+                str(int(amount / price / 100)), f"{amount:.1f}",
+            ]))
+        return {'code': stock['f12'], 'market': stock['f13'], 'name': stock['f14'], 'klines': klines}
+
+    def respond(self, path: str, params: Dict[str, str]) -> Optional[Dict]:
+        handler = {
+            'clist/get': self.clist,
+            'ulist.np/get': self.ulist,
+            'stock/get': self.quote,
+            'stock/fflow/get': self.intraday_flow,
+            'stock/fflow/daykline/get': self.history_flow,
+        }.get(path)
+        return handler(params) if handler else None
+
+
+class MockSettings:
+    """延迟和错误注入配置（可通过 /_mock/config 在运行中调整）"""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 500, timeout_rate: float = 0.0, timeout_delay: float = 35.0):
+        """
+        Args:
+            latency: 固定延迟（秒）
+            jitter: 随机附加延迟上限（秒，均匀分布）
+            error_rate: 返回错误状态码的请求比例
+            error_status: 注入错误使用的状态码
+            timeout_rate: 长时间不响应的请求比例（模拟上游挂起）
+            timeout_delay: 不响应请求的等待时间（秒，默认超过客户端30秒超时）
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.timeout_rate = timeout_rate
+        self.timeout_delay = timeout_delay
+
+    def to_dict(self) -> Dict:
+        return dict(vars(self))
+
+    def update(self, values: Dict):
+        for key, value in values.items():
+            if key in vars(self):
+                setattr(self, key, type(getattr(self, key))(value))
+
+
+def create_app(
+    fixtures: FixtureStore,
+    market: Optional[SyntheticMarket],
+    mock_settings: MockSettings,
+    record: bool = False,
+    upstream_base: str = "http://push2.eastmoney.com",
+    upstream_history: str = "http://push2his.eastmoney.com",
+) -> FastAPI:
+    """
+    创建模拟服务
+
+    Args:
+        fixtures: 录制的响应
+        market: 模拟行情，为None时没有录制的请求返回404
+        mock_settings: 延迟和错误注入配置
+        record: 录制模式（没有录制的请求转发到真实接口并保存响应）
+        upstream_base / upstream_history: 录制模式下转发的真实接口地址
+    """
+    app = FastAPI(title="EastMoney Mock", docs_url=None, redoc_url=None)
+    stats: Counter = Counter()
+    client = httpx.AsyncClient(timeout=30.0) if record else None
+
+    @app.get("/api/qt/{path:path}")
+    async def replay(path: str, request: Request):
+        params = dict(request.query_params)
+        if random.random() < mock_settings.timeout_rate:
+            stats['timeout'] += 1
+            await asyncio.sleep(mock_settings.timeout_delay)
+        delay = mock_settings.latency + random.uniform(0, mock_settings.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if random.random() < mock_settings.error_rate:
+            stats['error'] += 1
+            return JSONResponse({'rc': 1, 'data': None}, status_code=mock_settings.error_status)
+
+        data = fixtures.load(path, params)
+        if data is not None:
+            stats['replayed'] += 1
+            return data
+
+        if record:
+            upstream = upstream_history if path in HISTORY_PATHS else upstream_base
+            response = await client.get(f"{upstream}/api/qt/{path}", params=params)
+            if response.status_code == 200:
+                data = response.json()
+                fixtures.save(path, params, data)
+                stats['recorded'] += 1
+                return data
+            stats['upstream_error'] += 1
+            return Response(response.content, status_code=response.status_code,
+                            media_type=response.headers.get('content-type'))
+
+        if market is not None:
+            stats['synthetic'] += 1
+            return {'rc': 0, 'rt': 4, 'data': market.respond(path, params)}
+
+        stats['missing'] += 1
+        return JSONResponse({'rc': 1, 'data': None}, status_code=404)
+
+    @app.get("/_mock/stats")
+    async def get_stats():
+        return {'requests': dict(stats), 'fixtures': len(fixtures), 'settings': mock_settings.to_dict()}
+
+    @app.put("/_mock/config")
+    async def set_config(values: Dict = Body(...)):
+        mock_settings.update(values)
+        logger.info(f"模拟服务配置已更新: {mock_settings.to_dict()}")
+        return mock_settings.to_dict()
+
+    @app.on_event("shutdown")
+    async def shutdown():
+        if client is not None:
+            await client.aclose()
+
+    return app
+
+
+if __name__ == "__main__":
+    import argparse
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="东方财富接口本地模拟服务")
+    parser.add_argument(
+        "--host",
+        type=str,
+        default="127.0.0.1",
+        help="监听地址"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=18080,
+        help="监听端口，默认18080"
+    )
+    parser.add_argument(
+        "--fixtures",
+        type=str,
+        default=None,
+        help="录制响应目录（回放和录制都使用该目录）"
+    )
+    parser.add_argument(
+        "--record",
+        action="store_true",
+        help="录制模式：没有录制的请求转发到真实接口并保存响应（需指定 --fixtures）"
+    )
+    parser.add_argument(
+        "--no-synthetic",
+        action="store_true",
+        help="没有录制的请求返回404，不生成模拟数据"
+    )
+    parser.add_argument(
+        "--stocks",
+        type=int,
+        default=5000,
+        help="模拟行情的股票数量，默认5000"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=20240101,
+        help="模拟行情的随机种子"
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.05,
+        help="每个请求的固定延迟（秒），默认0.05"
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0.05,
+        help="随机附加延迟上限（秒），默认0.05"
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="返回错误状态码的请求比例（0~1）"
+    )
+    parser.add_argument(
+        "--error-status",
+        type=int,
+        default=500,
+        help="注入错误使用的状态码，默认500"
+    )
+    parser.add_argument(
+        "--timeout-rate",
+        type=float,
+        default=0.0,
+        help="长时间不响应的请求比例（0~1）"
+    )
+    parser.add_argument(
+        "--timeout-delay",
+        type=float,
+        default=35.0,
+        help="不响应请求的等待时间（秒），默认35"
+    )
+
+    args = parser.parse_args()
+
+    if args.record and not args.fixtures:
+        parser.error("--record 需要指定 --fixtures")
+
+    fixture_store = FixtureStore(args.fixtures)
+    synthetic = None if args.no_synthetic else SyntheticMarket(stock_count=args.stocks, seed=args.seed)
+    injection = MockSettings(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        timeout_rate=args.timeout_rate,
+        timeout_delay=args.timeout_delay,
+    )
+
+    logger.info(
+        f"模拟服务启动: http://{args.host}:{args.port}，录制响应 {len(fixture_store)} 条，"
+        f"{'录制模式' if args.record else '回放模式'}，配置 {injection.to_dict()}"
+    )
+    uvicorn.run(create_app(fixture_store, synthetic, injection, record=args.record),
+                host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+资金流向策略回测脚本
+读取 capital_flow 历史数据运行策略回测，支持参数网格的多进程扫描
+"""
+import sys
+import os
+import json
+from pathlib import Path
+from datetime import datetime
+
+# 添加项目根目录到路径
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.core.database import SessionLocal
+from app.services.backtest import (
+    BUILTIN_STRATEGIES, resolve_strategy, validate_strategy, expand_param_grid, run_sweep, write_sweep_output
+)
+from app.services.flow_panel import load_flow_panel
+from loguru import logger
+
+# 配置日志
+logger.add("logs/run_backtest.log", rotation="10 MB", level="INFO")
+
+
+def load_json_arg(value):
+    """参数可以是 JSON 字符串或 JSON 文件路径"""
+    if value is None:
+        return None
+    if os.path.exists(value):
+        with open(value, encoding='utf-8') as f:
+            return json.load(f)
+    return json.loads(value)
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="资金流向策略回测脚本")
+    parser.add_argument(
+        "--strategy",
+        type=str,
+        default="main_spike",
+        help="内置策略名称（" + ", ".join(BUILTIN_STRATEGIES) + "）或策略定义JSON文件路径"
+    )
+    parser.add_argument(
+        "--start",
+        type=str,
+        default="2015-01-01",
+        help="开始日期（YYYY-MM-DD）"
+    )
+    parser.add_argument(
+        "--end",
+        type=str,
+        default=None,
+        help="结束日期（YYYY-MM-DD），默认今天"
+    )
+    parser.add_argument(
+        "--grid",
+        type=str,
+        default=None,
+        help='参数网格，JSON字符串或文件路径，如 \'{"z": [1.5, 2, 2.5], "hold_days": [5, 10]}\''
+    )
+    parser.add_argument(
+        "--cost-bps",
+        type=float,
+        default=10,
+        help="单边交易成本（基点），默认10"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="进程数，默认CPU核数"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="backtest_results",
+        help="结果输出目录"
+    )
+    
+    args = parser.parse_args()
+    
+    # 创建日志目录
+    os.makedirs("logs", exist_ok=True)
+    
+    if args.strategy in BUILTIN_STRATEGIES:
+        name, strategy = args.strategy, BUILTIN_STRATEGIES[args.strategy]
+    else:
+        name, strategy = Path(args.strategy).stem, load_json_arg(args.strategy)
+    grid = load_json_arg(args.grid)
+    
+    columns = {'change_percent'}
+    for params in expand_param_grid(grid):
+        columns |= validate_strategy(resolve_strategy(strategy, params))
+    
+    start_date = datetime.strptime(args.start, '%Y-%m-%d').date()
+    end_date = datetime.strptime(args.end, '%Y-%m-%d').date() if args.end else datetime.now().date()
+    
+    db = SessionLocal()
+    try:
+        panel = load_flow_panel(db, start_date, end_date, columns=sorted(columns))
+    finally:
+        db.close()
+    
+    if not panel.dates:
+        logger.warning("回测区间内没有资金流向数据")
+        sys.exit(0)
+    
+    logger.info(f"回测数据加载完成，股票数: {panel.shape[0]}，交易日: {panel.shape[1]}")
+    sweep = run_sweep(
+        strategy,
+        panel,
+        grid=grid,
+        cost_rate=args.cost_bps / 10000,
+        workers=args.workers,
+        work_dir=os.path.join(args.output, '.panel')
+    )
+    
+    for i, result in enumerate(sweep['results']):
+        logger.info(f"[{i}] 参数: {result['params']} 统计: {result['stats']}")
+    logger.info(f"每策略年耗时: {sweep['seconds_per_strategy_year']}s")
+    
+    summary_path, equity_path = write_sweep_output(args.output, name, sweep)
+    logger.info(f"结果已保存: {summary_path}, {equity_path}")
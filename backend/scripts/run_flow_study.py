@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+资金流向预测能力研究脚本
+计算各资金流向指标对未来N日收益的 Rank IC 和分位组收益
+"""
+import sys
+import os
+from pathlib import Path
+from datetime import datetime
+
+# 添加项目根目录到路径
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.core.database import SessionLocal
+from app.services.flow_study import (
+    DEFAULT_HORIZONS, DEFAULT_QUANTILES, load_cached_panel, run_flow_study, write_study_output
+)
+from loguru import logger
+
+# 配置日志
+logger.add("logs/run_flow_study.log", rotation="10 MB", level="INFO")
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="资金流向预测能力研究脚本")
+    parser.add_argument(
+        "--start",
+        type=str,
+        default="2018-01-01",
+        help="开始日期（YYYY-MM-DD）"
+    )
+    parser.add_argument(
+        "--end",
+        type=str,
+        default=None,
+        help="结束日期（YYYY-MM-DD），默认今天"
+    )
+    parser.add_argument(
+        "--horizons",
+        type=str,
+        default=",".join(str(h) for h in DEFAULT_HORIZONS),
+        help="预测周期（交易日），逗号分隔，默认 1,5,20"
+    )
+    parser.add_argument(
+        "--quantiles",
+        type=int,
+        default=DEFAULT_QUANTILES,
+        help="分位组数，默认5"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default="study_cache",
+        help="面板缓存目录"
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="忽略缓存重新读取数据"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="study_results",
+        help="结果输出目录"
+    )
+    
+    args = parser.parse_args()
+    
+    # 创建日志目录
+    os.makedirs("logs", exist_ok=True)
+    
+    start_date = datetime.strptime(args.start, '%Y-%m-%d').date()
+    end_date = datetime.strptime(args.end, '%Y-%m-%d').date() if args.end else datetime.now().date()
+    horizons = [int(h) for h in args.horizons.split(',') if h.strip()]
+    
+    db = SessionLocal()
+    try:
+        panel = load_cached_panel(db, start_date, end_date, args.cache_dir, refresh=args.refresh)
+    finally:
+        db.close()
+    
+    if not panel.dates:
+        logger.warning("研究区间内没有资金流向数据")
+        sys.exit(0)
+    
+    logger.info(f"面板加载完成，股票数: {panel.shape[0]}，交易日: {panel.shape[1]}")
+    study = run_flow_study(panel, horizons=horizons, quantiles=args.quantiles)
+    
+    for horizon, metrics in study['horizons'].items():
+        logger.info(f"===== 未来 {horizon} 日收益 =====")
+        for metric, stats in sorted(metrics.items(), key=lambda item: -abs(item[1]['ic_mean'] or 0)):
+            logger.info(
+                f"{metric:20s} IC均值: {stats['ic_mean']}  ICIR: {stats['icir']}  t值: {stats['ic_tstat']}  "
+                f"多空: {stats['long_short']}  分组: {stats['quantile_returns']}"
+            )
+    
+    path = write_study_output(args.output, study)
+    logger.info(f"研究完成，计算耗时: {study['runtime_seconds']}s，结果已保存: {path}")
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+主力连续净流入状态更新脚本
+收盘采集完成后运行，把 flow_streaks 增量更新到最新交易日
+"""
+import sys
+import os
+from pathlib import Path
+from datetime import datetime
+
+# 添加项目根目录到路径
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.services.flow_streaks import update_flow_streaks
+from loguru import logger
+
+# 配置日志
+logger.add("logs/update_flow_streaks.log", rotation="10 MB", level="INFO")
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="主力连续净流入状态更新脚本")
+    parser.add_argument(
+        "--until",
+        type=str,
+        default=None,
+        help="更新到的交易日期（YYYY-MM-DD），默认最新交易日"
+    )
+    
+    args = parser.parse_args()
+    
+    # 创建日志目录
+    os.makedirs("logs", exist_ok=True)
+    
+    until_date = datetime.strptime(args.until, '%Y-%m-%d').date() if args.until else None
+    update_flow_streaks(until_date=until_date)
@@ -0,0 +1,81 @@
+"""
+回测引擎测试（特征计算和逐日模拟不使用未来数据）
+"""
+import numpy as np
+
+from app.services import flow_signals
+from app.services.backtest import (
+    FeatureCache, cross_section_rank_pct, rolling_sum, rolling_zscore, run_strategy, simulate
+)
+
+
+def test_rolling_sum():
+    matrix = np.array([[1.0, 2.0, np.nan, 4.0]])
+    np.testing.assert_allclose(rolling_sum(matrix, 2), [[np.nan, 3.0, 2.0, 4.0]], equal_nan=True)
+
+
+def test_rolling_zscore_matches_signal_engine():
+    rng = np.random.default_rng(0)
+    matrix = rng.normal(size=(5, 40))
+    matrix[2, 10:14] = np.nan
+    np.testing.assert_allclose(
+        rolling_zscore(matrix, 10), flow_signals.rolling_zscore(matrix, 10), equal_nan=True, atol=1e-9
+    )
+
+
+def test_cross_section_rank_pct():
+    matrix = np.array([[3.0], [1.0], [np.nan], [2.0]])
+    np.testing.assert_allclose(cross_section_rank_pct(matrix), [[1.0], [0.0], [np.nan], [0.5]], equal_nan=True)
+
+
+def test_features_do_not_use_future_values():
+    rng = np.random.default_rng(2)
+    values = rng.normal(size=(6, 50))
+    changed = values.copy()
+    changed[:, 30:] = rng.normal(size=(6, 20)) * 100
+    for transform in ('sum', 'mean', 'zscore', 'rank_pct'):
+        rule = {'column': 'x', 'transform': transform, 'window': 3, 'baseline': 10}
+        before = FeatureCache({'x': values}).get(rule)[:, :30]
+        after = FeatureCache({'x': changed}).get(rule)[:, :30]
+        np.testing.assert_allclose(before, after, equal_nan=True, err_msg=transform)
+
+
+def test_entry_day_return_not_captured():
+    """当日收盘买入，收益从次日开始计入"""
+    entry = np.zeros((1, 4), dtype=bool)
+    entry[0, 1] = True
+    returns = np.array([[0.5, 0.5, 0.1, 0.2]])
+    result = simulate(entry, np.zeros_like(entry), np.ones((1, 4)), returns,
+                      max_hold_days=2, max_positions=None, cost_rate=0.0)
+    np.testing.assert_allclose(result['daily_return'], [0.0, 0.0, 0.1, 0.2])
+    assert result['positions'].tolist() == [0, 1, 1, 0]
+    assert result['trades'].tolist() == [0, 1, 0, 1]
+
+
+def test_max_positions_keeps_highest_ranked():
+    entry = np.ones((3, 2), dtype=bool)
+    rank_values = np.array([[1.0, 1.0], [3.0, 3.0], [2.0, 2.0]])
+    returns = np.array([[0.0, -0.1], [0.0, 0.2], [0.0, 0.1]])
+    result = simulate(entry, np.zeros_like(entry), rank_values, returns,
+                      max_hold_days=10, max_positions=2, cost_rate=0.0)
+    np.testing.assert_allclose(result['daily_return'], [0.0, 0.15])
+
+
+def test_run_strategy_results_ignore_future_data():
+    rng = np.random.default_rng(3)
+    flows = rng.normal(size=(20, 60))
+    returns = rng.normal(scale=0.01, size=(20, 60))
+    strategy = {
+        'params': {},
+        'entry': [{'column': 'main_inflow', 'transform': 'zscore', 'window': 3, 'op': '>=', 'value': 1.0}],
+        'exit': [{'column': 'main_inflow', 'transform': 'sum', 'window': 2, 'op': '<', 'value': 0}],
+        'max_hold_days': 5,
+        'max_positions': 5,
+    }
+    changed_flows, changed_returns = flows.copy(), returns.copy()
+    changed_flows[:, 40:] *= -50
+    changed_returns[:, 41:] *= 10
+
+    before = run_strategy(strategy, FeatureCache({'main_inflow': flows}), returns)
+    after = run_strategy(strategy, FeatureCache({'main_inflow': changed_flows}), changed_returns)
+    assert before['equity'][:41] == after['equity'][:41]
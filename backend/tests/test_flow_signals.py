@@ -0,0 +1,77 @@
+"""
+资金流入异动信号计算测试
+"""
+import numpy as np
+
+from app.services.flow_signals import DIVERGENCE_THRESHOLD, flag_signals, rolling_zscore
+
+
+def _reference_zscore(row, window):
+    result = np.full(len(row), np.nan)
+    for t in range(window, len(row)):
+        base = row[t - window:t]
+        base = base[~np.isnan(base)]
+        if len(base) >= max(2, window // 2) and base.std() > 0:
+            result[t] = (row[t] - base.mean()) / base.std()
+    return result
+
+
+def test_rolling_zscore_matches_reference():
+    rng = np.random.default_rng(0)
+    matrix = rng.normal(size=(4, 30))
+    matrix[1, 3:8] = np.nan
+    result = rolling_zscore(matrix, 5)
+    expected = np.vstack([_reference_zscore(row, 5) for row in matrix])
+    np.testing.assert_allclose(result, expected, equal_nan=True)
+
+
+def test_rolling_zscore_uses_only_past_values():
+    rng = np.random.default_rng(1)
+    matrix = rng.normal(size=(3, 20))
+    changed = matrix.copy()
+    changed[:, 15:] += 100
+    np.testing.assert_allclose(rolling_zscore(matrix, 5)[:, :15], rolling_zscore(changed, 5)[:, :15], equal_nan=True)
+
+
+def test_rolling_zscore_constant_or_short_baseline_is_nan():
+    matrix = np.array([[1.0, 1.0, 1.0, 1.0, 5.0], [np.nan, np.nan, np.nan, 1.0, 2.0]])
+    result = rolling_zscore(matrix, 4)
+    assert np.isnan(result).all()
+
+    short = np.ones((1, 3))
+    assert np.isnan(rolling_zscore(short, 5)).all()
+
+
+def test_flag_signals_inflow_direction_only():
+    metrics = {
+        'main_z': np.array([3.0, 3.0, 1.0, np.nan]),
+        'main_inflow': np.array([1e6, -1e6, 1e6, 1e6]),
+        'super_z': np.array([2.5, np.nan, 1.0, 2.0]),
+        'super_inflow': np.array([1e6, 1e6, 1e6, 1e6]),
+        'inflow_ratio_z': np.array([2.0, 2.0, 2.0, 2.0]),
+        'inflow_ratio': np.array([0.1, -0.1, 0.0, 0.2]),
+        'divergence': np.array([DIVERGENCE_THRESHOLD, 0.0, 0.01, 0.2]),
+    }
+    flags = flag_signals(metrics, 2.0)
+    assert flags['main_spike'].tolist() == [True, False, False, False]
+    assert flags['super_spike'].tolist() == [True, False, False, True]
+    assert flags['ratio_spike'].tolist() == [True, False, False, True]
+    assert flags['tier_divergence'].tolist() == [True, False, False, True]
+
+
+def test_super_spike_requires_inflow():
+    """历史上持续大额流出、当日小额流出时 z-score 很高，但不是流入异动"""
+    history = np.array([[-1e8, -1.2e8, -0.9e8, -1.1e8, -1e8, -1e6]])
+    super_z = rolling_zscore(history, 5)[:, -1]
+    assert super_z[0] > 2.0
+
+    metrics = {
+        'main_z': np.array([np.nan]),
+        'main_inflow': np.array([np.nan]),
+        'super_z': super_z,
+        'super_inflow': history[:, -1],
+        'inflow_ratio_z': np.array([np.nan]),
+        'inflow_ratio': np.array([np.nan]),
+        'divergence': np.array([0.0]),
+    }
+    assert not flag_signals(metrics, 2.0)['super_spike'][0]
@@ -0,0 +1,56 @@
+"""
+主力连续净流入状态增量更新测试
+"""
+from datetime import date
+
+import numpy as np
+
+from app.services.flow_streaks import StreakState, popcount, window_mask
+
+
+def _empty_state():
+    return StreakState(
+        np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64),
+        np.zeros(0, dtype=np.float64), np.zeros(0, dtype=np.uint64)
+    )
+
+
+def test_streak_counts_and_resets():
+    state = _empty_state()
+    state.apply_day(date(2024, 1, 2), np.array([2, 1]), np.array([100.0, 50.0]))
+    state.apply_day(date(2024, 1, 3), np.array([1, 2]), np.array([25.0, -10.0]))
+    state.apply_day(date(2024, 1, 4), np.array([1, 2]), np.array([5.0, 30.0]))
+
+    assert state.stock_ids.tolist() == [1, 2]
+    assert state.streaks.tolist() == [3, 1]
+    np.testing.assert_allclose(state.amounts, [80.0, 30.0])
+    assert state.bits.tolist() == [0b111, 0b101]
+
+
+def test_apply_day_is_idempotent_and_skips_missing_stocks():
+    state = _empty_state()
+    state.apply_day(date(2024, 1, 2), np.array([1, 2]), np.array([10.0, 10.0]))
+    # 股票2停牌，没有当日数据
+    assert state.apply_day(date(2024, 1, 3), np.array([1]), np.array([10.0])) == 1
+    assert state.apply_day(date(2024, 1, 3), np.array([1]), np.array([10.0])) == 0
+
+    rows = {row['stock_id']: row for row in state.changed_rows()}
+    assert rows[1]['current_streak'] == 2 and rows[1]['last_trade_date'] == date(2024, 1, 3)
+    assert rows[2]['current_streak'] == 1 and rows[2]['last_trade_date'] == date(2024, 1, 2)
+    assert rows[1]['window_count'] == 2
+
+
+def test_window_bits_keep_sixty_days():
+    state = _empty_state()
+    start = date(2024, 1, 1).toordinal()
+    for day in range(70):
+        state.apply_day(date.fromordinal(start + day), np.array([1]), np.array([1.0]))
+    assert int(state.bits[0]) == (1 << 60) - 1
+    assert popcount(state.bits).tolist() == [60]
+    assert popcount(state.bits, 20).tolist() == [20]
+
+
+def test_popcount_window():
+    bits = np.array([0b1011, 0, window_mask(60)], dtype=np.uint64)
+    assert popcount(bits, 2).tolist() == [2, 0, 2]
+    assert popcount(bits).tolist() == [3, 0, 60]
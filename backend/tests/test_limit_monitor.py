@@ -0,0 +1,127 @@
+"""
+涨跌停价计算和状态比对测试
+"""
+from datetime import date, datetime
+
+import numpy as np
+
+from app.services.limit_monitor import LimitMonitor, compute_limit_prices, compute_limit_ratios
+from app.services.market_snapshot import SNAPSHOT_COLUMNS, MarketSnapshot
+
+
+def test_limit_ratios_by_board_and_name():
+    codes = np.array(['600000', '000001', '300750', '688981', '600001', '300001'])
+    names = np.array(['浦发银行', '平安银行', '宁德时代', '中芯国际', '*ST某某', '某某'])
+    flags = np.zeros(len(codes), dtype=bool)
+    no_limit = flags.copy()
+    no_limit[5] = True
+
+    ratio = compute_limit_ratios(codes, names, flags, flags, flags, no_limit)
+    np.testing.assert_allclose(ratio[:5], [0.10, 0.10, 0.20, 0.20, 0.05])
+    assert np.isnan(ratio[5])
+
+
+def test_limit_ratio_uses_stock_flags():
+    codes = np.array(['000002'])
+    names = np.array(['某某'])
+    yes, no = np.array([True]), np.array([False])
+    assert compute_limit_ratios(codes, names, yes, no, no, no)[0] == 0.05
+    assert compute_limit_ratios(codes, names, no, yes, no, no)[0] == 0.20
+
+
+def test_limit_prices_round_half_up_to_cent():
+    pre_close = np.array([10.0, 9.99, 3.33, 12.35])
+    ratio = np.array([0.10, 0.10, 0.05, 0.20])
+    limit_up, limit_down = compute_limit_prices(pre_close, ratio)
+    np.testing.assert_allclose(limit_up, [11.0, 10.99, 3.5, 14.82])
+    np.testing.assert_allclose(limit_down, [9.0, 8.99, 3.16, 9.88])
+
+
+def _snapshot(codes, price, high=None, created_at=None, quote_time=None):
+    n = len(codes)
+    columns = {column: np.zeros(n) for column in SNAPSHOT_COLUMNS}
+    if quote_time is not None:
+        columns['quote_time'] = np.full(n, quote_time.timestamp())
+    columns['current_price'] = np.asarray(price, dtype=np.float64)
+    columns['pre_close_price'] = np.full(n, 10.0)
+    columns['high_price'] = np.asarray(high if high is not None else price, dtype=np.float64)
+    columns['low_price'] = np.asarray(price, dtype=np.float64)
+    return MarketSnapshot(np.array(codes), np.array(codes), columns, created_at or datetime(2024, 1, 2, 10, 0))
+
+
+def _monitor(codes):
+    monitor = LimitMonitor()
+    monitor._stock_info = {code: (i + 1, False, False, False, False) for i, code in enumerate(codes)}
+    return monitor
+
+
+def test_first_snapshot_only_builds_state():
+    monitor = _monitor(['600000'])
+    assert monitor.evaluate(_snapshot(['600000'], [11.0])) == []
+    assert monitor.at_up.tolist() == [True]
+
+
+def test_limit_up_break_and_reseal():
+    monitor = _monitor(['600000', '600001'])
+    monitor.evaluate(_snapshot(['600000', '600001'], [10.5, 10.5]))
+
+    events = monitor.evaluate(_snapshot(['600000', '600001'], [11.0, 10.5]))
+    assert [(e['stock_code'], e['event_type']) for e in events] == [('600000', 'limit_up')]
+    assert events[0]['limit_price'] == 11.0
+
+    events = monitor.evaluate(_snapshot(['600000', '600001'], [10.8, 10.5]))
+    assert [e['event_type'] for e in events] == ['limit_up_break']
+
+    events = monitor.evaluate(_snapshot(['600000', '600001'], [11.0, 10.5]))
+    assert [e['event_type'] for e in events] == ['limit_up_reseal']
+
+
+def test_touch_between_snapshots_counts_as_break():
+    monitor = _monitor(['600000'])
+    monitor.evaluate(_snapshot(['600000'], [10.5]))
+    events = monitor.evaluate(_snapshot(['600000'], [10.6], high=[11.0]))
+    assert [e['event_type'] for e in events] == ['limit_up_break']
+
+
+def test_state_realigned_when_codes_change():
+    monitor = _monitor(['600000', '600001', '000001'])
+    monitor.evaluate(_snapshot(['600000', '600001'], [11.0, 10.5]))
+    # 新增股票插入在前面，已封板的股票不重复产生事件
+    events = monitor.evaluate(_snapshot(['000001', '600000', '600001'], [10.2, 11.0, 11.0]))
+    assert [(e['stock_code'], e['stock_id'], e['event_type']) for e in events] == [('600001', 2, 'limit_up')]
+
+
+def test_off_session_snapshot_keeps_trade_date():
+    """收盘后跨过零点的快照仍是上一交易日的行情，不重复记录封板股票"""
+    close = datetime(2024, 1, 5, 15, 0)
+    monitor = _monitor(['600000'])
+    monitor.evaluate(_snapshot(['600000'], [10.5], created_at=close, quote_time=close))
+    events = monitor.evaluate(_snapshot(['600000'], [11.0], created_at=close, quote_time=close))
+    assert [(e['event_type'], e['trade_date']) for e in events] == [('limit_up', date(2024, 1, 5))]
+
+    after_midnight = datetime(2024, 1, 6, 0, 0, 5)
+    assert monitor.evaluate(_snapshot(['600000'], [11.0], created_at=after_midnight, quote_time=close)) == []
+    assert monitor.trade_date == date(2024, 1, 5)
+
+
+def test_trade_date_rollover_rebuilds_state_without_events():
+    monitor = _monitor(['600000', '600001'])
+    day1 = datetime(2024, 1, 5, 14, 0)
+    monitor.evaluate(_snapshot(['600000', '600001'], [10.5, 10.5], created_at=day1, quote_time=day1))
+    monitor.evaluate(_snapshot(['600000', '600001'], [11.0, 10.5], created_at=day1, quote_time=day1))
+
+    # 下一交易日第一个快照仍封板：只建立状态
+    day2 = datetime(2024, 1, 8, 9, 30)
+    assert monitor.evaluate(_snapshot(['600000', '600001'], [11.0, 10.5], created_at=day2, quote_time=day2)) == []
+
+    day2_later = datetime(2024, 1, 8, 9, 35)
+    events = monitor.evaluate(_snapshot(['600000', '600001'], [10.8, 11.0], created_at=day2_later, quote_time=day2_later))
+    assert sorted((e['stock_code'], e['event_type'], e['trade_date']) for e in events) == [
+        ('600000', 'limit_up_break', date(2024, 1, 8)),
+        ('600001', 'limit_up', date(2024, 1, 8)),
+    ]
+
+
+def test_trade_date_falls_back_to_snapshot_time():
+    snapshot = _snapshot(['600000'], [10.0], created_at=datetime(2024, 1, 6, 0, 0, 5))
+    assert snapshot.trade_date == date(2024, 1, 6)
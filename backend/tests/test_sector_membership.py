@@ -0,0 +1,66 @@
+"""
+板块成分数组索引测试
+"""
+import asyncio
+
+import numpy as np
+
+from app.services.eastmoney_api import EastMoneyAPI
+from app.services.sector_membership import (
+    CONSTITUENT_PAGE_SIZE, MembershipIndex, diff_membership, fetch_sector_constituents
+)
+
+
+def test_sector_sum_matches_loop():
+    membership = {20: {1, 3}, 10: {2, 3, 99}, 30: set()}
+    stock_ids = [1, 2, 3]
+    index = MembershipIndex(membership, stock_ids)
+
+    assert index.sector_ids.tolist() == [10, 20, 30]
+    assert index.sector_size.tolist() == [2, 2, 0]
+    np.testing.assert_allclose(index.sum(np.array([1.0, 10.0, 100.0])), [110.0, 101.0, 0.0])
+
+
+def test_sector_sum_two_dimensional_and_nan():
+    index = MembershipIndex({1: {1, 2}, 2: {2}}, [1, 2])
+    values = np.array([[1.0, np.nan], [2.0, 3.0]])
+    np.testing.assert_allclose(index.sum(values), [[3.0, 3.0], [2.0, 3.0]])
+
+
+def test_diff_membership():
+    assert diff_membership({1, 2, 3}, {2, 3, 4}) == ({4}, {1})
+
+
+class _StubAPI(EastMoneyAPI):
+    """第 failed_page 页请求失败的成分股接口"""
+
+    def __init__(self, total: int, failed_page: int = 0):
+        super().__init__()
+        self.total = total
+        self.failed_page = failed_page
+
+    async def get_sector_constituents(self, sector_code, page=1, page_size=100):
+        if page == self.failed_page:
+            return None
+        start = (page - 1) * page_size
+        codes = range(start, min(start + page_size, self.total))
+        return {'total': self.total, 'diff': [{'f12': f"{i:06d}"} for i in codes]}
+
+
+def _fetch(api):
+    async def run():
+        try:
+            return await fetch_sector_constituents(api, 'BK0001')
+        finally:
+            await api.close()
+    return asyncio.run(run())
+
+
+def test_fetch_constituents_all_pages():
+    codes = _fetch(_StubAPI(total=CONSTITUENT_PAGE_SIZE * 2 + 50))
+    assert len(codes) == CONSTITUENT_PAGE_SIZE * 2 + 50
+
+
+def test_fetch_constituents_incomplete_returns_none():
+    """任一页失败时返回None，不能按部分成分删除成分关系"""
+    assert _fetch(_StubAPI(total=CONSTITUENT_PAGE_SIZE * 2 + 50, failed_page=2)) is None
@@ -0,0 +1,135 @@
+"""
+共享内存快照测试（写端/读端 seqlock 往返、双缓冲槽复用、API进程快照读取任务）
+"""
+import asyncio
+import uuid
+from datetime import date, datetime
+from multiprocessing import resource_tracker
+
+import numpy as np
+import pytest
+
+from app.services.limit_monitor import LimitMonitor
+from app.services.market_snapshot import SNAPSHOT_COLUMNS, MarketSnapshot, SharedSnapshotFollower, SnapshotStore
+from app.utils.shared_snapshot import SharedSnapshotLayoutError, SharedSnapshotReader, SharedSnapshotWriter
+
+COLUMNS = ('price', 'inflow')
+
+
+@pytest.fixture
+def shm_name():
+    return f"fi_test_{uuid.uuid4().hex[:12]}"
+
+
+@pytest.fixture
+def writer(shm_name):
+    writer = SharedSnapshotWriter.create(shm_name, 8, COLUMNS)
+    yield writer
+    remove(writer)
+
+
+def remove(writer):
+    """删除共享内存（同一进程内读端连接时注销了 resource_tracker 登记，删除前重新登记）"""
+    resource_tracker.register(writer.shm._name, 'shared_memory')
+    writer.close()
+    writer.unlink()
+
+
+def attach(name, columns=COLUMNS):
+    return SharedSnapshotReader.attach(name, columns)
+
+
+def publish(writer, codes, values, created_at=1700000000.0):
+    codes = np.array(codes)
+    columns = {column: np.asarray(values, dtype=np.float64) + i for i, column in enumerate(writer.column_names)}
+    return writer.publish(codes, np.array([f"名称{code}" for code in codes]), columns, created_at)
+
+
+def test_round_trip(writer, shm_name):
+    reader = attach(shm_name)
+    assert reader.read() is None
+
+    assert publish(writer, ['000001', '600001'], [1.5, 2.5]) == 1
+    view = reader.read()
+    assert view.generation == 1
+    assert view.created_at == 1700000000.0
+    assert view.codes.tolist() == ['000001', '600001']
+    assert view.names.tolist() == ['名称000001', '名称600001']
+    np.testing.assert_array_equal(view.columns['price'], [1.5, 2.5])
+    np.testing.assert_array_equal(view.columns['inflow'], [2.5, 3.5])
+    assert not view.codes.flags.writeable
+    assert not view.columns['price'].flags.writeable
+    reader.close()
+
+
+def test_slot_reused_after_two_publishes(writer, shm_name):
+    reader = attach(shm_name)
+    publish(writer, ['000001', '600001'], [1.0, 2.0])
+    first = reader.read()
+    publish(writer, ['000001', '600001'], [3.0, 4.0])
+    second = reader.read()
+    np.testing.assert_array_equal(first.columns['price'], [1.0, 2.0])
+
+    publish(writer, ['000001', '300001'], [5.0, 6.0])
+    third = reader.read()
+    assert third.generation == 3
+    assert third.codes.tolist() == ['000001', '300001']
+    np.testing.assert_array_equal(second.columns['price'], [3.0, 4.0])
+    # 第一个版本的槽已被原地覆盖
+    assert first.codes.tolist() == ['000001', '300001']
+    reader.close()
+
+
+def test_capacity_and_layout_checks(writer, shm_name):
+    with pytest.raises(ValueError):
+        publish(writer, [f"{i:06d}" for i in range(9)], np.zeros(9))
+    with pytest.raises(SharedSnapshotLayoutError):
+        SharedSnapshotReader.attach(shm_name, ('price',))
+    with pytest.raises(SharedSnapshotLayoutError):
+        SharedSnapshotReader.attach(f"{shm_name}_missing", COLUMNS)
+
+
+def test_writer_reuses_segment_and_generation(writer, shm_name):
+    publish(writer, ['000001'], [1.0])
+    publish(writer, ['000001'], [2.0])
+    again = SharedSnapshotWriter.create(shm_name, 8, COLUMNS)
+    assert publish(again, ['000001'], [3.0]) == 3
+    again.close()
+
+
+def test_follower_codes_survive_slot_reuse(shm_name):
+    """API进程跨版本缓存的股票代码不随共享内存槽复用而改变"""
+    writer = SharedSnapshotWriter.create(shm_name, 8, tuple(SNAPSHOT_COLUMNS))
+    store = SnapshotStore()
+    follower = SharedSnapshotFollower(shm_name, store=store)
+    monitor = LimitMonitor()
+    monitor._stock_info = {
+        '000001': (1, False, False, False, False),
+        '600001': (3, False, False, False, False),
+        '300001': (2, False, True, False, False),
+    }
+    monitor._stock_info_date = date.today()
+    created_at = datetime.now().timestamp()
+
+    def publish_codes(codes):
+        columns = {column: np.full(len(codes), 10.0) for column in SNAPSHOT_COLUMNS}
+        writer.publish(np.array(codes), np.array(codes), columns, created_at)
+
+    async def run():
+        aligned = []
+        for codes in (['000001', '600001'], ['000001', '600001'], ['000001', '300001']):
+            publish_codes(codes)
+            await follower.run_once()
+            aligned.append(monitor._align_flags(store.current))
+        await follower.close()
+        return aligned
+
+    try:
+        aligned = asyncio.run(run())
+    finally:
+        remove(writer)
+
+    stock_ids, ratio = aligned[-1]
+    assert stock_ids.tolist() == [1, 2]
+    np.testing.assert_allclose(ratio, [0.1, 0.2])
+    assert isinstance(store.current, MarketSnapshot)
@@ -0,0 +1,53 @@
+"""
+登录用户缓存和令牌吊销测试
+"""
+import asyncio
+import time
+
+from app.core.user_cache import UserCache
+from app.models.user import User
+
+
+class _FakeRedis:
+    """多个进程共享的 Redis（只实现 set/exists）"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = (value, time.time() + ex if ex else None)
+
+    async def exists(self, key):
+        entry = self.data.get(key)
+        return int(entry is not None and (entry[1] is None or entry[1] > time.time()))
+
+
+def _user():
+    return User(user_id=1, username='alice', status='active')
+
+
+def test_revoke_removes_cached_user():
+    cache = UserCache()
+    cache.set('token', _user(), time.time() + 600)
+
+    asyncio.run(cache.revoke('token', time.time() + 600))
+    assert cache.get('token') is None
+    assert asyncio.run(cache.is_revoked('token'))
+    assert not asyncio.run(cache.is_revoked('other'))
+
+
+def test_revocation_shared_between_workers():
+    redis = _FakeRedis()
+    worker_a, worker_b = UserCache(redis_client=redis), UserCache(redis_client=redis)
+    worker_b.set('token', _user(), time.time() + 600)
+
+    asyncio.run(worker_a.revoke('token', time.time() + 600))
+    assert 'token' not in str(redis.data)
+    assert asyncio.run(worker_b.is_revoked('token'))
+    assert worker_b.get('token') is None
+
+
+def test_revocation_without_redis_is_per_process():
+    worker_a, worker_b = UserCache(), UserCache()
+    asyncio.run(worker_a.revoke('token', time.time() + 600))
+    assert not asyncio.run(worker_b.is_revoked('token'))
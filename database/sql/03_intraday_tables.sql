@@ -0,0 +1,27 @@
+-- ============================================
+-- 分钟级资金流向表
+-- 每只股票每个交易日一行，240分钟 × 5档 压缩为定长 float32 数组
+-- ============================================
+
+USE flowinsight;
+
+-- 分钟资金流向表
+CREATE TABLE IF NOT EXISTS intraday_flow (
+    intraday_id BIGINT AUTO_INCREMENT PRIMARY KEY COMMENT '记录ID',
+    stock_id INT NOT NULL COMMENT '股票ID',
+    trade_date DATE NOT NULL COMMENT '交易日期',
+    minute_count SMALLINT NOT NULL DEFAULT 0 COMMENT '已采集分钟数',
+    flow_data BLOB NOT NULL COMMENT '资金流向数组: float32[240][5], 档位顺序 主力/超大/大/中/小, 单位:元',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+    
+    UNIQUE KEY uk_stock_date (stock_id, trade_date),
+    INDEX idx_trade_date (trade_date),
+    FOREIGN KEY (stock_id) REFERENCES stocks(stock_id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='分钟资金流向表';
+
+-- 分钟资金流向采集配置
+INSERT INTO system_config (config_key, config_value, config_type, description) VALUES
+('intraday_universe', 'user', 'string', '分钟资金流向采集范围: user-持股和收藏, top-成交额前N, both-两者合并'),
+('intraday_top_n', '300', 'int', '分钟资金流向采集成交额前N只股票')
+ON DUPLICATE KEY UPDATE config_value=VALUES(config_value);
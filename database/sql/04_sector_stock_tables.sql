@@ -0,0 +1,20 @@
+-- ============================================
+-- 板块成分股表
+-- 由 scripts/collect_sector_stocks.py 增量维护
+-- ============================================
+
+USE flowinsight;
+
+-- 板块成分股表
+CREATE TABLE IF NOT EXISTS sector_stocks (
+    relation_id INT AUTO_INCREMENT PRIMARY KEY COMMENT '关系ID',
+    sector_id INT NOT NULL COMMENT '板块ID',
+    stock_id INT NOT NULL COMMENT '股票ID',
+    stock_code VARCHAR(10) NOT NULL COMMENT '股票代码（冗余字段，便于查询）',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '加入时间',
+    
+    UNIQUE KEY uk_sector_stock (sector_id, stock_id),
+    INDEX idx_stock_id (stock_id),
+    FOREIGN KEY (sector_id) REFERENCES sectors(sector_id) ON DELETE CASCADE,
+    FOREIGN KEY (stock_id) REFERENCES stocks(stock_id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='板块成分股表';
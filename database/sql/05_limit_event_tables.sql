@@ -0,0 +1,25 @@
+-- ============================================
+-- 涨跌停事件表
+-- 由涨跌停监控在每次全市场快照后写入
+-- ============================================
+
+USE flowinsight;
+
+-- 涨跌停事件表
+CREATE TABLE IF NOT EXISTS limit_events (
+    event_id BIGINT AUTO_INCREMENT PRIMARY KEY COMMENT '事件ID',
+    stock_id INT COMMENT '股票ID',
+    stock_code VARCHAR(10) NOT NULL COMMENT '股票代码',
+    stock_name VARCHAR(50) COMMENT '股票名称',
+    trade_date DATE NOT NULL COMMENT '交易日期',
+    event_time TIMESTAMP NOT NULL COMMENT '事件时间（快照时间）',
+    event_type VARCHAR(20) NOT NULL COMMENT '事件类型: limit_up-涨停, limit_up_break-炸板, limit_up_reseal-回封, limit_down-跌停, limit_down_break-翘板, limit_down_reseal-回封跌停',
+    price DECIMAL(10,3) COMMENT '事件时价格',
+    limit_price DECIMAL(10,3) COMMENT '涨跌停价',
+    change_percent DECIMAL(8,4) COMMENT '涨跌幅',
+    main_inflow DECIMAL(15,2) COMMENT '事件时主力净流入',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    
+    INDEX idx_date_type (trade_date, event_type),
+    INDEX idx_stock_date (stock_code, trade_date)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='涨跌停事件表';
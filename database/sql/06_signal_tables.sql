@@ -0,0 +1,32 @@
+-- ============================================
+-- 资金流入异动信号表
+-- 由 scripts/compute_flow_signals.py 每个交易日收盘后计算写入
+-- ============================================
+
+USE flowinsight;
+
+-- 资金流入异动信号表
+CREATE TABLE IF NOT EXISTS flow_signals (
+    signal_id BIGINT AUTO_INCREMENT PRIMARY KEY COMMENT '信号ID',
+    stock_id INT NOT NULL COMMENT '股票ID',
+    trade_date DATE NOT NULL COMMENT '交易日期',
+    main_inflow DECIMAL(15,2) COMMENT '当日主力净流入',
+    main_z DECIMAL(10,4) COMMENT '主力净流入 z-score',
+    super_z DECIMAL(10,4) COMMENT '超大单净流入 z-score',
+    inflow_ratio DECIMAL(10,6) COMMENT '主力净流入/成交额',
+    inflow_ratio_z DECIMAL(10,4) COMMENT '主力净流入/成交额 z-score',
+    divergence DECIMAL(10,6) COMMENT '档位背离强度: (超大单-小单)/成交额',
+    signal_types VARCHAR(100) NOT NULL COMMENT '触发的信号类型,逗号分隔',
+    score DECIMAL(10,4) COMMENT '综合得分',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    
+    UNIQUE KEY uk_stock_date (stock_id, trade_date),
+    INDEX idx_date_score (trade_date, score),
+    FOREIGN KEY (stock_id) REFERENCES stocks(stock_id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='资金流入异动信号表';
+
+-- 信号计算配置
+INSERT INTO system_config (config_key, config_value, config_type, description) VALUES
+('signal_window_days', '20', 'int', '资金异动信号基准窗口（交易日）'),
+('signal_z_threshold', '2.0', 'float', '资金异动信号 z-score 阈值')
+ON DUPLICATE KEY UPDATE config_value=VALUES(config_value);
@@ -0,0 +1,18 @@
+-- ============================================
+-- 历史排行组合索引
+-- 单日排行按 (trade_date, 排序字段) 索引有序扫描，只读取当页行，
+-- 响应时间与 capital_flow 表的总行数无关
+-- ============================================
+
+USE flowinsight;
+
+ALTER TABLE capital_flow
+    ADD INDEX IF NOT EXISTS idx_date_main_inflow (trade_date, main_inflow),
+    ADD INDEX IF NOT EXISTS idx_date_main_inflow_rate (trade_date, main_inflow_rate),
+    ADD INDEX IF NOT EXISTS idx_date_super_inflow (trade_date, super_inflow),
+    ADD INDEX IF NOT EXISTS idx_date_super_inflow_rate (trade_date, super_inflow_rate),
+    ADD INDEX IF NOT EXISTS idx_date_large_inflow (trade_date, large_inflow),
+    ADD INDEX IF NOT EXISTS idx_date_medium_inflow (trade_date, medium_inflow),
+    ADD INDEX IF NOT EXISTS idx_date_small_inflow (trade_date, small_inflow),
+    ADD INDEX IF NOT EXISTS idx_date_change_percent (trade_date, change_percent),
+    ADD INDEX IF NOT EXISTS idx_date_amount (trade_date, amount);
@@ -0,0 +1,22 @@
+-- ============================================
+-- 主力连续净流入状态表
+-- 由 scripts/update_flow_streaks.py 按交易日增量更新，每只股票一行
+-- ============================================
+
+USE flowinsight;
+
+-- 主力连续净流入状态表
+CREATE TABLE IF NOT EXISTS flow_streaks (
+    stock_id INT PRIMARY KEY COMMENT '股票ID',
+    last_trade_date DATE NOT NULL COMMENT '最后更新的交易日',
+    current_streak INT NOT NULL DEFAULT 0 COMMENT '当前连续主力净流入天数',
+    streak_amount DECIMAL(20,2) NOT NULL DEFAULT 0 COMMENT '当前连续流入期间累计主力净流入',
+    window_bits BIGINT NOT NULL DEFAULT 0 COMMENT '最近60个交易日是否主力净流入（最低位为最近一日）',
+    window_count INT NOT NULL DEFAULT 0 COMMENT '最近20个交易日主力净流入天数',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+    
+    INDEX idx_last_trade_date (last_trade_date),
+    INDEX idx_current_streak (current_streak),
+    INDEX idx_window_count (window_count),
+    FOREIGN KEY (stock_id) REFERENCES stocks(stock_id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='主力连续净流入状态表';
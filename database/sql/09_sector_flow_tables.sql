@@ -0,0 +1,36 @@
+-- ============================================
+-- 板块每日资金流向表
+-- 由 scripts/compute_sector_flows.py 按成分股资金流向聚合写入，并回写 sectors.hot_rank
+-- ============================================
+
+USE flowinsight;
+
+-- 板块每日资金流向表
+CREATE TABLE IF NOT EXISTS sector_flows (
+    sector_flow_id BIGINT AUTO_INCREMENT PRIMARY KEY COMMENT '记录ID',
+    sector_id INT NOT NULL COMMENT '板块ID',
+    trade_date DATE NOT NULL COMMENT '交易日期',
+    main_inflow DECIMAL(20,2) COMMENT '主力净流入合计',
+    super_inflow DECIMAL(20,2) COMMENT '超大单净流入合计',
+    large_inflow DECIMAL(20,2) COMMENT '大单净流入合计',
+    medium_inflow DECIMAL(20,2) COMMENT '中单净流入合计',
+    small_inflow DECIMAL(20,2) COMMENT '小单净流入合计',
+    amount DECIMAL(20,2) COMMENT '成交额合计',
+    inflow_ratio DECIMAL(10,6) COMMENT '主力净流入/成交额',
+    avg_change_percent DECIMAL(10,4) COMMENT '成分股平均涨跌幅(%)',
+    breadth DECIMAL(6,4) COMMENT '主力净流入的成分股占比',
+    momentum DECIMAL(10,6) COMMENT '近N日主力净流入/成交额',
+    flow_rank INT COMMENT '同类型板块主力净流入排名',
+    rank_change INT COMMENT '排名变化（正数为上升）',
+    stock_count INT COMMENT '有数据的成分股数量',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    
+    UNIQUE KEY uk_sector_date (sector_id, trade_date),
+    INDEX idx_date_rank (trade_date, flow_rank),
+    FOREIGN KEY (sector_id) REFERENCES sectors(sector_id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='板块每日资金流向表';
+
+-- 板块轮动配置
+INSERT INTO system_config (config_key, config_value, config_type, description) VALUES
+('sector_momentum_days', '5', 'int', '板块资金动量统计窗口（交易日）')
+ON DUPLICATE KEY UPDATE config_value=VALUES(config_value);
@@ -0,0 +1,10 @@
+-- ============================================
+-- 持股智能建议配置
+-- 后台任务按该周期对全部持股股票（去重）计算建议并缓存
+-- ============================================
+
+USE flowinsight;
+
+INSERT INTO system_config (config_key, config_value, config_type, description) VALUES
+('suggestion_interval', '300', 'int', '持股智能建议计算周期（秒）')
+ON DUPLICATE KEY UPDATE config_value=VALUES(config_value);
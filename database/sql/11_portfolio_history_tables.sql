@@ -0,0 +1,23 @@
+-- ============================================
+-- 用户持仓每日市值表
+-- 由 scripts/compute_portfolio_history.py 根据持股和 capital_flow 收盘价批量计算
+-- ============================================
+
+USE flowinsight;
+
+-- 用户持仓每日市值表
+CREATE TABLE IF NOT EXISTS portfolio_history (
+    history_id BIGINT AUTO_INCREMENT PRIMARY KEY COMMENT '记录ID',
+    user_id INT NOT NULL COMMENT '用户ID',
+    trade_date DATE NOT NULL COMMENT '交易日期',
+    market_value DECIMAL(20,2) NOT NULL COMMENT '持仓市值',
+    cost DECIMAL(20,2) NOT NULL COMMENT '持仓成本',
+    profit_loss DECIMAL(20,2) NOT NULL COMMENT '浮动盈亏',
+    profit_loss_rate DECIMAL(10,4) COMMENT '浮动盈亏比例(%)',
+    holding_count INT NOT NULL COMMENT '持股数量',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    
+    UNIQUE KEY uk_user_date (user_id, trade_date),
+    INDEX idx_trade_date (trade_date),
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='用户持仓每日市值表';